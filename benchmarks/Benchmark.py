@@ -0,0 +1,353 @@
+#
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright Red Hat
+#
+from __future__ import print_function
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from .FreshProcess import FreshProcess
+from .ImportTime import ImportTime
+from .MirrorServer import MirrorServer
+from .MirrorTree import MirrorTree
+
+log = logging.getLogger(__name__)
+
+######################################################################
+######################################################################
+class Benchmark(object):
+  """End-to-end discovery benchmark against a local MirrorServer.
+
+  Each operation is measured in the following scenarios, in order, each in
+  a fresh process so that nothing is retained in memory between them:
+
+    cold:   an empty cache
+    warm:   the cache populated by the cold scenario
+    forced: the warm cache with forceScan; i.e., every listing revalidated
+
+  For each the wall time of the operation and the requests received and
+  body bytes sent by the server are measured.  Only the requests and bytes,
+  which are deterministic, are compared with the baselines; the wall time,
+  which varies with the machine and its load, is reported for information.
+  main also runs the ImportTime benchmark of the entry points.
+  """
+  # The operations measured.
+  #   availableRoots: availableRoots of every repository and architecture
+  #   choices:        Distribution.choices of every architecture
+  operations = ("availableRoots", "choices")
+  scenarios = ("cold", "warm", "forced")
+
+  # The metrics compared with the baselines and the slack, beyond the
+  # relative tolerance, allowed before a metric is considered to have
+  # regressed.
+  metrics = { "requests"  : 0,
+              "bytes"     : 0 }
+
+  # The baselines shipped with the benchmarks.
+  baselinesPath = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               "baselines.json")
+
+  ####################################################################
+  # Public factory-behavior methods
+  ####################################################################
+  @classmethod
+  def main(cls, argv = None):
+    """Runs the benchmarks per the command line; returns the exit status,
+    non-zero if any metric regressed against the baselines or exceeded its
+    import budget.
+    """
+    args = cls.__privateParser().parse_args(argv)
+    logging.basicConfig(level = logging.DEBUG if args.debug
+                                  else logging.WARNING)
+    if args.scenario is not None:
+      print(json.dumps(cls.scenario(json.loads(args.scenario))))
+      return 0
+
+    baselines = {}
+    if os.path.exists(args.baselines):
+      with open(args.baselines) as f:
+        baselines = json.load(f)
+    updated = dict(baselines)
+    regressions = []
+
+    if args.suite in ("all", "discovery"):
+      tree = MirrorTree(rhelMinors = args.rhelMinors,
+                        zStreams = args.zStreams,
+                        centosMinors = args.centosMinors,
+                        fedoraReleases = args.fedoraReleases,
+                        fedoraArchived = args.fedoraArchived)
+      benchmark = cls(tree, latency = args.latency,
+                      errorRate = args.errorRate, seed = args.seed,
+                      repeat = args.repeat)
+      results = benchmark.run()
+      updated.update({ "configuration" : benchmark.configuration(),
+                       "results"       : results })
+      regressions.extend(benchmark.report(
+                           results,
+                           None if (args.updateBaselines
+                                    or ("results" not in baselines))
+                             else baselines,
+                           args.tolerance))
+
+    if args.suite in ("all", "imports"):
+      importTime = ImportTime(repeat = args.repeat)
+      results = importTime.run()
+      updated["imports"] = importTime.budgets(results)
+      regressions.extend(importTime.report(
+                           results,
+                           None if args.updateBaselines
+                             else baselines.get("imports")))
+
+    if args.updateBaselines:
+      with open(args.baselines, "w") as f:
+        json.dump(updated, f, indent = 2, sort_keys = True)
+        f.write("\n")
+    return 1 if len(regressions) > 0 else 0
+
+  ####################################################################
+  @classmethod
+  def overrideDefaults(cls, host, cacheRoot, forceScan = False):
+    """Overrides the repository defaults, in the invoking process, to direct
+    discovery to the server at host, caching in cacheRoot, and optionally
+    to force scanning.
+    """
+    from discovery import repos
+
+    overrides = {
+      ("cache", "directories", "root")  : cacheRoot,
+      ("centos", "hosts", "released")   : host,
+      ("centos", "paths", "latest")     : None,
+      ("centos", "paths", "nightly")    : None,
+      ("centos", "paths", "released")   : "/centos",
+      ("fedora", "hosts", "archived")   : host,
+      ("fedora", "hosts", "released")   : host,
+      ("rhel", "hosts", "released")     : host,
+      ("rhel", "paths", "latest")       : "/rhel/latest",
+      ("rhel", "paths", "nightly")      : None,
+      ("rhel", "paths", "released")     : "/rhel/released"
+    }
+    inherited = repos.Repository.defaults.__func__
+
+    def defaults(klass, keys, *args, **kwargs):
+      if tuple(keys) in overrides:
+        return overrides[tuple(keys)]
+      return inherited(klass, keys, *args, **kwargs)
+
+    repos.Repository.defaults = classmethod(defaults)
+    repos.Repository.useDaemon(False)
+    if forceScan:
+      repos.Repository._defaultArguments = (
+        lambda self: argparse.Namespace(forceScan = True))
+
+  ####################################################################
+  @classmethod
+  def scenario(cls, specification):
+    """Performs the specified operation against the server at the specified
+    host, caching in the specified root, and returns a dictionary of its
+    wall time.
+
+    This is run in its own process by run; the repository defaults are
+    overridden, per overrideDefaults, to direct discovery to the server and
+    cache.
+    """
+    from discovery import architectures, distributions, repos
+
+    cls.overrideDefaults(specification["host"], specification["cacheRoot"],
+                         specification["forceScan"])
+
+    start = time.time()
+    if specification["operation"] == "availableRoots":
+      for choice in repos.Repository.choices():
+        repository = repos.Repository.makeItem(choice)
+        for architecture in architectures.Architecture.choices():
+          repository.availableRoots(architecture)
+    else:
+      for architecture in architectures.Architecture.choices():
+        distributions.Distribution.choices(architecture)
+    return { "wall" : round(time.time() - start, 4) }
+
+  ####################################################################
+  # Public instance-behavior methods
+  ####################################################################
+  def configuration(self):
+    """Returns a dictionary of the parameters affecting the measurements;
+    baselines are only comparable with measurements of the same parameters.
+    """
+    configuration = self.__tree.configuration()
+    configuration.update({ "latency"   : self.__latency,
+                           "errorRate" : self.__errorRate,
+                           "seed"      : self.__seed })
+    return configuration
+
+  ####################################################################
+  def report(self, results, baselines = None, tolerance = 0.05):
+    """Prints the results, compared to the baselines if provided, and returns
+    a list of descriptions of the metrics which regressed.
+
+    A metric regresses if it exceeds its baseline by more than the relative
+    tolerance plus the metric's slack.
+    """
+    if ((baselines is not None)
+        and (baselines.get("configuration") != self.configuration())):
+      print("baselines are of a different configuration; not compared",
+            file = sys.stderr)
+      baselines = None
+
+    regressions = []
+    print("{0:<16} {1:<8} {2:>10} {3:>10} {4:>12}".format("operation",
+                                                          "scenario",
+                                                          "wall",
+                                                          "requests",
+                                                          "bytes"))
+    for operation in self.operations:
+      for scenario in self.scenarios:
+        key = "{0}/{1}".format(operation, scenario)
+        measured = results[key]
+        print("{0:<16} {1:<8} {2:>10.3f} {3:>10} {4:>12}"
+                .format(operation, scenario, measured["wall"],
+                        measured["requests"], measured["bytes"]))
+        if (baselines is None) or (key not in baselines["results"]):
+          continue
+        baseline = baselines["results"][key]
+        print("{0:<16} {1:<8} {2:>10.3f} {3:>10} {4:>12}"
+                .format("", "baseline", baseline["wall"],
+                        baseline["requests"], baseline["bytes"]))
+        for (metric, slack) in sorted(self.metrics.items()):
+          limit = baseline[metric] * (1 + tolerance)
+          if measured[metric] > (limit + slack):
+            regressions.append("{0} {1}: {2} exceeds baseline {3}"
+                                .format(key, metric, measured[metric],
+                                        baseline[metric]))
+    for regression in regressions:
+      print("REGRESSION {0}".format(regression), file = sys.stderr)
+    return regressions
+
+  ####################################################################
+  def run(self):
+    """Returns a dictionary, keyed by <operation>/<scenario>, of the
+    measurements of each operation in each scenario.
+
+    With repetition the minimum wall time and maximum counts are reported.
+    """
+    results = {}
+    server = MirrorServer(self.__tree, latency = self.__latency,
+                          errorRate = self.__errorRate,
+                          seed = self.__seed).start()
+    try:
+      for _ in range(self.__repeat):
+        for operation in self.operations:
+          cacheRoot = tempfile.mkdtemp(prefix = "discovery-benchmark-")
+          try:
+            for scenario in self.scenarios:
+              measured = self.__privateMeasure(server, operation,
+                                               scenario, cacheRoot)
+              key = "{0}/{1}".format(operation, scenario)
+              if key in results:
+                measured = { "wall"     : min(results[key]["wall"],
+                                              measured["wall"]),
+                             "requests" : max(results[key]["requests"],
+                                              measured["requests"]),
+                             "bytes"    : max(results[key]["bytes"],
+                                              measured["bytes"]) }
+              results[key] = measured
+          finally:
+            shutil.rmtree(cacheRoot, ignore_errors = True)
+    finally:
+      server.shutdown()
+      server.server_close()
+    return results
+
+  ####################################################################
+  # Overridden methods
+  ####################################################################
+  def __init__(self, tree, latency = 0.0, errorRate = 0.0, seed = 0,
+               repeat = 1):
+    super(Benchmark, self).__init__()
+    self.__tree = tree
+    self.__latency = latency
+    self.__errorRate = errorRate
+    self.__seed = seed
+    self.__repeat = max(1, repeat)
+
+  ####################################################################
+  # Private methods
+  ####################################################################
+  @classmethod
+  def __privateParser(cls):
+    parser = argparse.ArgumentParser(
+      prog = "python -m benchmarks",
+      description = "Benchmark discovery against a local mirror server.")
+    parser.add_argument("--suite", choices = ("all", "discovery", "imports"),
+                        default = "all",
+                        help = "benchmarks run; discovery against the mirror"
+                               " server, imports of the entry points or all"
+                               " (default: %(default)s)")
+    parser.add_argument("--baselines", default = cls.baselinesPath,
+                        help = "path of the baselines (default: %(default)s)")
+    parser.add_argument("--update-baselines", dest = "updateBaselines",
+                        action = "store_true",
+                        help = "replace the baselines with the measurements")
+    parser.add_argument("--tolerance", type = float, default = 0.05,
+                        help = "relative regression tolerance of requests"
+                               " and bytes (default: %(default)s)")
+    parser.add_argument("--repeat", type = int, default = 3,
+                        help = "repetitions of each measurement"
+                               " (default: %(default)s)")
+    parser.add_argument("--latency", type = float, default = 0.0,
+                        help = "seconds by which each response is delayed"
+                               " (default: %(default)s)")
+    parser.add_argument("--error-rate", dest = "errorRate", type = float,
+                        default = 0.0,
+                        help = "fraction of responses which are 503"
+                               " (default: %(default)s)")
+    parser.add_argument("--seed", type = int, default = 0,
+                        help = "seed of the errors (default: %(default)s)")
+    parser.add_argument("--rhel-minors", dest = "rhelMinors", type = int,
+                        default = 6, help = "minors per RHEL major"
+                                            " (default: %(default)s)")
+    parser.add_argument("--z-streams", dest = "zStreams", type = int,
+                        default = 2, help = "z-streams per RHEL minor"
+                                            " (default: %(default)s)")
+    parser.add_argument("--centos-minors", dest = "centosMinors", type = int,
+                        default = 6, help = "minors per CentOS major"
+                                            " (default: %(default)s)")
+    parser.add_argument("--fedora-releases", dest = "fedoraReleases",
+                        type = int, default = 8,
+                        help = "Fedora releases (default: %(default)s)")
+    parser.add_argument("--fedora-archived", dest = "fedoraArchived",
+                        type = int, default = 3,
+                        help = "archived Fedora releases"
+                               " (default: %(default)s)")
+    parser.add_argument("--debug", action = "store_true",
+                        help = "log debug messages")
+    # Internal: performs a single measurement in the invoking process.
+    parser.add_argument("--scenario", help = argparse.SUPPRESS)
+    return parser
+
+  ####################################################################
+  def __privateMeasure(self, server, operation, scenario, cacheRoot):
+    """Returns a dictionary of the wall time, requests and bytes of the
+    operation in the scenario, performed in a fresh process.
+    """
+    specification = { "operation" : operation,
+                      "host"      : server.host(),
+                      "cacheRoot" : cacheRoot,
+                      "forceScan" : scenario == "forced" }
+    server.reset()
+    measured = FreshProcess.result(["-m", "benchmarks",
+                                    "--scenario", json.dumps(specification)])
+
+    statistics = server.statistics()
+    measured.update({ "requests"  : statistics["requests"],
+                      "bytes"     : statistics["bytes"] })
+    log.debug("{0} {1} statuses: {2}".format(operation, scenario,
+                                             statistics["statuses"]))
+    return measured
@@ -0,0 +1,59 @@
+#
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright Red Hat
+#
+import json
+import logging
+import os
+import subprocess
+import sys
+
+log = logging.getLogger(__name__)
+
+######################################################################
+######################################################################
+class FreshProcess(object):
+  """Runs the Python interpreter in a fresh process, with the repository's
+  root first on its path, and obtains the result it reports as JSON on the
+  last line of its output beginning with a marker.
+
+  Used by the benchmarks, and the tests, to measure without anything having
+  been imported or retained in memory beforehand.
+  """
+  # The repository's root; the working directory of the process.
+  root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+  ####################################################################
+  # Public methods
+  ####################################################################
+  @classmethod
+  def result(cls, arguments, stream = "stdout", marker = ""):
+    """Returns the JSON decoded from the last line of the stream ("stdout"
+    or "stderr") of the interpreter run with the arguments which begins with
+    the marker, the marker excluded.
+
+    Raises RuntimeError if the process fails or reports no result.
+    """
+    environment = dict(os.environ)
+    environment["PYTHONPATH"] = os.pathsep.join(
+      [cls.root] + [ path for path
+                       in environment.get("PYTHONPATH", "").split(os.pathsep)
+                       if path != "" ])
+
+    process = subprocess.Popen([sys.executable] + list(arguments),
+                               cwd = cls.root, env = environment,
+                               stdout = subprocess.PIPE,
+                               stderr = subprocess.PIPE,
+                               universal_newlines = True)
+    (output, errors) = process.communicate()
+    if process.returncode != 0:
+      raise RuntimeError("{0} failed: {1}".format(arguments, errors))
+    log.debug("{0}: {1}".format(arguments, errors))
+
+    for line in reversed((output if stream == "stdout"
+                                 else errors).splitlines()):
+      if (len(line) > 0) and line.startswith(marker):
+        return json.loads(line[len(marker):])
+    raise RuntimeError("{0} reported no result: {1}".format(arguments,
+                                                            errors))
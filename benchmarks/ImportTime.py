@@ -0,0 +1,152 @@
+#
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright Red Hat
+#
+from __future__ import print_function
+
+import logging
+import sys
+
+from .FreshProcess import FreshProcess
+
+log = logging.getLogger(__name__)
+
+######################################################################
+######################################################################
+class ImportTime(object):
+  """Import benchmark of the console entry points.
+
+  Each entry point is run, as its console script runs it, in a fresh
+  process; the commands with --help so that their parsers are built without
+  discovery being performed.  The modules imported in doing so and the time
+  taken are measured.  Those imported on startup and by importing the
+  package's dependencies (see dependencies) are excluded so that the budgets
+  do not depend on the dependencies' versions.
+
+  Only the modules imported, which are deterministic, are compared with the
+  budgets; the time, which varies with the machine and its load, is reported
+  for information.  The modules are taken from sys.modules, at exit, as
+  "python -X importtime" does not report those imported via importlib; e.g.,
+  by the packages' lazy loading.
+  """
+  # Keyed by entry point, the package from which its console script imports
+  # it and the arguments with which it is run.
+  entryPoints = { "arches"  : ("discovery.architectures", []),
+                  "distros" : ("discovery.distributions", ["--help"]),
+                  "repos"   : ("discovery.repos", ["--help"]) }
+
+  # The metrics compared with the budgets.
+  metrics = ("modules",)
+
+  # Imports the package's dependencies.
+  dependencies = "import yaml\nfrom mill import command, defaults, factory"
+
+  # Executed, in the measuring process, before the entry point is run; at
+  # exit it writes the measurements, as JSON, on a line of their own to
+  # stderr.
+  __prologue = """
+import atexit, json, sys, time
+start = time.time()
+atexit.register(
+  lambda: sys.stderr.write("\\n{0}{{0}}\\n".format(json.dumps(
+            {{ "microseconds" : int((time.time() - start) * 1000000),
+               "modules"      : sorted(sys.modules.keys()) }}))))
+"""
+  __marker = "import benchmark: "
+
+  ####################################################################
+  # Public methods
+  ####################################################################
+  def budgets(self, results):
+    """Returns the results limited to the metrics compared with budgets;
+    i.e., as stored as the budgets.
+    """
+    return dict([ (entryPoint, dict([ (metric, measured[metric])
+                                      for metric in self.metrics ]))
+                  for (entryPoint, measured) in results.items() ])
+
+  ####################################################################
+  def measure(self, entryPoint):
+    """Returns a dictionary of the microseconds taken to run the entry point
+    and the number of modules imported.
+    """
+    (package, arguments) = self.entryPoints[entryPoint]
+    startup = self.__privateMeasure(self.dependencies)
+    measured = self.__privateMeasure("\n".join([
+                "sys.argv = {0!r}".format([entryPoint] + arguments),
+                "from {0} import {1}".format(package, entryPoint),
+                "{0}()".format(entryPoint)]))
+    modules = sorted(set(measured["modules"]) - set(startup["modules"]))
+    log.debug("{0} imports: {1}".format(entryPoint, modules))
+    return { "microseconds" : measured["microseconds"],
+             "modules"      : len(modules) }
+
+  ####################################################################
+  def report(self, results, budgets = None):
+    """Prints the results, compared to the budgets if provided, and returns
+    a list of descriptions of the metrics which exceeded their budgets.
+
+    A metric exceeds its budget if it is greater than the budget.
+    """
+    regressions = []
+    print("{0:<16} {1:<8} {2:>14} {3:>10}".format("entry point", "",
+                                                  "microseconds", "modules"))
+    for entryPoint in sorted(self.entryPoints.keys()):
+      measured = results[entryPoint]
+      print("{0:<16} {1:<8} {2:>14} {3:>10}".format(entryPoint, "measured",
+                                                    measured["microseconds"],
+                                                    measured["modules"]))
+      if (budgets is None) or (entryPoint not in budgets):
+        continue
+      budget = budgets[entryPoint]
+      print("{0:<16} {1:<8} {2:>14} {3:>10}".format("", "budget", "",
+                                                    budget["modules"]))
+      for metric in self.metrics:
+        if measured[metric] > budget[metric]:
+          regressions.append("import {0} {1}: {2} exceeds budget {3}"
+                              .format(entryPoint, metric, measured[metric],
+                                      budget[metric]))
+    for regression in regressions:
+      print("REGRESSION {0}".format(regression), file = sys.stderr)
+    return regressions
+
+  ####################################################################
+  def run(self):
+    """Returns a dictionary, keyed by entry point, of its measurements.
+
+    With repetition the minimum time and maximum module count are reported.
+    """
+    results = {}
+    for _ in range(self.__repeat):
+      for entryPoint in self.entryPoints:
+        measured = self.measure(entryPoint)
+        if entryPoint in results:
+          measured = { "microseconds" : min(results[entryPoint]
+                                              ["microseconds"],
+                                            measured["microseconds"]),
+                       "modules"      : max(results[entryPoint]["modules"],
+                                            measured["modules"]) }
+        results[entryPoint] = measured
+    return results
+
+  ####################################################################
+  # Overridden methods
+  ####################################################################
+  def __init__(self, repeat = 1):
+    super(ImportTime, self).__init__()
+    self.__repeat = max(1, repeat)
+
+  ####################################################################
+  # Private methods
+  ####################################################################
+  def __privateMeasure(self, statement):
+    """Returns a dictionary of the microseconds taken to execute the
+    statement in a fresh process and a list of the modules then imported.
+    """
+    # The output, e.g., the commands' help, is discarded.
+    return FreshProcess.result(["-c",
+                                "{0}{1}".format(
+                                  self.__prologue.format(self.__marker),
+                                  statement)],
+                               stream = "stderr", marker = self.__marker)
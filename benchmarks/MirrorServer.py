@@ -0,0 +1,147 @@
+#
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright Red Hat
+#
+import collections
+import logging
+import random
+import threading
+import time
+
+try:
+  import BaseHTTPServer as server
+  import SocketServer as socketserver
+except ImportError:
+  from http import server
+  import socketserver
+
+log = logging.getLogger(__name__)
+
+######################################################################
+######################################################################
+class MirrorServer(socketserver.ThreadingMixIn, server.HTTPServer):
+  """Local HTTP server serving the listings of a MirrorTree.
+
+  Listings are served with an ETag and revalidated (304) as are those of the
+  real hosts.  Each response is delayed by 'latency' seconds and, with
+  probability 'errorRate', replaced by a 503; the errors are drawn from a
+  generator seeded with 'seed' so that runs are repeatable.
+
+  The server counts the requests it receives, the body bytes it sends and
+  the statuses of its responses; see statistics.
+  """
+  daemon_threads = True
+
+  ####################################################################
+  # Public methods
+  ####################################################################
+  def host(self):
+    """Returns the host:port of the server as used by the discovery defaults.
+    """
+    return "{0}:{1}".format(*self.server_address[:2])
+
+  ####################################################################
+  def reset(self):
+    """Resets the statistics and the error generator.
+    """
+    with self.__lock:
+      self.__random = random.Random(self.__seed)
+      self.__requests = 0
+      self.__bytes = 0
+      self.__statuses = collections.Counter()
+
+  ####################################################################
+  def respond(self, path, etag):
+    """Returns a tuple of the status, ETag and body of the response to a GET
+    of path conditional on etag (which may be None), counting the response.
+    """
+    if self.__latency > 0:
+      time.sleep(self.__latency)
+    with self.__lock:
+      failed = self.__random.random() < self.__errorRate
+    (body, current) = self.__tree.listing(path.split("?", 1)[0])
+    if failed:
+      (status, current, body) = (503, None, b"Service Unavailable\n")
+    elif body is None:
+      (status, body) = (404, b"Not Found\n")
+    elif etag == current:
+      (status, body) = (304, b"")
+    else:
+      status = 200
+    with self.__lock:
+      self.__requests += 1
+      self.__bytes += len(body)
+      self.__statuses[status] += 1
+    return (status, current, body)
+
+  ####################################################################
+  def start(self):
+    """Serves requests in a daemon thread; returns the server.
+    """
+    thread = threading.Thread(target = self.serve_forever,
+                              name = "mirror server")
+    thread.daemon = True
+    thread.start()
+    return self
+
+  ####################################################################
+  def statistics(self):
+    """Returns a dictionary of the requests received, body bytes sent and,
+    keyed by status as a string, the count of responses since the last reset.
+    """
+    with self.__lock:
+      return { "requests" : self.__requests,
+               "bytes"    : self.__bytes,
+               "statuses" : dict([ ("{0}".format(status), count)
+                                   for (status, count)
+                                     in sorted(self.__statuses.items()) ]) }
+
+  ####################################################################
+  # Overridden methods
+  ####################################################################
+  def __init__(self, tree, latency = 0.0, errorRate = 0.0, seed = 0,
+               address = ("127.0.0.1", 0)):
+    server.HTTPServer.__init__(self, address, MirrorRequestHandler)
+    self.__tree = tree
+    self.__latency = latency
+    self.__errorRate = errorRate
+    self.__seed = seed
+    self.__lock = threading.Lock()
+    self.reset()
+
+  ####################################################################
+  def handle_error(self, request, client_address):
+    # Clients closing their connections are expected; not an error.
+    log.debug("error handling request from {0}".format(client_address))
+
+######################################################################
+######################################################################
+class MirrorRequestHandler(server.BaseHTTPRequestHandler):
+  """Request handler of MirrorServer; HTTP/1.1 so connections are kept alive
+  as those of the real hosts are.
+  """
+  protocol_version = "HTTP/1.1"
+  # Headers and body are written separately; without this each response is
+  # delayed by the interaction of Nagle's algorithm and delayed ACKs.
+  disable_nagle_algorithm = True
+
+  ####################################################################
+  # Overridden methods
+  ####################################################################
+  def do_GET(self):
+    (status, etag, body) = self.server.respond(
+                                      self.path,
+                                      self.headers.get("If-None-Match"))
+    self.send_response(status)
+    if etag is not None:
+      self.send_header("ETag", etag)
+    if status == 200:
+      self.send_header("Content-Type", "text/html;charset=UTF-8")
+    self.send_header("Content-Length", "{0}".format(len(body)))
+    self.end_headers()
+    self.wfile.write(body)
+
+  ####################################################################
+  def log_message(self, format, *args):
+    log.debug(format % args)
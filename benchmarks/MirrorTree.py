@@ -0,0 +1,159 @@
+#
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright Red Hat
+#
+import hashlib
+
+######################################################################
+######################################################################
+class MirrorTree(object):
+  """Synthetic tree of directories laid out as the hosts scraped by
+  repos.RHEL, repos.CentOS and repos.Fedora, served as Apache-style
+  autoindex listings by MirrorServer.
+
+  The tree contains:
+
+    /rhel/released/RHEL-<major>/<major>.<minor>.<z>/<variant>/<arch>/
+    /rhel/latest/rhel-<major>/rel-eng/RHEL-<major>/
+      latest-RHEL-<major>.<minor>.<z>/compose/<variant>/<arch>/
+    /centos/centos-<major>/<major>.<minor>.<build>/BaseOS/<arch>/
+    /pub/fedora/linux/{releases,development}/<version>/Everything/<arch>/
+    /pub/fedora-secondary/{releases,development}/<version>/Everything/<arch>/
+
+  with the oldest Fedora releases moved to /pub/archive, leaving only a
+  README behind.  The variant is Server prior to RHEL 8 and BaseOS after.
+  """
+  # The architectures provided and those Fedora provides as secondary.
+  architectures = ("aarch64", "ppc64le", "s390x", "x86_64")
+  fedoraSecondary = ("ppc64le", "s390x")
+
+  ####################################################################
+  # Public methods
+  ####################################################################
+  def configuration(self):
+    """Returns a dictionary of the parameters of the tree.
+    """
+    return dict(self.__configuration)
+
+  ####################################################################
+  def listing(self, path):
+    """Returns a tuple of the autoindex listing of the directory at path, as
+    bytes, and its ETag or (None, None) if there is no such directory.
+    """
+    if path not in self.__entries:
+      return (None, None)
+    if path not in self.__listings:
+      body = "".join(
+        ["<!DOCTYPE HTML PUBLIC \"-//W3C//DTD HTML 3.2 Final//EN\">\n",
+         "<html>\n <head>\n  <title>Index of {0}</title>\n </head>\n"
+           .format(path),
+         " <body>\n<h1>Index of {0}</h1>\n<pre>".format(path),
+         "<a href=\"?C=N;O=D\">Name</a>  <a href=\"?C=M;O=A\">Last modified",
+         "</a>  <a href=\"?C=S;O=A\">Size</a>\n<hr>",
+         "<a href=\"/\">Parent Directory</a>                     -\n"]
+        + [ "<a href=\"{0}\">{0}</a>{1}2023-04-11 10:21    -\n"
+              .format(entry, " " * max(1, 40 - len(entry)))
+            for entry in sorted(self.__entries[path]) ]
+        + ["<hr></pre>\n</body></html>\n"]).encode("UTF-8")
+      self.__listings[path] = (body,
+                               "\"{0}\"".format(
+                                 hashlib.md5(body).hexdigest()))
+    return self.__listings[path]
+
+  ####################################################################
+  # Overridden methods
+  ####################################################################
+  def __init__(self, rhelMajors = (7, 8, 9), rhelMinors = 6, zStreams = 2,
+               latestMinors = 2, centosMajors = (8,), centosMinors = 6,
+               fedoraReleases = 8, fedoraArchived = 3, fedoraFirst = 32):
+    """rhelMajors and centosMajors are the majors provided; rhelMinors and
+    centosMinors the number of minors of each major; zStreams the number
+    of z-streams of each RHEL minor; latestMinors the number of unreleased
+    RHEL minors following those released; fedoraReleases the number of
+    Fedora releases, beginning with fedoraFirst, of which the oldest
+    fedoraArchived are archived.
+    """
+    super(MirrorTree, self).__init__()
+    self.__configuration = { "rhelMajors"     : list(rhelMajors),
+                             "rhelMinors"     : rhelMinors,
+                             "zStreams"       : zStreams,
+                             "latestMinors"   : latestMinors,
+                             "centosMajors"   : list(centosMajors),
+                             "centosMinors"   : centosMinors,
+                             "fedoraReleases" : fedoraReleases,
+                             "fedoraArchived" : fedoraArchived,
+                             "fedoraFirst"    : fedoraFirst }
+    # Keyed by directory path, the names of its entries; those of
+    # directories end in '/'.
+    self.__entries = { "/" : set() }
+    self.__listings = {}
+
+    for major in rhelMajors:
+      self.__privateAddRhel(major, rhelMinors, zStreams, latestMinors)
+    for major in centosMajors:
+      self.__privateAddCentos(major, centosMinors)
+    self.__privateAddFedora(fedoraFirst, fedoraReleases, fedoraArchived)
+
+  ####################################################################
+  def __len__(self):
+    return len(self.__entries)
+
+  ####################################################################
+  # Private methods
+  ####################################################################
+  def __privateAdd(self, path):
+    """Adds path, and its ancestors, to the tree; path is a directory if it
+    ends in '/'.
+    """
+    parts = path.strip("/").split("/")
+    parent = "/"
+    for (index, part) in enumerate(parts):
+      directory = path.endswith("/") or (index < (len(parts) - 1))
+      name = "{0}/".format(part) if directory else part
+      self.__entries.setdefault(parent, set()).add(name)
+      parent = "{0}{1}".format(parent, name)
+      if directory:
+        self.__entries.setdefault(parent, set())
+
+  ####################################################################
+  def __privateAddCentos(self, major, minors):
+    for minor in range(minors):
+      for architecture in self.architectures:
+        self.__privateAdd("/centos/centos-{0}/{0}.{1}.{2}/BaseOS/{3}/"
+                            .format(major, minor, 2000 + minor, architecture))
+
+  ####################################################################
+  def __privateAddFedora(self, first, releases, archived):
+    development = first + releases
+    for version in range(first, development + 1):
+      for architecture in self.architectures:
+        root = ("/pub/fedora-secondary" if architecture in self.fedoraSecondary
+                  else "/pub/fedora/linux")
+        area = "development" if version == development else "releases"
+        if version < (first + archived):
+          self.__privateAdd("{0}/{1}/{2}/README".format(root, area, version))
+          root = root.replace("/pub/", "/pub/archive/", 1)
+        self.__privateAdd("{0}/{1}/{2}/Everything/{3}/".format(root,
+                                                               area,
+                                                               version,
+                                                               architecture))
+
+  ####################################################################
+  def __privateAddRhel(self, major, minors, zStreams, latestMinors):
+    variant = "Server" if major < 8 else "BaseOS"
+    # RHEL 7 is not provided for aarch64.
+    provided = [ architecture for architecture in self.architectures
+                              if (major >= 8) or (architecture != "aarch64") ]
+    for minor in range(minors + latestMinors):
+      for z in range(zStreams if minor < minors else 1):
+        for architecture in provided:
+          if minor < minors:
+            self.__privateAdd("/rhel/released/RHEL-{0}/{0}.{1}.{2}/{3}/{4}/"
+                                .format(major, minor, z, variant,
+                                        architecture))
+          else:
+            self.__privateAdd(
+              "/rhel/latest/rhel-{0}/rel-eng/RHEL-{0}/latest-RHEL-{0}.{1}.{2}"
+              "/compose/{3}/{4}/".format(major, minor, z, variant,
+                                         architecture))
@@ -0,0 +1,10 @@
+#
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright Red Hat
+#
+from .Benchmark import Benchmark
+from .FreshProcess import FreshProcess
+from .ImportTime import ImportTime
+from .MirrorServer import MirrorServer
+from .MirrorTree import MirrorTree
@@ -0,0 +1,10 @@
+#
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright Red Hat
+#
+import sys
+
+from .Benchmark import Benchmark
+
+sys.exit(Benchmark.main())
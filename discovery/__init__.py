@@ -3,4 +3,19 @@
 #
 # Copyright Red Hat
 #
-from . import architectures, distributions, repos
+import importlib
+
+# The subpackages are imported on first use so that using one (e.g., the arches
+# entry point) does not pay for importing the others.
+__all__ = ["architectures", "distributions", "repos"]
+
+######################################################################
+def __getattr__(name):
+  if name not in __all__:
+    raise AttributeError("module {0!r} has no attribute {1!r}".format(__name__,
+                                                                      name))
+  return importlib.import_module(".{0}".format(name), __name__)
+
+######################################################################
+def __dir__():
+  return sorted(set(list(globals().keys()) + __all__))
@@ -3,22 +3,89 @@
 #
 # Copyright Red Hat
 #
+import collections
 import logging
 import os
 import platform
+import threading
+import types
 
 from mill import defaults, factory
 
 log = logging.getLogger(__name__)
 
+########################################################################
+# The capabilities of an architecture; see the like-named properties of
+# Architecture.
+ArchitectureCapabilities = collections.namedtuple(
+                            "ArchitectureCapabilities",
+                            ["name", "is32Bit", "is64Bit", "isFedoraSecondary",
+                             "lacksHardwareData", "requiresExternalStorage",
+                             "virtualizationFlag"])
+
 ########################################################################
 class Architecture(factory.Factory, defaults.DefaultsFileInfo):
+  # The capabilities of the known architectures, keyed by name; see
+  # tabulateCapabilities.
+  __capabilities = types.MappingProxyType({})
+
+  # The default architecture, once determined, and the lock serializing its
+  # determination.
+  __default = None
+  __defaultLock = threading.Lock()
+
   ####################################################################
   # Public methods
+  ####################################################################
+  @classmethod
+  def capabilities(cls, architecture = None):
+    """Returns the ArchitectureCapabilities of the architecture, by default
+    the default architecture.  Raises ValueError if the architecture is
+    unknown.
+
+    Those of architectures defined after the table was built are obtained
+    from an instance of the architecture.
+    """
+    if architecture is None:
+      architecture = cls.defaultChoice()
+    capabilities = Architecture.__capabilities.get(architecture)
+    if capabilities is None:
+      if not cls._isItemAvailable(architecture):
+        raise ValueError("unknown architecture: {0}".format(architecture))
+      capabilities = cls.__privateCapabilities(architecture,
+                                               cls.makeItem(architecture))
+    return capabilities
+
   ####################################################################
   @classmethod
   def fedoraSecondary(cls, architecture):
-    return cls.makeItem(architecture).isFedoraSecondary
+    return cls.capabilities(architecture).isFedoraSecondary
+
+  ####################################################################
+  @classmethod
+  def overrideDefault(cls, architecture):
+    """Specifies the architecture to use as the default rather than that of
+    the machine; None restores the machine's, determined anew.
+
+    Intended for testing.
+    """
+    if (architecture is not None) and (not cls._isItemAvailable(architecture)):
+      raise ValueError("default architecture '{0}' not known"
+                        .format(architecture))
+    with Architecture.__defaultLock:
+      Architecture.__default = architecture
+
+  ####################################################################
+  @classmethod
+  def tabulateCapabilities(cls):
+    """Builds the table of the capabilities of the known architectures.
+
+    Invoked once, when the package is imported, after all the architectures
+    have been defined.
+    """
+    Architecture.__capabilities = types.MappingProxyType(dict([
+      (choice, cls.__privateCapabilities(choice, cls.makeItem(choice)))
+      for choice in cls.choices() ]))
 
   ####################################################################
   @property
@@ -55,6 +122,32 @@ class Architecture(factory.Factory, defaults.DefaultsFileInfo):
   ####################################################################
   @classmethod
   def _defaultChoice(cls):
+    # The machine's architecture is determined once; see overrideDefault.
+    with Architecture.__defaultLock:
+      if Architecture.__default is None:
+        Architecture.__default = cls.__privateMachineChoice()
+      return Architecture.__default
+
+  ####################################################################
+  # Protected methods
+  ####################################################################
+
+  ####################################################################
+  # Private methods
+  ####################################################################
+  @classmethod
+  def __privateCapabilities(cls, name, item):
+    return ArchitectureCapabilities(name,
+                                    item.is32Bit,
+                                    item.is64Bit,
+                                    item.isFedoraSecondary,
+                                    item.lacksHardwareData,
+                                    item.requiresExternalStorage,
+                                    item.virtualizationFlag)
+
+  ####################################################################
+  @classmethod
+  def __privateMachineChoice(cls):
     default = platform.machine().lower()
     # Differing systems may use different values for 'machine'.
     # At present the only such known case is for ARM on Linux vs
@@ -76,11 +169,3 @@ class Architecture(factory.Factory, defaults.DefaultsFileInfo):
 
     return default
 
-  ####################################################################
-  # Protected methods
-  ####################################################################
-
-  ####################################################################
-  # Private methods
-  ####################################################################
-
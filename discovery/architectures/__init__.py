@@ -5,12 +5,15 @@
 #
 from __future__ import print_function
 
-from .Architecture import Architecture
+from .Architecture import Architecture, ArchitectureCapabilities
 from .ARM import AArch64, Armhfp
 from .PPC import PPC64LE
 from .S390 import S390X
 from .X86 import I386, X86_64
 
+# All the architectures having been defined their capabilities are tabulated.
+Architecture.tabulateCapabilities()
+
 from mill import factory
 def arches():
   factory.FactoryShell(Architecture).printChoices()
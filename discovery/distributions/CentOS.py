@@ -14,6 +14,12 @@ class CentOS(Distribution):
   # Available for use.
   _available = True
 
+  # The repo root of the special repos distribution of each distribution,
+  # None if it isn't available, indexed by (module, name, architecture).
+  # Each is a tuple of the distributions' mapping from which it was
+  # determined and the root.
+  __specialRepoRoots = {}
+
   ####################################################################
   # Public methods
   ####################################################################
@@ -24,14 +30,21 @@ class CentOS(Distribution):
   @property
   def specialRepoRoots(self):
     roots = super(CentOS, self).specialRepoRoots
-    try:
-      roots.append(self.makeItem(
-                    self._distroDefault(
-                      self.defaults([self.versionName, "specialRepos"])),
-                    architecture = self.architecture).repoRoot)
-    except DistributionUnknownCombinationException:
-      # The defaults specifies a distribution that isn't available.
-      pass
+    # The root depends only on the available distributions; it is determined
+    # anew only if they have been recreated.
+    key = (type(self).__module__, self.name(), self.architecture)
+    mapping = self._mapping((None, self.architecture))
+    (determined, root) = CentOS.__specialRepoRoots.get(key, (None, None))
+    if determined is not mapping:
+      try:
+        root = self.makeItem(self._distroSectionDefault("specialRepos"),
+                             architecture = self.architecture).repoRoot
+      except DistributionUnknownCombinationException:
+        # The defaults specifies a distribution that isn't available.
+        root = None
+      CentOS.__specialRepoRoots[key] = (mapping, root)
+    if root is not None:
+      roots.append(root)
     return roots
 
   ####################################################################
@@ -0,0 +1,218 @@
+#
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright Red Hat
+#
+import errno
+import json
+import logging
+import os
+import socket
+import socketserver
+import threading
+
+from discovery import architectures, repos
+from .Distribution import Distribution, DistributionException
+
+log = logging.getLogger(__name__)
+
+######################################################################
+######################################################################
+class _DaemonRequestHandler(socketserver.StreamRequestHandler):
+
+  ####################################################################
+  # Overridden methods
+  ####################################################################
+  def handle(self):
+    line = self.rfile.readline()
+    try:
+      request = json.loads(line.decode("UTF-8"))
+      response = { "result" : self.server.daemon.query(request) }
+    except (ValueError, KeyError, TypeError, DistributionException) as ex:
+      response = { "error" : "{0}".format(ex) }
+    self.wfile.write("{0}\n".format(json.dumps(response)).encode("UTF-8"))
+
+######################################################################
+######################################################################
+class _DaemonServer(socketserver.ThreadingMixIn,
+                    socketserver.UnixStreamServer):
+  daemon_threads = True
+
+  ####################################################################
+  # Overridden methods
+  ####################################################################
+  def __init__(self, path, daemon):
+    self.daemon = daemon
+    socketserver.UnixStreamServer.__init__(self, path, _DaemonRequestHandler)
+
+######################################################################
+######################################################################
+class DiscoveryDaemon(object):
+  """Long-running process which keeps discovered repository roots and the
+  distributions created from them warm in memory and answers queries for
+  them, via repos.DaemonClient, on a local Unix socket.
+
+  The supported queries are:
+
+    availableRoots, availableLatestRoots, availableNightlyRoots
+      parameters: repository, architecture
+      result:     the repository's roots
+
+    choices
+      parameters: category, architecture
+      result:     the names of the available distributions
+
+    makeItem
+      parameters: name, category, architecture
+      result:     a dictionary of the family, majorVersion, minorVersion and
+                  repoRoot from which the distribution is created; empty if
+                  there is no such distribution
+
+  Every 'refresh' seconds the in-memory state is discarded and rebuilt from
+  the on-disk caches, rescanning those due to be refreshed.
+  """
+
+  ####################################################################
+  # Public methods
+  ####################################################################
+  def query(self, request):
+    """Returns the result of the query described by the request dictionary.
+    """
+    query = request["query"]
+    category = request.get("category")
+    if category is None:
+      category = self.__distribution.defaultCategory()
+    architecture = request.get("architecture")
+    if architecture is None:
+      architecture = architectures.Architecture.defaultChoice()
+
+    if query in ("availableRoots", "availableLatestRoots",
+                 "availableNightlyRoots"):
+      with self.__lock:
+        repository = self.__repositories[request["repository"]]
+      return getattr(repository, query)(architecture)
+
+    if query == "choices":
+      return self.__distribution.categoryMappingChoices()[category](
+                                                                architecture)
+
+    if query == "makeItem":
+      mapping = self.__distribution._mapping((category, architecture))
+      if request["name"] not in mapping:
+        return {}
+      klass = mapping[request["name"]]
+      return { "family"       : klass.__bases__[0].className(),
+               "majorVersion" : klass._majorVersion,
+               "minorVersion" : klass._minorVersion,
+               "repoRoot"     : klass._repoRoot }
+
+    raise ValueError("unknown query: {0}".format(query))
+
+  ####################################################################
+  def serve(self):
+    """Serves queries until shut down or interrupted.
+    """
+    try:
+      os.makedirs(os.path.dirname(self.__path), 0o700)
+    except OSError as ex:
+      if ex.errno != errno.EEXIST:
+        raise
+    self.__privateRemoveStaleSocket()
+    self.__server = _DaemonServer(self.__path, self)
+    try:
+      os.chmod(self.__path, 0o600)
+      log.info("discovery daemon listening on {0}".format(self.__path))
+      refresher = threading.Thread(target = self.__privateRefreshLoop,
+                                   name = "discovery daemon refresh")
+      refresher.daemon = True
+      refresher.start()
+      self.__server.serve_forever()
+    finally:
+      self.__stopped.set()
+      self.__server.server_close()
+      os.unlink(self.__path)
+
+  ####################################################################
+  def shutdown(self):
+    """Stops serving queries; may be called from any thread other than that
+    serving.
+    """
+    self.__stopped.set()
+    if self.__server is not None:
+      self.__server.shutdown()
+
+  ####################################################################
+  # Overridden methods
+  ####################################################################
+  def __init__(self, path, refresh, distribution = Distribution):
+    super(DiscoveryDaemon, self).__init__()
+    self.__path = path
+    self.__refresh = refresh
+    self.__distribution = distribution
+    self.__lock = threading.Lock()
+    self.__repositories = {}
+    self.__server = None
+    self.__stopped = threading.Event()
+
+    # Queries answered by the daemon must be discovered in-process.
+    repos.Repository.useDaemon(False)
+    self.__privateWarm()
+
+  ####################################################################
+  # Private methods
+  ####################################################################
+  def __privateRefreshLoop(self):
+    while not self.__stopped.wait(self.__refresh):
+      log.info("refreshing discovery daemon")
+      try:
+        repos.Repository.clearCachedContents()
+        repos.Repository.invalidateRoots()
+        self.__privateWarm()
+      except Exception as ex:
+        log.warn("discovery daemon refresh failed: {0}".format(ex))
+
+  ####################################################################
+  def __privateRemoveStaleSocket(self):
+    """Removes the socket left by a daemon which is no longer running.
+    """
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+      probe.connect(self.__path)
+    except socket.error as ex:
+      if ex.errno == errno.ECONNREFUSED:
+        log.debug("removing stale socket {0}".format(self.__path))
+        os.unlink(self.__path)
+      elif ex.errno != errno.ENOENT:
+        raise
+    else:
+      raise socket.error(errno.EADDRINUSE,
+                         "discovery daemon already listening on {0}"
+                          .format(self.__path))
+    finally:
+      probe.close()
+
+  ####################################################################
+  def __privateWarm(self):
+    """Discovers the roots of every repository for every architecture and
+    then replaces those being served, and recreates the distributions of
+    every category and architecture from them.
+    """
+    repositories = dict([(choice, repos.Repository.makeItem(choice))
+                         for choice in repos.Repository.choices()])
+    for repository in repositories.values():
+      for architecture in architectures.Architecture.choices():
+        repository.availableRoots(architecture)
+        repository.availableLatestRoots(architecture)
+        repository.availableNightlyRoots(architecture)
+
+    with self.__lock:
+      self.__repositories = repositories
+
+    self.__distribution.clearMappings()
+    for category in self.__distribution.categoryMappingChoices():
+      for mapping in self.__distribution.mappingsFor(
+                              architectures.Architecture.choices(),
+                              category).values():
+        for name in mapping:
+          # Accessing the distribution creates its class.
+          mapping[name]
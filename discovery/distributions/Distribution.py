@@ -3,16 +3,17 @@
 #
 # Copyright Red Hat
 #
+import collections.abc
 import errno
 import logging
 import os
 import re
 import string
 import subprocess
-import yaml
+import threading
 
 from mill import defaults, factory
-from discovery import architectures
+from discovery import architectures, repos
 
 log = logging.getLogger(__name__)
 
@@ -54,6 +55,190 @@ class DistributionUnknownCombinationException(DistributionException):
                                                                   *args,
                                                                   **kwargs)
 
+########################################################################
+########################################################################
+class _DistributionMapping(collections.abc.Mapping):
+  """Mapping, by name, of the distributions of an architecture created from
+  the roots of the distribution families.
+
+  A family's roots are obtained, via rootsFunction(family), only when the
+  mapping is iterated.  Accessing a distribution obtains, via
+  rootsFunction(family, version), only the root of its family and version;
+  e.g., "rhel810" only obtains that of RHEL 8.10.  Each distribution's
+  class is created, via distribution._makeDistributionMapping, only when it
+  is accessed.
+  """
+
+  ####################################################################
+  # Public methods
+  ####################################################################
+  def parameters(self, name):
+    """Returns the parameters, as from _makeDynamicClassParameters, of the
+    named distribution without creating its class.
+    """
+    (family, roots) = self.__privateLookup(name)
+    return self.__distribution._makeDynamicClassParameters(
+                                                self.__architecture,
+                                                { family : roots })[name]
+
+  ####################################################################
+  def discover(self):
+    """Obtains the roots of all the families.
+    """
+    for family in self.__families:
+      self.__privateFamilyRoots(family)
+
+  ####################################################################
+  # Overridden methods
+  ####################################################################
+  def __init__(self, distribution, architecture, families, rootsFunction):
+    super(_DistributionMapping, self).__init__()
+    self.__distribution = distribution
+    self.__architecture = architecture
+    self.__families = families
+    self.__rootsFunction = rootsFunction
+    self.__lock = threading.RLock()
+    # Indexed by family, the roots of each of its distributions by name.
+    self.__familyRoots = {}
+    # Likewise, indexed by (family, version), for only that of the version.
+    self.__versionRoots = {}
+    self.__classes = {}
+
+  ####################################################################
+  def __contains__(self, name):
+    try:
+      self.__privateLookup(name)
+    except KeyError:
+      return False
+    return True
+
+  ####################################################################
+  def __getitem__(self, name):
+    with self.__lock:
+      if name not in self.__classes:
+        (family, roots) = self.__privateLookup(name)
+        log.debug("creating {0} {1} class".format(self.__architecture, name))
+        with repos.Repository.tracer().span(
+                                        "createDistribution",
+                                        vendor = family.className().lower(),
+                                        architecture = self.__architecture,
+                                        distribution = name):
+          self.__classes[name] = (
+            self.__distribution._makeDistributionMapping(
+                                                    self.__architecture,
+                                                    { family : roots })[name])
+      return self.__classes[name]
+
+  ####################################################################
+  def __iter__(self):
+    names = []
+    for family in self.__families:
+      names.extend(self.__privateFamilyRoots(family).keys())
+    return iter(names)
+
+  ####################################################################
+  def __len__(self):
+    return sum([ len(self.__privateFamilyRoots(family))
+                 for family in self.__families ])
+
+  ####################################################################
+  # Private methods
+  ####################################################################
+  def __privateFamilyRoots(self, family):
+    """Returns a dictionary, indexed by name, of the roots, as a single entry
+    dictionary of those of the family, of each of the family's distributions.
+    """
+    with self.__lock:
+      if family not in self.__familyRoots:
+        log.debug("obtaining {0} {1} roots".format(self.__architecture,
+                                                   family.className()))
+        with repos.Repository.tracer().span(
+                                        "distributionRoots",
+                                        vendor = family.className().lower(),
+                                        architecture = self.__architecture):
+          self.__familyRoots[family] = self.__privateNames(
+                                                family,
+                                                self.__rootsFunction(family))
+      return self.__familyRoots[family]
+
+  ####################################################################
+  def __privateLookup(self, name):
+    """Returns a tuple of the family and roots of the named distribution.
+
+    Only the roots of the families whose names prefix the version in name
+    are obtained and, unless those of the family have been, only those of
+    the possible versions whose majors are no less than the family's
+    minimum.  Raises KeyError if there is no such distribution.
+    """
+    for family in self.__families:
+      prefix = family.className().lower()
+      version = name[len(prefix):]
+      if not (name.startswith(prefix) and version.isdigit()):
+        continue
+
+      with self.__lock:
+        familyRoots = self.__familyRoots.get(family)
+      if familyRoots is not None:
+        roots = familyRoots.get(name)
+      else:
+        # The version is the major followed by the minor, if any; e.g., 810
+        # is 8.10 and 38 is 38.  Neither has leading zeros, as formatted by
+        # _makeDynamicClassParameters, and a family with a minimum minor has
+        # minors.
+        (minimumMajor, minimumMinor) = family._minimumVersion()
+        longest = len(version) - (0 if minimumMinor is None else 1)
+        roots = None
+        for length in range(1, longest + 1):
+          (major, minor) = (version[:length], version[length:])
+          if ((int(major) < int(minimumMajor))
+              or major.startswith("0")
+              or ((len(minor) > 1) and minor.startswith("0"))):
+            continue
+          roots = self.__privateVersionRoots(
+                    family,
+                    major if len(minor) == 0
+                          else "{0}.{1}".format(major, minor)).get(name)
+          if roots is not None:
+            break
+      if roots is not None:
+        return (family, roots)
+    raise KeyError(name)
+
+  ####################################################################
+  def __privateNames(self, family, familyRoots):
+    """Returns a dictionary, indexed by name, of each of the family's roots
+    as a single entry dictionary.
+    """
+    names = {}
+    for (key, value) in familyRoots.items():
+      roots = { key : value }
+      for name in self.__distribution._makeDynamicClassParameters(
+                                                  self.__architecture,
+                                                  { family : roots }):
+        names[name] = roots
+    return names
+
+  ####################################################################
+  def __privateVersionRoots(self, family, version):
+    """Returns a dictionary as __privateFamilyRoots of only the family's
+    distribution of the version, if any.
+    """
+    with self.__lock:
+      if (family, version) not in self.__versionRoots:
+        log.debug("obtaining {0} {1} {2} root".format(self.__architecture,
+                                                      family.className(),
+                                                      version))
+        with repos.Repository.tracer().span(
+                                        "distributionRoots",
+                                        vendor = family.className().lower(),
+                                        architecture = self.__architecture,
+                                        version = version):
+          self.__versionRoots[(family, version)] = self.__privateNames(
+                                                family,
+                                                self.__rootsFunction(family,
+                                                                     version))
+      return self.__versionRoots[(family, version)]
+
 ########################################################################
 ########################################################################
 class Distribution(factory.Factory, defaults.DefaultsFileInfo):
@@ -63,11 +248,33 @@ class Distribution(factory.Factory, defaults.DefaultsFileInfo):
   # Factory-behavior attributes.
   ####################################################################
   # These dictionaries are indexed by architecture.  Each such accessed
-  # item is a dictionary, indexed by distribution, which contains the
-  # distributions available for the architecture.
+  # item is a _DistributionMapping, indexed by distribution, which contains
+  # the distributions available for the architecture.  They are discarded,
+  # and the distributions recreated, when the repositories' roots change;
+  # i.e., their roots generation is not that from which they were created.
   __mappingLatest = None
   __mappingNightly = None
   __mappingReleased = None
+  __mappingGeneration = None
+  __mappingLock = threading.Lock()
+
+  # Indexed by (category, architecture).  Each such item is a tuple of the
+  # distributions' mapping from which it was built and a dictionary, indexed
+  # by family, of the family's distributions newest first.
+  __familyIndexes = None
+
+  # A tuple of the distributions' mapping from which it was determined and the
+  # default choice.
+  __defaultChoice = None
+
+  # The regex-keyed defaults sections (see _distroSectionDefault) compiled for
+  # dispatch, indexed by (module, versionName, section), and the value each
+  # determines for a distribution, indexed by (module, name, section).  The
+  # module, that of the distribution's class, determines the defaults used.
+  # Shared by all distributions.
+  __distroDefaultSections = {}
+  __distroDefaultValues = {}
+  __distroDefaultLock = threading.Lock()
 
   ####################################################################
   # Instance-behavior attributes.
@@ -77,6 +284,9 @@ class Distribution(factory.Factory, defaults.DefaultsFileInfo):
   _repoRoot = None
   _architecture = None
 
+  # Text in the repo root of released distributions.
+  _repoRootReleasedIndicator = "released"
+
   ####################################################################
   # Public factory-behavior methods
   ####################################################################
@@ -102,12 +312,25 @@ class Distribution(factory.Factory, defaults.DefaultsFileInfo):
   ####################################################################
   @classmethod
   def choicesLatest(cls, architecture = None):
-    return super(Distribution, cls).choices(("latest", architecture))
+    return cls.__privateChoices(("latest", architecture))
 
   ####################################################################
   @classmethod
   def choicesNightly(cls, architecture = None):
-    return super(Distribution, cls).choices(("nightly", architecture))
+    return cls.__privateChoices(("nightly", architecture))
+
+  ####################################################################
+  @classmethod
+  def clearMappings(cls):
+    """Discards the distributions created for the available roots; they are
+    recreated as next needed.
+    """
+    with cls.__mappingLock:
+      cls.__mappingLatest = None
+      cls.__mappingNightly = None
+      cls.__mappingReleased = None
+    cls.__familyIndexes = None
+    cls.__defaultChoice = None
 
   ####################################################################
   @classmethod
@@ -133,6 +356,29 @@ class Distribution(factory.Factory, defaults.DefaultsFileInfo):
   def makeItemNightly(cls, itemName, args = None, architecture = None):
     return cls._makeItemCommon(itemName, args, ("nightly", architecture))
 
+  ####################################################################
+  @classmethod
+  def mappingsFor(cls, architectures, category = None):
+    """Returns a dictionary, keyed by architecture, of the mappings of the
+    distributions of the category, by default the default category, for each
+    of the architectures.
+
+    The distributions of the architectures are discovered concurrently, the
+    listings retrieved being shared among them.
+    """
+    from concurrent import futures
+
+    architectures = list(architectures)
+
+    def discover(architecture):
+      mapping = cls._mapping((category, architecture))
+      mapping.discover()
+      return mapping
+
+    with futures.ThreadPoolExecutor(
+                          max_workers = max(1, len(architectures))) as executor:
+      return dict(zip(architectures, executor.map(discover, architectures)))
+
   ####################################################################
   # Public instance-behavior methods
   ####################################################################
@@ -143,8 +389,7 @@ class Distribution(factory.Factory, defaults.DefaultsFileInfo):
   ####################################################################
   @property
   def bootOptions(self):
-    return self._distroDefault(self.defaults([self.versionName,
-                                              "bootOptions"]))
+    return self._distroSectionDefault("bootOptions")
 
   ####################################################################
   @property
@@ -159,7 +404,7 @@ class Distribution(factory.Factory, defaults.DefaultsFileInfo):
   ####################################################################
   @property
   def kickStart(self):
-    return self._distroDefault(self.defaults([self.versionName, "kickStart"]))
+    return self._distroSectionDefault("kickStart")
 
   ####################################################################
   @property
@@ -240,12 +485,18 @@ class Distribution(factory.Factory, defaults.DefaultsFileInfo):
   ####################################################################
   @classmethod
   def choices(cls, architecture = None):
-    return super(Distribution, cls).choices((None, architecture))
+    return cls.__privateChoices((None, architecture))
 
   ####################################################################
   @classmethod
   def _defaultChoice(cls):
-    from . import Fedora
+    # The default depends only on the available distributions; it is
+    # determined anew only if they have been recreated.
+    mapping = cls._mapping()
+    if cls.__defaultChoice is not None:
+      (determined, defaultChoice) = cls.__defaultChoice
+      if determined is mapping:
+        return defaultChoice
 
     defaultDistribution = cls.defaults(["distribution"])
     family = cls.defaults(["family"], defaultDistribution)
@@ -258,39 +509,22 @@ class Distribution(factory.Factory, defaults.DefaultsFileInfo):
                                        major,
                                        minor if minor is not None else "")
 
-    if defaultChoice not in cls.choices():
+    if defaultChoice not in mapping:
       # The specified distribution was not available.
       # Use the most recent released member of the specified family or, if
       # not available, the most recent member of the specified family.
-      defaultChoice = None
-
-      instances = [cls.makeItem(choice) for choice in cls.choices()]
-      familyInstances = dict([(float(instance.versionNumber), instance)
-                              for instance in instances
-                                if instance.versionName == family])
-      releasedInstances = dict(filter(lambda x: x[1].released,
-                                      familyInstances.items()))
-      if len(releasedInstances) > 0:
-        defaultChoice = releasedInstances[max(releasedInstances)].name()
-      elif len(familyInstances) > 0:
-        defaultChoice = familyInstances[max(familyInstances)].name()
+      familyIndex = cls._familyIndex()
+      defaultChoice = cls.__privateNewest(familyIndex.get(family, []))
 
       if defaultChoice is None:
         # Use the most recent released Fedora or, if not available, the most
         # recent Fedora.
-        fedoraInstances = dict([(float(instance.versionNumber), instance)
-                                for instance in instances
-                                  if isinstance(instance, Fedora)])
-        releasedInstances = dict(filter(lambda x: x[1].released,
-                                        fedoraInstances.items()))
-        if len(releasedInstances) > 0:
-          defaultChoice = releasedInstances[max(releasedInstances)].name()
-        elif len(fedoraInstances) > 0:
-          defaultChoice = fedoraInstances[max(fedoraInstances)].name()
+        defaultChoice = cls.__privateNewest(familyIndex.get("fedora", []))
 
       if defaultChoice is None:
         raise DistributionNoDefaultException()
 
+    cls.__defaultChoice = (mapping, defaultChoice)
     return defaultChoice
 
   ####################################################################
@@ -331,11 +565,13 @@ class Distribution(factory.Factory, defaults.DefaultsFileInfo):
     the defaults.
     """
     (major, minor) = cls._minimumVersion()
-    minimumVersion = float(major if minor is None
-                                  else "{0}.{1}".format(major, minor))
+    minimumVersion = repos.VersionIndex.parse(
+                      major if minor is None
+                            else "{0}.{1}".format(major, minor))
 
     roots = dict([(key, value) for (key, value) in roots.items()
-                                if float(key) >= minimumVersion])
+                                if repos.VersionIndex.parse(key)
+                                    >= minimumVersion])
     return roots
 
   ####################################################################
@@ -353,11 +589,53 @@ class Distribution(factory.Factory, defaults.DefaultsFileInfo):
 
   ####################################################################
   @classmethod
-  def _latestRoots(cls, architecture):
-    """Returns the available latest roots for the specified architecture
-    filtered by the limits specified in the defaults file.
+  def _familyIndex(cls, option = None):
+    """Returns a dictionary, indexed by family, of a list of the family's
+    available distributions, newest first, as (version, name, released);
+    version is a tuple of integers.
+
+    'option' is as for _mapping.  The index is built from the distributions'
+    parameters, without creating or instantiating them, and is kept until the
+    distributions are recreated.
     """
-    return cls._allowableRoots(cls._repo().availableLatestRoots(architecture))
+    (category, architecture) = cls._decodeOption(option)
+    mapping = cls._mapping((category, architecture))
+
+    if cls.__familyIndexes is None:
+      cls.__familyIndexes = {}
+    (indexed, index) = cls.__familyIndexes.get((category, architecture),
+                                               (None, None))
+    if indexed is not mapping:
+      index = {}
+      for name in mapping:
+        parameters = mapping.parameters(name)
+        klass = parameters["baseClasses"][0]
+        attributes = parameters["attributes"]
+        version = ((attributes["_majorVersion"],)
+                    if attributes["_minorVersion"] is None
+                    else (attributes["_majorVersion"],
+                          attributes["_minorVersion"]))
+        released = (klass._repoRootReleasedIndicator
+                      in attributes["_repoRoot"])
+        index.setdefault(klass._versionName(), []).append((version,
+                                                           name,
+                                                           released))
+      for entries in index.values():
+        entries.sort(key = lambda entry: entry[0], reverse = True)
+      cls.__familyIndexes[(category, architecture)] = (mapping, index)
+    return index
+
+  ####################################################################
+  @classmethod
+  def _latestRoots(cls, architecture, version = None):
+    """Returns the available latest roots for the specified architecture,
+    limited to that of version if specified, filtered by the limits
+    specified in the defaults file.
+    """
+    repo = cls._repo()
+    return cls._allowableRoots(
+            repo.availableLatestRoots(architecture) if version is None
+              else repo.versionRoots(version, "latest", architecture))
 
   ####################################################################
   @classmethod
@@ -412,9 +690,11 @@ class Distribution(factory.Factory, defaults.DefaultsFileInfo):
   def _makeItemCommon(cls, itemName, args = None, option = None):
     (category, architecture) = cls._decodeOption(option)
     try:
-      item = super(Distribution, cls).makeItem(itemName,
-                                               args,
-                                               (category, architecture))
+      item = cls.__privateDaemonItem(itemName, args, category, architecture)
+      if item is None:
+        item = super(Distribution, cls).makeItem(itemName,
+                                                 args,
+                                                 (category, architecture))
     except ValueError:
       raise DistributionUnknownCombinationException(
               "unknown {0} combination: {1}/{2}".format(cls.className(),
@@ -425,59 +705,59 @@ class Distribution(factory.Factory, defaults.DefaultsFileInfo):
   ####################################################################
   @classmethod
   def _mappingLatest(cls, architecture):
-    if cls.__mappingLatest is None:
-      cls.__mappingLatest = {}
+    with cls.__mappingLock:
+      cls.__privateDiscardStaleMappings()
+      if cls.__mappingLatest is None:
+        cls.__mappingLatest = {}
 
-    if architecture not in cls.__mappingLatest:
-      log.debug("creating {0} 'latest' classes".format(architecture))
+      if architecture not in cls.__mappingLatest:
+        log.debug("creating {0} 'latest' mapping".format(architecture))
 
-      cls.__mappingLatest[architecture] = (
-        cls._makeDistributionMapping(
-                                architecture,
-                                dict([(klass,
-                                       klass._latestRoots(architecture))
-                                      for klass in
-                                        super(Distribution,
-                                              cls)._mapping().values()])))
-    return cls.__mappingLatest[architecture]
+        cls.__mappingLatest[architecture] = _DistributionMapping(
+                            cls,
+                            architecture,
+                            cls.__privateFamilies(),
+                            lambda klass, version = None:
+                              klass._latestRoots(architecture, version))
+      return cls.__mappingLatest[architecture]
 
   ####################################################################
   @classmethod
   def _mappingNightly(cls, architecture):
-    if cls.__mappingNightly is None:
-      cls.__mappingNightly = {}
+    with cls.__mappingLock:
+      cls.__privateDiscardStaleMappings()
+      if cls.__mappingNightly is None:
+        cls.__mappingNightly = {}
 
-    if architecture not in cls.__mappingNightly:
-      log.debug("creating {0} 'nightly' classes".format(architecture))
+      if architecture not in cls.__mappingNightly:
+        log.debug("creating {0} 'nightly' mapping".format(architecture))
 
-      cls.__mappingNightly[architecture] = (
-        cls._makeDistributionMapping(
-                                architecture,
-                                dict([(klass,
-                                       klass._nightlyRoots(architecture))
-                                      for klass in
-                                        super(Distribution,
-                                              cls)._mapping().values()])))
-    return cls.__mappingNightly[architecture]
+        cls.__mappingNightly[architecture] = _DistributionMapping(
+                            cls,
+                            architecture,
+                            cls.__privateFamilies(),
+                            lambda klass, version = None:
+                              klass._nightlyRoots(architecture, version))
+      return cls.__mappingNightly[architecture]
 
   ####################################################################
   @classmethod
   def _mappingReleased(cls, architecture):
-    if cls.__mappingReleased is None:
-      cls.__mappingReleased = {}
+    with cls.__mappingLock:
+      cls.__privateDiscardStaleMappings()
+      if cls.__mappingReleased is None:
+        cls.__mappingReleased = {}
 
-    if architecture not in cls.__mappingReleased:
-      log.debug("creating {0} 'released' classes".format(architecture))
+      if architecture not in cls.__mappingReleased:
+        log.debug("creating {0} 'released' mapping".format(architecture))
 
-      cls.__mappingReleased[architecture] = (
-        cls._makeDistributionMapping(
-                                architecture,
-                                dict([(klass,
-                                       klass._releasedRoots(architecture))
-                                      for klass in
-                                        super(Distribution,
-                                              cls)._mapping().values()])))
-    return cls.__mappingReleased[architecture]
+        cls.__mappingReleased[architecture] = _DistributionMapping(
+                            cls,
+                            architecture,
+                            cls.__privateFamilies(),
+                            lambda klass, version = None:
+                              klass._releasedRoots(architecture, version))
+      return cls.__mappingReleased[architecture]
 
   ####################################################################
   @classmethod
@@ -486,26 +766,35 @@ class Distribution(factory.Factory, defaults.DefaultsFileInfo):
 
   ####################################################################
   @classmethod
-  def _nightlyRoots(cls, architecture):
-    """Returns the available nightly roots for the specified architecture
-    filtered by the limits specified in the defaults file.
+  def _nightlyRoots(cls, architecture, version = None):
+    """Returns the available nightly roots for the specified architecture,
+    limited to that of version if specified, filtered by the limits
+    specified in the defaults file.
     """
-    return cls._allowableRoots(cls._repo().availableNightlyRoots(architecture))
+    repo = cls._repo()
+    return cls._allowableRoots(
+            repo.availableNightlyRoots(architecture) if version is None
+              else repo.versionRoots(version, "nightly", architecture))
 
   ####################################################################
   @classmethod
-  def _releasedRoots(cls, architecture):
-    """Returns the available released roots for the specified architecture
-    filtered by the limits specified in the defaults file.
+  def _releasedRoots(cls, architecture, version = None):
+    """Returns the available released roots for the specified architecture,
+    limited to that of version if specified, filtered by the limits
+    specified in the defaults file.
     """
-    return cls._allowableRoots(cls._repo().availableRoots(architecture))
+    repo = cls._repo()
+    return cls._allowableRoots(
+            repo.availableRoots(architecture) if version is None
+              else repo.versionRoots(version, "released", architecture))
 
   ####################################################################
   @classmethod
   def _repo(cls):
-    """Returns an instance of the repo class associated with the distribution.
+    """Returns the shared instance of the repo class associated with the
+    distribution.
     """
-    return cls._repoClass()()
+    return cls._repoClass().instance()
 
   ####################################################################
   @classmethod
@@ -535,8 +824,153 @@ class Distribution(factory.Factory, defaults.DefaultsFileInfo):
     where the first-level keys are regexes to match all distributions with a
     specific prefix.
     """
-    regexMatches = list(filter(lambda x: re.match(x, self.name()) is not None,
-                               sourceDictionary.keys()))
+    return self.__privateDistroDefault(
+                      self.__privateCompileDistroDefault(sourceDictionary))
+
+  ####################################################################
+  def _distroSectionDefault(self, section):
+    """Returns the value, as per _distroDefault, for the distribution of the
+    named section of its family's defaults.
+
+    Each section is compiled once and the value it determines for each
+    distribution, including any error in doing so, is determined once.
+    """
+    key = (type(self).__module__, self.name(), section)
+    with Distribution.__distroDefaultLock:
+      if key not in Distribution.__distroDefaultValues:
+        try:
+          value = (self.__privateDistroSectionDefault(section), None)
+        except defaults.DefaultsFileFormatException as ex:
+          # The error's arguments, not the exception itself, are retained; a
+          # retained exception would accumulate the traceback of every
+          # raise.
+          value = (None, ex.args)
+        Distribution.__distroDefaultValues[key] = value
+      (value, error) = Distribution.__distroDefaultValues[key]
+    if error is not None:
+      raise defaults.DefaultsFileFormatException(*error)
+    return value
+
+  ####################################################################
+  @property
+  def _familyPrefix(self):
+    raise NotImplementedError
+
+  ####################################################################
+  # Private factory-behavior methods
+  ####################################################################
+  @classmethod
+  def __privateChoices(cls, option):
+    """Returns the choices, per option as for _mapping, reported by the
+    discovery daemon if reachable, otherwise those available in-process.
+    """
+    (category, architecture) = cls._decodeOption(option)
+    choices = repos.Repository.instance().daemonQuery(
+                                            "choices",
+                                            category = category,
+                                            architecture = architecture)
+    if choices is None:
+      choices = super(Distribution, cls).choices((category, architecture))
+    return choices
+
+  ####################################################################
+  @classmethod
+  def __privateDaemonItem(cls, itemName, args, category, architecture):
+    """Returns an instance of the named distribution as described by the
+    discovery daemon, creating only its class, or None if the daemon is not
+    reachable or the distribution is not of one of the families.  Raises
+    ValueError if the daemon has no such distribution.
+    """
+    description = repos.Repository.instance().daemonQuery(
+                                                "makeItem",
+                                                name = itemName,
+                                                category = category,
+                                                architecture = architecture)
+    if description is None:
+      return None
+    if len(description) == 0:
+      raise ValueError(itemName)
+
+    family = dict([ (klass.className(), klass)
+                    for klass in cls.__privateFamilies() ]).get(
+                                                      description["family"])
+    if family is None:
+      # Not a family of this process's distributions.
+      return None
+    version = ("{0}".format(description["majorVersion"])
+                if description["minorVersion"] is None
+                else "{0}.{1}".format(description["majorVersion"],
+                                      description["minorVersion"]))
+    klass = cls._makeDistributionMapping(
+              architecture,
+              { family : { version : description["repoRoot"] } })[itemName]
+    return klass(args)
+
+  ####################################################################
+  @classmethod
+  def __privateDiscardStaleMappings(cls):
+    """Discards the mappings if the repositories' roots have changed since
+    they were created; called with the mapping lock held.
+    """
+    generation = repos.Repository.rootsGeneration()
+    if cls.__mappingGeneration != generation:
+      cls.__mappingLatest = None
+      cls.__mappingNightly = None
+      cls.__mappingReleased = None
+      cls.__mappingGeneration = generation
+
+  ####################################################################
+  @classmethod
+  def __privateFamilies(cls):
+    """Returns the available classes from which distributions are created;
+    distributions previously created, which are also available, are excluded.
+    """
+    return [ klass for klass in super(Distribution, cls)._mapping().values()
+                     if klass._majorVersion is None ]
+
+  ####################################################################
+  @classmethod
+  def __privateNewest(cls, entries):
+    """Returns the name of the newest released of the entries, as from
+    _familyIndex, or, if none are released, of the newest; None if there are
+    no entries.
+    """
+    for (_, name, released) in entries:
+      if released:
+        return name
+    return entries[0][1] if len(entries) > 0 else None
+
+  ####################################################################
+  # Private instance-behavior methods
+  ####################################################################
+  def __privateCompileDistroDefault(self, sourceDictionary):
+    """Returns a tuple of the section's dictionary and a list of each of its
+    first-level keys, its compiled regex and a list of each of the key's
+    keys and their compiled regexes.
+    """
+    return (sourceDictionary,
+            [ (key,
+               re.compile(key),
+               [ (distroKey, re.compile(distroKey))
+                 for distroKey in (sourceDictionary[key].keys()
+                                    if isinstance(sourceDictionary[key], dict)
+                                    else []) ])
+              for key in sourceDictionary.keys() ])
+
+  ####################################################################
+  def __privateDistroDefault(self, compiled):
+    """Returns the value for the distribution of the compiled section, as
+    from __privateCompileDistroDefault, as per _distroDefault.
+
+    Raises DefaultsFileFormatException if multiple regexes of a level match
+    the distribution.
+    """
+    (sourceDictionary, regexes) = compiled
+
+    regexMatches = [ (key, distroRegexes) for (key, regex, distroRegexes)
+                                            in regexes
+                                            if regex.match(self.name())
+                                              is not None ]
     if len(regexMatches) > 1:
       raise defaults.DefaultsFileFormatException(
                                                 "multiple regex matches found")
@@ -545,33 +979,28 @@ class Distribution(factory.Factory, defaults.DefaultsFileInfo):
     if len(regexMatches) == 0:
       default = self.defaults(["default"], sourceDictionary)
     else:
-      distroMatches = list(
-                        filter(lambda x: re.match(x, self.name()) is not None,
-                               sourceDictionary[regexMatches[0]].keys()))
+      (regexKey, distroRegexes) = regexMatches[0]
+      distroMatches = [ key for (key, regex) in distroRegexes
+                              if regex.match(self.name()) is not None ]
       if len(distroMatches) > 1:
         raise defaults.DefaultsFileFormatException(
                                         "multiple distribution matches found")
       if len(distroMatches) == 0:
-        default = self.defaults(["default"], sourceDictionary[regexMatches[0]])
+        default = self.defaults(["default"], sourceDictionary[regexKey])
       else:
-        default = sourceDictionary[regexMatches[0]][distroMatches[0]]
+        default = sourceDictionary[regexKey][distroMatches[0]]
 
     return default
 
   ####################################################################
-  @property
-  def _familyPrefix(self):
-    raise NotImplementedError
-
-  ####################################################################
-  @property
-  def _repoRootReleasedIndicator(self):
-    return "released"
-
-  ####################################################################
-  # Private factory-behavior methods
-  ####################################################################
-
-  ####################################################################
-  # Private instance-behavior methods
-  ####################################################################
+  def __privateDistroSectionDefault(self, section):
+    """Returns the value for the distribution of the named section as per
+    _distroSectionDefault, compiling the section if need be.
+    """
+    sectionKey = (type(self).__module__, self.versionName, section)
+    if sectionKey not in Distribution.__distroDefaultSections:
+      Distribution.__distroDefaultSections[sectionKey] = (
+        self.__privateCompileDistroDefault(
+          self.defaults([self.versionName, section])))
+    return self.__privateDistroDefault(
+                            Distribution.__distroDefaultSections[sectionKey])
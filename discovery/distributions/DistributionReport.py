@@ -0,0 +1,121 @@
+#
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright Red Hat
+#
+import logging
+
+from .Distribution import Distribution, DistributionUnknownCombinationException
+
+log = logging.getLogger(__name__)
+
+######################################################################
+######################################################################
+class DistributionReport(object):
+  """Structured report of the available distributions of an architecture.
+
+  Each distribution of each category reported is instantiated once and all
+  of its reported properties gathered from that instance.  The report is a
+  dictionary suitable for serialization (e.g., as JSON or YAML):
+
+    architecture:         the architecture reported
+    defaultDistribution:  the name of the default distribution
+    categories:           keyed by category ("released", "latest" or
+                          "nightly"), a dictionary keyed by the name of each
+                          of the category's distributions of its properties
+                          (see properties and defaultProperties)
+  """
+  # The properties reported for each distribution.
+  properties = ("family", "majorVersion", "minorVersion", "repoRoot",
+                "released")
+
+  # The properties additionally reported for each distribution of the
+  # default category.
+  defaultProperties = ("specialRepoRoots", "bootOptions", "kickStart")
+
+  ####################################################################
+  # Public methods
+  ####################################################################
+  def categories(self):
+    """Returns a list of the categories which may be reported.
+    """
+    return [self.__distribution.defaultCategory(), "latest", "nightly"]
+
+  ####################################################################
+  def report(self, architecture, categories = None,
+             defaultDistribution = None):
+    """Returns the report for the architecture of the specified categories,
+    by default all of them.
+
+    The default distribution, if not specified, is determined.
+    """
+    if categories is None:
+      categories = self.categories()
+    if defaultDistribution is None:
+      defaultDistribution = self.__distribution.defaultDistribution()
+
+    return { "architecture"         : architecture,
+             "defaultDistribution"  : defaultDistribution,
+             "categories"           : dict([
+                                        (category,
+                                         self.__privateCategory(category,
+                                                                architecture))
+                                        for category in categories ]) }
+
+  ####################################################################
+  def reports(self, architectures, categories = None):
+    """Returns a dictionary, keyed by architecture, of the report for each of
+    the architectures of the specified categories, by default all of them.
+
+    The distributions of the architectures are discovered concurrently; see
+    Distribution.mappingsFor.
+    """
+    if categories is None:
+      categories = self.categories()
+
+    for category in categories:
+      self.__distribution.mappingsFor(architectures, category)
+    defaultDistribution = self.__distribution.defaultDistribution()
+    return dict([ (architecture, self.report(architecture, categories,
+                                             defaultDistribution))
+                  for architecture in architectures ])
+
+  ####################################################################
+  # Overridden methods
+  ####################################################################
+  def __init__(self, distribution = Distribution, args = None):
+    super(DistributionReport, self).__init__()
+    self.__distribution = distribution
+    self.__args = args
+
+  ####################################################################
+  # Private methods
+  ####################################################################
+  def __privateCategory(self, category, architecture):
+    """Returns a dictionary, keyed by name, of the properties of each of the
+    category's distributions for the architecture.
+    """
+    (choices, makeItem) = {
+      self.__distribution.defaultCategory() :
+        (self.__distribution.choices, self.__distribution.makeItem),
+      "latest"  : (self.__distribution.choicesLatest,
+                   self.__distribution.makeItemLatest),
+      "nightly" : (self.__distribution.choicesNightly,
+                   self.__distribution.makeItemNightly) }[category]
+
+    properties = self.properties
+    if category == self.__distribution.defaultCategory():
+      properties += self.defaultProperties
+
+    distributions = {}
+    for choice in choices(architecture):
+      try:
+        instance = makeItem(choice, self.__args, architecture)
+      except DistributionUnknownCombinationException:
+        log.debug("{0} {1} {2} not available".format(category, choice,
+                                                     architecture))
+        continue
+      distributions[instance.name()] = dict([
+                                        (name, getattr(instance, name))
+                                        for name in properties ])
+    return distributions
@@ -6,10 +6,15 @@
 from __future__ import print_function
 
 import argparse
+import json
+import sys
+import yaml
 
 from mill import command
 from discovery import architectures
-from .Distribution import Distribution, DistributionUnknownCombinationException
+from discovery.repos import Repository
+from .Distribution import Distribution
+from .DistributionReport import DistributionReport
 
 ########################################################################
 class DistrosCommand(command.Command):
@@ -48,12 +53,51 @@ class DistrosCommand(command.Command):
     default = architectures.Architecture.defaultChoice()
     parser.add_argument("--arch",
                         help = "report on available distributions" \
-                                " for architecture; DEFAULT = {0}".format(
-                                  default),
+                                " for architecture, or all architectures" \
+                                "; DEFAULT = {0}".format(default),
                         dest = "architecture",
-                        choices = names,
+                        choices = names + ["all"],
                         default = default)
 
+    parser.add_argument("--format",
+                        help = "format of the report; json and yaml report" \
+                                " the properties of each distribution as" \
+                                " structured data; DEFAULT = text",
+                        choices = ["text", "json", "yaml"],
+                        default = "text")
+
+    parser.add_argument("--serve",
+                        help = "run as a daemon which keeps discovered" \
+                                " distributions in memory and serves them" \
+                                " to other processes over a local socket",
+                        action = "store_true")
+
+    parser.add_argument("--stats",
+                        help = "report, on stderr, the requests made and the" \
+                                " caches used in discovery",
+                        action = "store_true")
+
+    parser.add_argument("--stats-prometheus",
+                        help = "write the requests made and the caches used" \
+                                " in discovery to the file, in the" \
+                                " Prometheus text format; e.g., for the" \
+                                " node exporter's textfile collector",
+                        metavar = "PATH",
+                        dest = "statsPrometheus")
+
+    parser.add_argument("--trace",
+                        help = "write the timing of each phase of discovery," \
+                                " and of each request made, to the file",
+                        metavar = "PATH")
+
+    parser.add_argument("--trace-format",
+                        help = "format of the trace; chrome is the Chrome" \
+                                " trace-event format (e.g., for" \
+                                " chrome://tracing or Perfetto), har is HAR" \
+                                " of the requests made; DEFAULT = chrome",
+                        choices = ["chrome", "har"],
+                        default = "chrome",
+                        dest = "traceFormat")
 
     parents = super(DistrosCommand, cls).parserParents()
     parents.append(parser)
@@ -63,69 +107,19 @@ class DistrosCommand(command.Command):
   # Overridden instance-behavior methods
   ####################################################################
   def run(self):
-    all = not (self.args.latest or self.args.nightly or self.args.released)
-
-    root = self._distributionRoot
+    if self.args.serve:
+      # Only the daemon uses its (socket server) modules.
+      from .DiscoveryDaemon import DiscoveryDaemon
 
-    command.CommandShell(root).printChoices()
+      repository = Repository()
+      DiscoveryDaemon(repository.daemonSocket,
+                      repository.daemonRefresh,
+                      self._distributionRoot).serve()
+      return
 
-    print("\nDefault distribution: {0}".format(
-          root.defaultDistribution()))
-
-    print("\nRoots {0}:".format(self.args.architecture))
-
-    if all or self.args.released:
-      print("\tDefault ({0}):".format(root.defaultCategory()))
-      for choice in root.choices():
-        try:
-          instance = root.makeItem(choice, self.args, self.args.architecture)
-          print("\t\t{0}: {1}".format(instance.name(), instance.repoRoot))
-        except DistributionUnknownCombinationException:
-          pass
-
-    if all or self.args.latest:
-      print("\n\tLatest:")
-      for choice in root.choicesLatest():
-        try:
-          instance = root.makeItemLatest(choice,
-                                         self.args,
-                                         self.args.architecture)
-          print("\t\t{0}: {1}".format(instance.name(), instance.repoRoot))
-        except DistributionUnknownCombinationException:
-          pass
-
-    if all or self.args.nightly:
-      print("\n\tNightly:")
-      for choice in root.choicesNightly():
-        try:
-          instance = root.makeItemNightly(choice,
-                                          self.args,
-                                          self.args.architecture)
-          print("\t\t{0}: {1}".format(instance.name(), instance.repoRoot))
-        except DistributionUnknownCombinationException:
-          pass
-
-    print("\nSpecial Roots {0}:".format(self.args.architecture))
-    for choice in root.choices():
-      try:
-        instance = root.makeItem(choice,
-                                 self.args,
-                                 self.args.architecture)
-        print("\t\t{0}: {1}".format(instance.name(),
-                                    instance.specialRepoRoots))
-      except DistributionUnknownCombinationException:
-        pass
-
-    print("\nBoot Options {0}:".format(self.args.architecture))
-    for choice in root.choices():
-      try:
-        instance = root.makeItem(choice,
-                                 self.args,
-                                 self.args.architecture)
-        print("\t\t{0}: {1}".format(instance.name(),
-                                    instance.bootOptions))
-      except DistributionUnknownCombinationException:
-        pass
+    Repository.tracer().enable(self.args.trace is not None)
+    self.__privateReport()
+    self.__privateStatistics()
 
   ####################################################################
   # Protected factory-behavior methods
@@ -145,3 +139,82 @@ class DistrosCommand(command.Command):
   ####################################################################
   # Private instance-behavior methods
   ####################################################################
+  def __privatePrint(self, report, category, name):
+    for (distribution, properties) in report["categories"][category].items():
+      print("\t\t{0}: {1}".format(distribution, properties[name]))
+
+  ####################################################################
+  def __privateReport(self):
+    all = not (self.args.latest or self.args.nightly or self.args.released)
+
+    root = self._distributionRoot
+    reporter = DistributionReport(root, self.args)
+
+    categories = [ category
+                   for (category, selected)
+                    in zip(reporter.categories(),
+                           [self.args.released, self.args.latest,
+                            self.args.nightly])
+                    if all or selected ]
+
+    reported = ([self.args.architecture] if self.args.architecture != "all"
+                  else architectures.Architecture.choices())
+
+    if self.args.format != "text":
+      reports = reporter.reports(reported, categories)
+      # A single architecture is reported as is; all as a dictionary keyed by
+      # architecture.
+      report = (reports[self.args.architecture]
+                  if self.args.architecture != "all" else reports)
+      if self.args.format == "json":
+        print(json.dumps(report, indent = 2))
+      else:
+        print(yaml.safe_dump(report, default_flow_style = False), end = "")
+      return
+
+    # The special roots and boot options reported are those of the default
+    # category.
+    if root.defaultCategory() not in categories:
+      categories.insert(0, root.defaultCategory())
+    reports = reporter.reports(reported, categories)
+
+    command.CommandShell(root).printChoices()
+
+    print("\nDefault distribution: {0}"
+            .format(reports[reported[0]]["defaultDistribution"]))
+
+    for architecture in reported:
+      report = reports[architecture]
+
+      print("\nRoots {0}:".format(architecture))
+
+      if all or self.args.released:
+        print("\tDefault ({0}):".format(root.defaultCategory()))
+        self.__privatePrint(report, root.defaultCategory(), "repoRoot")
+
+      if all or self.args.latest:
+        print("\n\tLatest:")
+        self.__privatePrint(report, "latest", "repoRoot")
+
+      if all or self.args.nightly:
+        print("\n\tNightly:")
+        self.__privatePrint(report, "nightly", "repoRoot")
+
+      print("\nSpecial Roots {0}:".format(architecture))
+      self.__privatePrint(report, root.defaultCategory(), "specialRepoRoots")
+
+      print("\nBoot Options {0}:".format(architecture))
+      self.__privatePrint(report, root.defaultCategory(), "bootOptions")
+
+  ####################################################################
+  def __privateStatistics(self):
+    """Reports the metrics, and trace, of discovery as requested.
+    """
+    metrics = Repository.metrics()
+    if self.args.stats:
+      print("Discovery statistics:\n{0}".format(metrics.format()),
+            file = sys.stderr)
+    if self.args.statsPrometheus is not None:
+      metrics.writePrometheus(self.args.statsPrometheus)
+    if self.args.trace is not None:
+      Repository.tracer().write(self.args.trace, self.args.traceFormat)
@@ -13,6 +13,9 @@ class Fedora(Distribution):
   # Available for use.
   _available = True
 
+  # Text in the repo root of released distributions.
+  _repoRootReleasedIndicator = "releases"
+
   ####################################################################
   # Public methods
   ####################################################################
@@ -34,11 +37,6 @@ class Fedora(Distribution):
   def _familyPrefix(self):
     return "Fedora"
 
-  ####################################################################
-  @property
-  def _repoRootReleasedIndicator(self):
-    return "releases"
-
   ####################################################################
   # Protected methods
   ####################################################################
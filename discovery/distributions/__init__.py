@@ -5,14 +5,56 @@
 #
 from __future__ import print_function
 
-from .CentOS import CentOS
-from .Fedora import Fedora
-from .RHEL import RHEL
-from .Distribution import (Distribution,
-                           DistributionNoDefaultException,
-                           DistributionUnknownCombinationException)
-from .DistrosCommand import DistrosCommand
+import importlib
+import sys
 
-from mill import command
+# The module defining each of the package's public names.  A module is only
+# imported on first use of one of its names; the vendors' modules are
+# imported with any so that the distributions Distribution provides are
+# complete.
+_modules = {
+  "CentOS"                                  : "CentOS",
+  "DiscoveryDaemon"                         : "DiscoveryDaemon",
+  "Distribution"                            : "Distribution",
+  "DistributionNoDefaultException"          : "Distribution",
+  "DistributionReport"                      : "DistributionReport",
+  "DistributionUnknownCombinationException" : "Distribution",
+  "DistrosCommand"                          : "DistrosCommand",
+  "Fedora"                                  : "Fedora",
+  "RHEL"                                    : "RHEL"
+}
+_vendors = ("CentOS", "Fedora", "RHEL")
+
+__all__ = sorted(_modules.keys()) + ["distros"]
+
+######################################################################
+def __getattr__(name):
+  if name not in _modules:
+    raise AttributeError("module {0!r} has no attribute {1!r}".format(__name__,
+                                                                      name))
+  return _load(name)
+
+######################################################################
+def __dir__():
+  return sorted(set(list(globals().keys()) + __all__))
+
+######################################################################
+def _load(name):
+  """Returns the value of the public name, importing its module and those of
+  the vendors if need be.
+  """
+  for module in _vendors + (_modules[name],):
+    importlib.import_module(".{0}".format(module), __name__)
+  # Importing a module binds its name in the package to the module itself;
+  # the public names of all imported modules are bound (again) to their
+  # values.
+  for (public, module) in _modules.items():
+    loaded = sys.modules.get("{0}.{1}".format(__name__, module))
+    if (loaded is not None) and hasattr(loaded, public):
+      globals()[public] = getattr(loaded, public)
+  return globals()[name]
+
+######################################################################
 def distros():
-  command.CommandShell(DistrosCommand).run()
+  from mill import command
+  command.CommandShell(_load("DistrosCommand")).run()
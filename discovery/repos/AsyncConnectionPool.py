@@ -0,0 +1,197 @@
+#
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright Red Hat
+#
+import platform
+if int(platform.python_version_tuple()[0]) < 3:
+  import urlparse
+else:
+  from urllib import parse as urlparse
+
+import asyncio
+import logging
+import time
+
+log = logging.getLogger(__name__)
+
+######################################################################
+######################################################################
+class AsyncConnectionPool(object):
+  """Per-host pool of reusable HTTP/1.1 keep-alive connections for the
+  coroutines of a single event loop; the asyncio equivalent of
+  ConnectionPool.
+
+  At most 'size' idle connections are retained per host; connections idle
+  for more than 'idle' seconds are closed rather than reused.
+  """
+  # Size of the chunks in which response bodies are passed to consumers.
+  __chunkSize = 64 * 1024
+
+  # Response statuses which never have a body.
+  __bodilessStatuses = (204, 304)
+
+  ####################################################################
+  # Public methods
+  ####################################################################
+  def close(self):
+    """Closes all idle connections.
+    """
+    idle = self.__idle
+    self.__idle = {}
+    for connections in idle.values():
+      for (_, writer, _) in connections:
+        writer.close()
+
+  ####################################################################
+  async def request(self, host, path, headers = None, consumer = None):
+    """Performs a GET of path on host returning the status and headers,
+    keyed by lowercased name, of the response.
+
+    The body of a successful (200) response is passed to consumer, as it is
+    received, in chunks; that of any other response is discarded.  The body
+    is always read in its entirety so that the connection may be reused.  A
+    reused connection which the server has closed while idle is
+    transparently replaced by a new connection.
+    """
+    if headers is None:
+      headers = {}
+    request = ["GET {0} HTTP/1.1".format(path), "Host: {0}".format(host)]
+    request.extend([ "{0}: {1}".format(key, value)
+                     for (key, value) in headers.items() ])
+    request = "{0}\r\n\r\n".format("\r\n".join(request)).encode("latin-1")
+
+    while True:
+      (reader, writer, reused) = await self.__privateAcquire(host)
+      try:
+        writer.write(request)
+        await writer.drain()
+        statusLine = await reader.readline()
+        if len(statusLine) == 0:
+          raise ConnectionResetError("connection closed by server")
+      except (ConnectionResetError, BrokenPipeError):
+        writer.close()
+        if reused:
+          log.debug("reused connection to {0} closed by server".format(host))
+          continue
+        raise
+      except:
+        writer.close()
+        raise
+      break
+
+    try:
+      (version, status) = statusLine.decode("latin-1").split()[:2]
+      status = int(status)
+      responseHeaders = {}
+      while True:
+        line = (await reader.readline()).decode("latin-1").strip()
+        if line == "":
+          break
+        (key, _, value) = line.partition(":")
+        responseHeaders[key.strip().lower()] = value.strip()
+      keepAlive = await self.__privateReadBody(
+                          reader, status, responseHeaders,
+                          consumer if status == 200 else (lambda chunk: None))
+    except:
+      writer.close()
+      raise
+
+    connection = responseHeaders.get("connection", "").lower()
+    if (keepAlive and (connection != "close")
+        and ((version != "HTTP/1.0") or (connection == "keep-alive"))):
+      self.__privateRelease(host, reader, writer)
+    else:
+      writer.close()
+    return (status, responseHeaders)
+
+  ####################################################################
+  def statistics(self):
+    """Returns a dictionary, keyed by host, of dictionaries containing the
+    number of connections created and the number of times a connection was
+    reused.
+    """
+    return dict([ (host, counts.copy())
+                  for (host, counts) in self.__statistics.items() ])
+
+  ####################################################################
+  # Overridden methods
+  ####################################################################
+  def __init__(self, size = 8, idle = 30):
+    super(AsyncConnectionPool, self).__init__()
+    self.__size = size
+    self.__idleTime = idle
+    # Idle connections; keyed by host.  Each is a list of (reader, writer,
+    # release time) with the most recently released last.
+    self.__idle = {}
+    self.__statistics = {}
+
+  ####################################################################
+  # Private methods
+  ####################################################################
+  async def __privateAcquire(self, host):
+    counts = self.__statistics.setdefault(host, { "created" : 0,
+                                                  "reused"  : 0 })
+    idle = self.__idle.get(host, [])
+    # Close those idle for too long, the least recently released first.
+    now = time.time()
+    while (len(idle) > 0) and ((now - idle[0][2]) > self.__idleTime):
+      idle.pop(0)[1].close()
+    while len(idle) > 0:
+      (reader, writer, _) = idle.pop()
+      if not (reader.at_eof() or writer.is_closing()):
+        counts["reused"] += 1
+        return (reader, writer, True)
+      writer.close()
+
+    counts["created"] += 1
+    parsed = urlparse.urlsplit("//{0}".format(host))
+    (reader, writer) = await asyncio.open_connection(parsed.hostname,
+                                                     parsed.port or 80)
+    return (reader, writer, False)
+
+  ####################################################################
+  async def __privateReadBody(self, reader, status, headers, consumer):
+    """Passes the body of the response to consumer, in chunks, returning
+    whether the connection may be reused.
+    """
+    if (status in self.__bodilessStatuses) or (100 <= status < 200):
+      return True
+
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+      while True:
+        size = int((await reader.readline()).split(b";")[0].strip(), 16)
+        if size == 0:
+          break
+        consumer(await reader.readexactly(size))
+        await reader.readline()
+      # Trailers, if any, end with an empty line.
+      while (await reader.readline()).strip() != b"":
+        pass
+      return True
+
+    if "content-length" in headers:
+      remaining = int(headers["content-length"])
+      while remaining > 0:
+        chunk = await reader.read(min(remaining, self.__chunkSize))
+        if len(chunk) == 0:
+          raise ConnectionResetError("connection closed by server")
+        remaining -= len(chunk)
+        consumer(chunk)
+      return True
+
+    # The body is delimited by the connection closing.
+    while True:
+      chunk = await reader.read(self.__chunkSize)
+      if len(chunk) == 0:
+        break
+      consumer(chunk)
+    return False
+
+  ####################################################################
+  def __privateRelease(self, host, reader, writer):
+    idle = self.__idle.setdefault(host, [])
+    if len(idle) < self.__size:
+      idle.append((reader, writer, time.time()))
+    else:
+      writer.close()
@@ -0,0 +1,313 @@
+#
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright Red Hat
+#
+import errno
+import fcntl
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+######################################################################
+######################################################################
+class CacheStore(object):
+  """Base class for stores of the roots discovered by a repository.
+
+  Roots are saved by category and architecture; an architecture of None
+  identifies architecture-agnostic roots.
+
+  Each store has a directory, specific to the repository, in which lock
+  files are maintained.
+  """
+
+  ####################################################################
+  # Public methods
+  ####################################################################
+  @property
+  def directory(self):
+    return self.__directory
+
+  ####################################################################
+  def load(self, category, architecture = None):
+    """Returns a tuple of the saved roots and the time they were saved or
+    (None, None) if there are no saved roots.
+    """
+    raise NotImplementedError
+
+  ####################################################################
+  def lock(self, name, operation):
+    """Returns the named lock file locked per operation, a combination of
+    fcntl LOCK_* flags, or None if LOCK_NB is specified and the lock is held
+    by another.
+
+    The lock is released by closing the returned file.
+    """
+    try:
+      os.makedirs(self.directory, 0o700)
+    except OSError as ex:
+      if ex.errno != errno.EEXIST:
+        raise
+    fd = os.open(os.path.sep.join([self.directory, name]),
+                 os.O_CREAT | os.O_RDWR, 0o640)
+    try:
+      lockFile = os.fdopen(fd, "r+")
+    except:
+      os.close(fd)
+      raise
+
+    try:
+      fcntl.flock(lockFile, operation)
+    except (IOError, OSError) as ex:
+      lockFile.close()
+      if (not (operation & fcntl.LOCK_NB)
+          or (ex.errno not in (errno.EACCES, errno.EAGAIN))):
+        raise
+      lockFile = None
+
+    return lockFile
+
+  ####################################################################
+  def lookup(self, category, architecture, version):
+    """Returns the saved root for the version or None if there is none.
+    """
+    (roots, _) = self.load(category, architecture)
+    return None if roots is None else roots.get(version)
+
+  ####################################################################
+  def mtime(self, category, architecture = None):
+    """Returns the time the roots were saved or None if there are no saved
+    roots.
+    """
+    return self.load(category, architecture)[1]
+
+  ####################################################################
+  def name(self, category, architecture = None):
+    """Returns a name identifying the roots suitable for use as a file name.
+    """
+    return ("agnostic.{0}".format(category) if architecture is None
+              else "available.{0}.{1}".format(category, architecture))
+
+  ####################################################################
+  def save(self, category, architecture, roots):
+    """Saves the roots, replacing any previously saved.
+    """
+    raise NotImplementedError
+
+  ####################################################################
+  # Overridden methods
+  ####################################################################
+  def __init__(self, directory):
+    super(CacheStore, self).__init__()
+    self.__directory = directory
+
+######################################################################
+######################################################################
+class JsonCacheStore(CacheStore):
+  """Store which saves each category and architecture as a JSON file in the
+  repository's directory.
+  """
+
+  ####################################################################
+  # Overridden methods
+  ####################################################################
+  def load(self, category, architecture = None):
+    (roots, mtime) = (None, None)
+    name = self.__privateFileName(category, architecture)
+    if not os.path.exists(os.path.sep.join([self.directory, name])):
+      return (roots, mtime)
+    lockFile = self.lock("{0}.lock".format(name), fcntl.LOCK_SH)
+    try:
+      with open(os.path.sep.join([self.directory, name])) as f:
+        stats = os.fstat(f.fileno())
+        contents = f.read()
+      # An empty file is one newly created but never written.
+      if stats.st_size > 0:
+        roots = json.loads(contents)
+        mtime = stats.st_mtime
+    except (IOError, OSError) as ex:
+      if ex.errno != errno.ENOENT:
+        raise
+    except ValueError:
+      log.warn("ignoring malformed cache file: {0}".format(name))
+    finally:
+      lockFile.close()
+    return (roots, mtime)
+
+  ####################################################################
+  def mtime(self, category, architecture = None):
+    mtime = None
+    try:
+      mtime = os.stat(
+                os.path.sep.join([self.directory,
+                                  self.__privateFileName(category,
+                                                         architecture)])
+              ).st_mtime
+    except OSError as ex:
+      if ex.errno != errno.ENOENT:
+        raise
+    return mtime
+
+  ####################################################################
+  def save(self, category, architecture, roots):
+    # The roots are written to a temporary file which is then renamed so
+    # that the file is replaced atomically; readers see either the previous
+    # or the new contents, never a partially written or empty file.
+    name = self.__privateFileName(category, architecture)
+    (fd, path) = tempfile.mkstemp(dir = self.directory,
+                                  prefix = ".{0}.".format(name))
+    try:
+      with os.fdopen(fd, "w") as f:
+        os.fchmod(f.fileno(), 0o640)
+        f.write(json.dumps(roots))
+        f.flush()
+        os.fsync(f.fileno())
+
+      lockFile = self.lock("{0}.lock".format(name), fcntl.LOCK_EX)
+      try:
+        os.rename(path, os.path.sep.join([self.directory, name]))
+      finally:
+        lockFile.close()
+    except:
+      if os.path.exists(path):
+        os.unlink(path)
+      raise
+
+  ####################################################################
+  # Private methods
+  ####################################################################
+  def __privateFileName(self, category, architecture):
+    return "{0}.json".format(self.name(category, architecture))
+
+######################################################################
+######################################################################
+class SqliteCacheStore(CacheStore):
+  """Store which saves the roots of all repositories in a single sqlite
+  database indexed by repository, category, architecture and version.
+
+  Roots not yet in the database are migrated from the repository's JSON
+  files, if any, when first accessed.
+  """
+  __schema = """
+    CREATE TABLE IF NOT EXISTS scans (
+      vendor        TEXT NOT NULL,
+      category      TEXT NOT NULL,
+      architecture  TEXT NOT NULL,
+      mtime         REAL NOT NULL,
+      PRIMARY KEY (vendor, category, architecture)
+    );
+    CREATE TABLE IF NOT EXISTS roots (
+      vendor        TEXT NOT NULL,
+      category      TEXT NOT NULL,
+      architecture  TEXT NOT NULL,
+      version       TEXT NOT NULL,
+      uri           TEXT NOT NULL,
+      PRIMARY KEY (vendor, category, architecture, version)
+    );
+  """
+
+  ####################################################################
+  # Overridden methods
+  ####################################################################
+  def __init__(self, directory, path, vendor):
+    super(SqliteCacheStore, self).__init__(directory)
+    self.__path = path
+    self.__vendor = vendor
+    self.__legacy = JsonCacheStore(directory)
+    # Connections are not shared between threads.
+    self.__local = threading.local()
+
+  ####################################################################
+  def load(self, category, architecture = None):
+    connection = self.__privateConnection()
+    key = self.__privateKey(category, architecture)
+    row = connection.execute("SELECT mtime FROM scans"
+                             " WHERE vendor = ? AND category = ?"
+                             "   AND architecture = ?", key).fetchone()
+    if row is None:
+      return self.__privateMigrate(category, architecture)
+
+    roots = dict(connection.execute("SELECT version, uri FROM roots"
+                                    " WHERE vendor = ? AND category = ?"
+                                    "   AND architecture = ?", key))
+    return (roots, row[0])
+
+  ####################################################################
+  def lookup(self, category, architecture, version):
+    row = self.__privateConnection().execute(
+            "SELECT uri FROM roots"
+            " WHERE vendor = ? AND category = ? AND architecture = ?"
+            "   AND version = ?",
+            self.__privateKey(category, architecture) + (version,)).fetchone()
+    return None if row is None else row[0]
+
+  ####################################################################
+  def mtime(self, category, architecture = None):
+    row = self.__privateConnection().execute(
+            "SELECT mtime FROM scans"
+            " WHERE vendor = ? AND category = ? AND architecture = ?",
+            self.__privateKey(category, architecture)).fetchone()
+    return (self.__privateMigrate(category, architecture)[1] if row is None
+              else row[0])
+
+  ####################################################################
+  def save(self, category, architecture, roots, mtime = None):
+    if mtime is None:
+      mtime = time.time()
+    key = self.__privateKey(category, architecture)
+    connection = self.__privateConnection()
+    # The roots are replaced in a single transaction; readers see either the
+    # previous or the new roots.
+    with connection:
+      connection.execute("BEGIN IMMEDIATE")
+      connection.execute("DELETE FROM roots"
+                         " WHERE vendor = ? AND category = ?"
+                         "   AND architecture = ?", key)
+      connection.executemany("INSERT INTO roots VALUES (?, ?, ?, ?, ?)",
+                             [key + (version, uri)
+                              for (version, uri) in roots.items()])
+      connection.execute("INSERT OR REPLACE INTO scans VALUES (?, ?, ?, ?)",
+                         key + (mtime,))
+
+  ####################################################################
+  # Private methods
+  ####################################################################
+  def __privateConnection(self):
+    connection = getattr(self.__local, "connection", None)
+    if connection is None:
+      # Imported on first use so that using the JSON store does not pay for
+      # importing it.
+      import sqlite3
+
+      try:
+        os.makedirs(os.path.dirname(self.__path), 0o700)
+      except OSError as ex:
+        if ex.errno != errno.EEXIST:
+          raise
+      # Transactions are managed explicitly.
+      connection = sqlite3.connect(self.__path, timeout = 60,
+                                   isolation_level = None)
+      connection.executescript(self.__schema)
+      self.__local.connection = connection
+    return connection
+
+  ####################################################################
+  def __privateKey(self, category, architecture):
+    return (self.__vendor, category,
+            "" if architecture is None else architecture)
+
+  ####################################################################
+  def __privateMigrate(self, category, architecture):
+    (roots, mtime) = (None, None)
+    if os.path.isdir(self.directory):
+      (roots, mtime) = self.__legacy.load(category, architecture)
+    if roots is not None:
+      log.debug("migrating {0} {1} from JSON cache file"
+                  .format(self.__vendor, self.name(category, architecture)))
+      self.save(category, architecture, roots, mtime)
+    return (roots, mtime)
@@ -14,6 +14,10 @@ class CentOS(Repository):
   __CENTOS_MINIMUM_MAJOR = 8
   __CENTOS_MINIMUM_MINOR = 3
 
+  # Patterns matching the links of interest in the listings.
+  __MAJOR_REGEX = re.compile(r"(?i)(centos-(\d+))/")
+  __MINOR_REGEX = re.compile(r"((\d+)\.(\d+)(|\.\d+))/")
+
   # Available via Factory.
   _available = True
 
@@ -21,26 +25,28 @@ class CentOS(Repository):
   # Overridden methods
   ####################################################################
   def _filterRepos(self, repos, architecture):
-    repos = super(CentOS, self)._filterRepos(repos, architecture)
-
-    regex = re.compile(r"(?i)<a\s+href=\"({0}/)\">\1</a>".format(architecture))
+    return self._filterReposByArchitecture(repos, [architecture])[architecture]
 
-    return dict([ (key, value)
-      for (key, value) in repos.items()
-        if re.search(regex,
-                     self._uri_contents(
-                      "{0}/{1}".format(value, "BaseOS"))) is not None ])
+  ####################################################################
+  def _filterReposByArchitecture(self, repos, architectures):
+    # Each repo's listing is retrieved and parsed once for all the
+    # architectures.
+    return self._partitionByArchitecture(
+            repos,
+            architectures,
+            lambda key, value: self._uri_directories(
+                                "{0}/{1}".format(value, "BaseOS")))
 
   ####################################################################
-  def _findAgnosticLatestRoots(self, architecture):
-    return self._findAgnosticReleasedRoots(architecture)
+  def _findAgnosticLatestRoots(self, architecture, major = None):
+    return self._findAgnosticReleasedRoots(architecture, major)
 
   ####################################################################
-  def _findAgnosticNightlyRoots(self, architecture):
-    return self._findAgnosticReleasedRoots(architecture)
+  def _findAgnosticNightlyRoots(self, architecture, major = None):
+    return self._findAgnosticReleasedRoots(architecture, major)
 
   ####################################################################
-  def _findAgnosticReleasedRoots(self, architecture):
+  def _findAgnosticReleasedRoots(self, architecture, major = None):
     roots = {}
     path = self._releasedStartingPath()
     if path is not None:
@@ -50,14 +56,19 @@ class CentOS(Repository):
         roots = self.uriErrorRoot
       else:
         # Find all the released versions greater than or equal to the CentOS
-        # minimum major and then find their minors.
-        regex = r"(?i)<a\s+href=\"(centos-(\d+))/\">\1/</a>"
+        # minimum major, limited to major if specified, and then find their
+        # minors.
         for release in filter(
-                        lambda x: int(x[1]) >= self.__CENTOS_MINIMUM_MAJOR,
-                        re.findall(regex, data)):
-          roots.update(self._availableReleasedMinors(
-                          "{0}/centos-{1}".format(path, release[1]),
-                          int(release[1])))
+                        lambda x: ((int(x[1]) >= self.__CENTOS_MINIMUM_MAJOR)
+                                   and ((major is None)
+                                         or (int(x[1]) == major))),
+                        [ match.groups()
+                          for match in data.matches(self.__MAJOR_REGEX) ]):
+          with self._span("expandMinors", category = "released",
+                          major = int(release[1])):
+            roots.update(self._availableReleasedMinors(
+                            "{0}/centos-{1}".format(path, release[1]),
+                            int(release[1])))
     return roots
 
   ####################################################################
@@ -70,25 +81,15 @@ class CentOS(Repository):
     if data == self.uriError:
       available = self.uriErrorRoot
     else:
-      regex = r"(?i)<a\s+href=\"({0}\.(\d+)(|\.\d+))/\">\1/</a>".format(major)
-      matches = re.findall(regex, data)
-      if major == self.__CENTOS_MINIMUM_MAJOR:
-        matches = filter(lambda x: int(x[1]) >= self.__CENTOS_MINIMUM_MINOR,
-                         matches)
-      # Convert the minor/zStream to integers.
-      matches = [(x[0],
-                  int(x[1]),
-                  int(x[2].lstrip(".")) if x[2] != "" else 0) for x in matches]
-
-      minors = [x[1] for x in matches]
-      if len(minors) > 0:
-        for minor in range(min(minors), max(minors) + 1):
-          minorMatches = list(filter(lambda x: x[1] == minor, matches))
-          if len(minorMatches) > 0:
-            maxZStream = max([x[2] for x in minorMatches])
-            maxMatch = list(filter(lambda x: x[2] == maxZStream, minorMatches))
-            maxMatch = maxMatch[0]
-            available["{0}.{1}".format(major, maxMatch[1])] = (
-              "http://{0}{1}/{2}".format(self._host(), path, maxMatch[0]))
+      # Use the newest zStream of each minor of the major greater than or
+      # equal to the CentOS minimum.
+      for ((_, minor, _), name) in (
+          self._versionIndex(data, self.__MINOR_REGEX)
+            .range((major,), (major + 1,))
+            .atLeast((self.__CENTOS_MINIMUM_MAJOR,
+                      self.__CENTOS_MINIMUM_MINOR))
+            .newestPerMinor()):
+        available["{0}.{1}".format(major, minor)] = (
+          "http://{0}{1}/{2}".format(self._host(), path, name))
 
     return available
@@ -0,0 +1,161 @@
+#
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright Red Hat
+#
+import platform
+if int(platform.python_version_tuple()[0]) < 3:
+  import httplib
+else:
+  from http import client as httplib
+
+import logging
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+######################################################################
+######################################################################
+class ConnectionPool(object):
+  """Per-host pool of reusable HTTP/1.1 keep-alive connections.
+
+  At most 'size' idle connections are retained per host; connections idle
+  for more than 'idle' seconds are closed rather than reused.
+  """
+  # Size of the chunks in which response bodies are passed to consumers.
+  __chunkSize = 64 * 1024
+
+  ####################################################################
+  # Public methods
+  ####################################################################
+  def close(self):
+    """Closes all idle connections.
+    """
+    with self.__lock:
+      idle = self.__idle
+      self.__idle = {}
+    for connections in idle.values():
+      for (connection, _) in connections:
+        connection.close()
+    for (host, counts) in sorted(self.statistics().items()):
+      log.debug("connections to {0}: {1} created, {2} reused"
+                  .format(host, counts["created"], counts["reused"]))
+
+  ####################################################################
+  def request(self, host, path, headers = None, consumer = None):
+    """Performs a GET of path on host returning the response and its body.
+
+    If consumer is specified the body of a successful (200) response is
+    instead passed to it, as it is received, in chunks and the returned body
+    is None.
+
+    The body is always read in its entirety so that the connection may be
+    reused.  A reused connection which the server has closed while idle is
+    transparently replaced by a new connection.
+    """
+    if headers is None:
+      headers = {}
+    while True:
+      (connection, reused) = self.__privateAcquire(host)
+      try:
+        connection.request("GET", path, headers = headers)
+        response = connection.getresponse()
+      except (httplib.BadStatusLine, httplib.RemoteDisconnected,
+              ConnectionResetError, BrokenPipeError):
+        connection.close()
+        if reused:
+          log.debug("reused connection to {0} closed by server".format(host))
+          continue
+        raise
+      except:
+        connection.close()
+        raise
+      break
+
+    try:
+      body = None
+      if (consumer is None) or (response.status != 200):
+        body = response.read()
+      else:
+        while True:
+          chunk = response.read(self.__chunkSize)
+          if len(chunk) == 0:
+            break
+          consumer(chunk)
+    except:
+      connection.close()
+      raise
+
+    if response.will_close:
+      connection.close()
+    else:
+      self.__privateRelease(host, connection)
+    return (response, body)
+
+  ####################################################################
+  def statistics(self):
+    """Returns a dictionary, keyed by host, of dictionaries containing the
+    number of connections created and the number of times a connection was
+    reused.
+    """
+    with self.__lock:
+      return dict([ (host, counts.copy())
+                    for (host, counts) in self.__statistics.items() ])
+
+  ####################################################################
+  # Overridden methods
+  ####################################################################
+  def __init__(self, size = 8, idle = 30, timeout = 10):
+    super(ConnectionPool, self).__init__()
+    self.__size = size
+    self.__idleTime = idle
+    self.__timeout = timeout
+    self.__lock = threading.Lock()
+    # Idle connections; keyed by host.  Each is a list of (connection,
+    # release time) with the most recently released last.
+    self.__idle = {}
+    self.__statistics = {}
+
+  ####################################################################
+  # Protected methods
+  ####################################################################
+
+  ####################################################################
+  # Private methods
+  ####################################################################
+  def __privateAcquire(self, host):
+    connection = None
+    expired = []
+    with self.__lock:
+      counts = self.__statistics.setdefault(host, { "created" : 0,
+                                                    "reused"  : 0 })
+      idle = self.__idle.get(host, [])
+      # Close those idle for too long, the least recently released first.
+      now = time.time()
+      while (len(idle) > 0) and ((now - idle[0][1]) > self.__idleTime):
+        expired.append(idle.pop(0)[0])
+      if len(idle) > 0:
+        (connection, _) = idle.pop()
+      if connection is None:
+        counts["created"] += 1
+      else:
+        counts["reused"] += 1
+
+    for candidate in expired:
+      candidate.close()
+
+    reused = connection is not None
+    if not reused:
+      connection = httplib.HTTPConnection(host, timeout = self.__timeout)
+    return (connection, reused)
+
+  ####################################################################
+  def __privateRelease(self, host, connection):
+    with self.__lock:
+      idle = self.__idle.setdefault(host, [])
+      if len(idle) < self.__size:
+        idle.append((connection, time.time()))
+        connection = None
+    if connection is not None:
+      connection.close()
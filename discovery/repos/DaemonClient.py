@@ -0,0 +1,94 @@
+#
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright Red Hat
+#
+import json
+import logging
+import socket
+
+log = logging.getLogger(__name__)
+
+########################################################################
+########################################################################
+class DaemonException(Exception):
+
+  ####################################################################
+  # Overridden methods
+  ####################################################################
+  def __init__(self, msg, *args, **kwargs):
+    super(DaemonException, self).__init__(*args, **kwargs)
+    self._msg = msg
+
+  ######################################################################
+  def __str__(self):
+    return self._msg
+
+######################################################################
+######################################################################
+class DaemonUnavailableException(DaemonException):
+
+  ####################################################################
+  # Overridden methods
+  ####################################################################
+  def __init__(self, msg = "discovery daemon unavailable", *args, **kwargs):
+    super(DaemonUnavailableException, self).__init__(msg, *args, **kwargs)
+
+######################################################################
+######################################################################
+class DaemonClient(object):
+  """Client of a discovery daemon listening on the Unix socket at 'path'.
+
+  Each query is sent as a single line of JSON, an object naming the query
+  and its parameters, to which the daemon replies with a single line of JSON
+  containing either the result or an error.
+
+  Connecting is limited to 'connectTimeout' seconds and awaiting the reply
+  to 'timeout' seconds.
+  """
+
+  ####################################################################
+  # Public methods
+  ####################################################################
+  def query(self, query, **parameters):
+    """Returns the daemon's result for the query.
+
+    Raises DaemonUnavailableException if the daemon could not be reached and
+    DaemonException if it reported an error.
+    """
+    request = dict(parameters)
+    request["query"] = query
+    try:
+      connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+      try:
+        connection.settimeout(self.__connectTimeout)
+        connection.connect(self.__path)
+        connection.settimeout(self.__timeout)
+        connection.sendall("{0}\n".format(json.dumps(request)).encode("UTF-8"))
+        with connection.makefile("rb") as f:
+          line = f.readline()
+      finally:
+        connection.close()
+    except socket.error as ex:
+      raise DaemonUnavailableException(
+              "discovery daemon unavailable at {0}: {1}".format(self.__path,
+                                                                ex))
+
+    try:
+      response = json.loads(line.decode("UTF-8"))
+    except ValueError:
+      raise DaemonUnavailableException(
+              "malformed response from discovery daemon at {0}"
+                .format(self.__path))
+    if "error" in response:
+      raise DaemonException(response["error"])
+    return response["result"]
+
+  ####################################################################
+  # Overridden methods
+  ####################################################################
+  def __init__(self, path, timeout = 10, connectTimeout = 0.5):
+    super(DaemonClient, self).__init__()
+    self.__path = path
+    self.__timeout = timeout
+    self.__connectTimeout = connectTimeout
@@ -15,6 +15,10 @@ class Fedora(Repository):
   # Exclude any release prior to 28.
   __FEDORA_MINIMUM_MAJOR = 28
 
+  # Patterns matching the links of interest in the listings.
+  __README_REGEX = re.compile(r"(?i)README")
+  __VERSION_REGEX = re.compile(r"(\d+)/")
+
   # Available via Factory.
   _available = True
 
@@ -39,30 +43,34 @@ class Fedora(Repository):
 
   ####################################################################
   def _filterRepos(self, repos, architecture):
-    repos = super(Fedora, self)._filterRepos(repos, architecture)
+    return self._filterReposByArchitecture(repos, [architecture])[architecture]
 
-    repos = dict([ (key, value)
-                      for (key, value) in repos.items()
-                        if self._uri_contents(
-                          "{0}/Everything/{1}"
-                            .format(value, architecture)) != self.uriError ])
-    return repos
+  ####################################################################
+  def _filterReposByArchitecture(self, repos, architectures):
+    # Each repo's Everything listing is retrieved and parsed once for all the
+    # architectures.
+    return self._partitionByArchitecture(
+            repos,
+            architectures,
+            lambda key, value: self._uri_directories(
+                                "{0}/Everything".format(value)))
 
   ####################################################################
-  def _findAgnosticLatestRoots(self, architecture):
-    return self._agnosticCommon(self._latestStartingPath(architecture))
+  def _findAgnosticLatestRoots(self, architecture, major = None):
+    return self._agnosticCommon(self._latestStartingPath(architecture), major)
 
   ####################################################################
-  def _findAgnosticNightlyRoots(self, architecture):
+  def _findAgnosticNightlyRoots(self, architecture, major = None):
     # For Fedora latest is nightly.
     # We could potentially make it 'rawhide', but that would require some
     # farther-reaching changes as the infrastructure is only set up to handle
     # numeric versions.
-    return self._findAgnosticLatestRoots(architecture)
+    return self._findAgnosticLatestRoots(architecture, major)
 
   ####################################################################
-  def _findAgnosticReleasedRoots(self, architecture):
-    return self._agnosticCommon(self._releasedStartingPath(architecture))
+  def _findAgnosticReleasedRoots(self, architecture, major = None):
+    return self._agnosticCommon(self._releasedStartingPath(architecture),
+                                major)
 
   ####################################################################
   def _startingPathPrefix(self, architecture):
@@ -76,7 +84,7 @@ class Fedora(Repository):
   ####################################################################
   # Protected methods
   ####################################################################
-  def _agnosticCommon(self, path):
+  def _agnosticCommon(self, path, major = None):
     roots = {}
     if path is not None:
       data = self._path_contents("{0}/".format(path))
@@ -86,12 +94,15 @@ class Fedora(Repository):
       else:
         # Find all the released versions greater than or equal to the Fedora
         # minimum major (limited to no less than 28, Fedora 28 being the
-        # version first incorporating VDO).
-        regex = r"(?i)<a\s+href=\"(\d+)/\">\1/</a>"
+        # version first incorporating VDO), limited to major if specified.
         roots = dict([
           (x,  self._availableUri(path, x))
-            for x in filter(lambda x: int(x) >= self.__FEDORA_MINIMUM_MAJOR,
-                            re.findall(regex, data)) ])
+            for x in filter(lambda x: ((int(x) >= self.__FEDORA_MINIMUM_MAJOR)
+                                       and ((major is None)
+                                             or (int(x) == major))),
+                            [ match.group(1)
+                              for match in data.matches(
+                                              self.__VERSION_REGEX) ]) ])
 
     return roots
 
@@ -104,10 +115,9 @@ class Fedora(Repository):
     # If the version has a README file that indicates it has been moved to
     # the archive server.
     data = self._path_contents("{0}/{1}/".format(path, version))
-    regex = r"(?i)<a\s+href=\"(README)\">\1</a>"
     host = self._host()
-    match = re.search(regex, data)
-    if match is not None:
+    if ((data != self.uriError)
+        and (len(data.matches(self.__README_REGEX)) > 0)):
       host = self._archivedHost()
       path = path.replace("/pub/", "/pub/archive/", 1)
     uri = None if host is None else "http://{0}{1}/{2}".format(host, path,
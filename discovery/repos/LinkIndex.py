@@ -0,0 +1,132 @@
+#
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright Red Hat
+#
+import codecs
+import sys
+
+from html import parser as htmlparser
+
+######################################################################
+######################################################################
+class LinkIndex(object):
+  """Index of the links in a directory listing.
+
+  A link is an anchor whose text is its href, as generated for each entry of
+  a listing; e.g., '<a href="BaseOS/">BaseOS/</a>'.  Directories are those
+  links ending in '/'.
+
+  The links are kept, interned, in the order in which they appear in the
+  listing.
+  """
+
+  ####################################################################
+  # Public methods
+  ####################################################################
+  @property
+  def links(self):
+    return self.__links
+
+  ####################################################################
+  def directories(self):
+    """Returns a frozenset of the names, lowercased, of the directories.
+    """
+    if self.__directories is None:
+      self.__directories = frozenset([ link[:-1].lower()
+                                       for link in self.__links
+                                        if link.endswith("/") ])
+    return self.__directories
+
+  ####################################################################
+  def matches(self, pattern):
+    """Returns a list of the match objects of those links which pattern, a
+    compiled regular expression, matches in their entirety.
+    """
+    return [ match for match in map(pattern.fullmatch, self.__links)
+                   if match is not None ]
+
+  ####################################################################
+  # Overridden methods
+  ####################################################################
+  def __init__(self, links = ()):
+    super(LinkIndex, self).__init__()
+    # Duplicates are discarded.
+    self.__links = tuple(dict.fromkeys([ sys.intern(link) for link in links ]))
+    self.__linkSet = frozenset(self.__links)
+    self.__directories = None
+
+  ####################################################################
+  def __contains__(self, link):
+    return link in self.__linkSet
+
+  ####################################################################
+  def __iter__(self):
+    return iter(self.__links)
+
+  ####################################################################
+  def __len__(self):
+    return len(self.__links)
+
+######################################################################
+######################################################################
+class LinkIndexParser(htmlparser.HTMLParser):
+  """Incremental parser of a directory listing producing a LinkIndex.
+
+  The listing is fed, as bytes, as it is received; only the links found
+  are retained.
+  """
+
+  ####################################################################
+  # Public methods
+  ####################################################################
+  def index(self):
+    """Returns the LinkIndex of the links found; the parser is closed.
+    """
+    self.feed(self.__decoder.decode(b"", final = True))
+    self.close()
+    return LinkIndex(self.__links)
+
+  ####################################################################
+  def received(self):
+    """Returns the number of bytes fed to the parser.
+    """
+    return self.__received
+
+  ####################################################################
+  # Overridden methods
+  ####################################################################
+  def __init__(self, encoding = "UTF-8"):
+    super(LinkIndexParser, self).__init__()
+    self.__decoder = codecs.getincrementaldecoder(encoding)("replace")
+    self.__links = []
+    self.__received = 0
+    # The href and text of the anchor being parsed, if any.
+    self.__href = None
+    self.__text = None
+
+  ####################################################################
+  def feed(self, data):
+    if isinstance(data, bytes):
+      self.__received += len(data)
+      data = self.__decoder.decode(data)
+    super(LinkIndexParser, self).feed(data)
+
+  ####################################################################
+  def handle_data(self, data):
+    if self.__text is not None:
+      self.__text.append(data)
+
+  ####################################################################
+  def handle_endtag(self, tag):
+    if (tag == "a") and (self.__href is not None):
+      if "".join(self.__text) == self.__href:
+        self.__links.append(self.__href)
+      self.__href = None
+      self.__text = None
+
+  ####################################################################
+  def handle_starttag(self, tag, attrs):
+    if tag == "a":
+      self.__href = dict(attrs).get("href")
+      self.__text = None if self.__href is None else []
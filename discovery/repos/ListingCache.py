@@ -0,0 +1,200 @@
+#
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright Red Hat
+#
+import errno
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+######################################################################
+######################################################################
+class ListingCache(object):
+  """On-disk cache of retrieved uri listings, keyed by uri.
+
+  Each entry records the links of the listing (see LinkIndex) together with
+  the validators (ETag and Last-Modified) returned by the server, permitting
+  the listing to be revalidated with a conditional request rather than
+  retrieved again.
+
+  Entries are fresh, and may be used without querying the server at all, for
+  'refresh' seconds after they were stored or last revalidated.  The total
+  size of the entries is limited to 'size' bytes by discarding the least
+  recently stored entries.
+
+  Failures to retrieve a uri are saved as error entries, fresh for 'missing'
+  seconds if the server reported the uri as not existing or for 'transient'
+  seconds otherwise.
+  """
+  # Kinds of error entries.
+  missing = "missing"
+  transient = "transient"
+
+  ####################################################################
+  # Public methods
+  ####################################################################
+  def headers(self, entry):
+    """Returns the conditional request headers appropriate to the entry.
+    """
+    headers = {}
+    if entry is not None:
+      if entry.get("etag") is not None:
+        headers["If-None-Match"] = entry["etag"]
+      if entry.get("lastModified") is not None:
+        headers["If-Modified-Since"] = entry["lastModified"]
+    return headers
+
+  ####################################################################
+  def isError(self, entry):
+    """Returns True if the entry records a failure to retrieve the uri.
+    """
+    return entry.get("error") is not None
+
+  ####################################################################
+  def isFresh(self, entry):
+    """Returns True if the entry may be used without revalidation.
+    """
+    refresh = { None            : self.__refresh,
+                self.missing    : self.__missing,
+                self.transient  : self.__transient }.get(entry.get("error"),
+                                                         0)
+    return (time.time() - entry.get("stored", 0)) < refresh
+
+  ####################################################################
+  def load(self, uri):
+    """Returns the entry for the uri or None if there is no usable entry.
+    """
+    entry = None
+    try:
+      with open(self.__privatePath(uri)) as f:
+        entry = json.load(f)
+    except (IOError, OSError) as ex:
+      if ex.errno != errno.ENOENT:
+        log.debug("could not read listing for {0}: {1}".format(uri, ex))
+    except ValueError:
+      log.debug("ignoring malformed listing for {0}".format(uri))
+
+    # The file name is only a hash of the uri; the entry must be its own.
+    if (entry is not None) and (entry.get("uri") != uri):
+      entry = None
+    return entry
+
+  ####################################################################
+  def revalidated(self, entry):
+    """Records that the entry's contents have been confirmed as current.
+    """
+    entry = entry.copy()
+    entry["stored"] = time.time()
+    self.__privateSave(entry)
+
+  ####################################################################
+  def save(self, uri, links, etag = None, lastModified = None):
+    """Saves the links and validators for the uri.
+    """
+    self.__privateSave({ "uri"          : uri,
+                         "links"        : list(links),
+                         "etag"         : etag,
+                         "lastModified" : lastModified,
+                         "stored"       : time.time() })
+
+  ####################################################################
+  def saveError(self, uri, kind):
+    """Saves an error entry, of the specified kind, for the uri.
+    """
+    self.__privateSave({ "uri"    : uri,
+                         "error"  : kind,
+                         "stored" : time.time() })
+
+  ####################################################################
+  # Overridden methods
+  ####################################################################
+  def __init__(self, directory, refresh = 3600, size = 64 * 1024 * 1024,
+               missing = 86400, transient = 600):
+    super(ListingCache, self).__init__()
+    self.__directory = directory
+    self.__refresh = refresh
+    self.__size = size
+    self.__missing = missing
+    self.__transient = transient
+    # Total size of the entries; determined on first save.
+    self.__total = None
+    self.__lock = threading.Lock()
+
+  ####################################################################
+  # Protected methods
+  ####################################################################
+
+  ####################################################################
+  # Private methods
+  ####################################################################
+  def __privatePath(self, uri):
+    return os.path.sep.join([
+                        self.__directory,
+                        "{0}.json".format(
+                          hashlib.sha1(uri.encode("UTF-8")).hexdigest())])
+
+  ####################################################################
+  def __privatePrune(self):
+    """Discards the least recently stored entries until the total size is
+    no more than three quarters of the limit.
+    """
+    entries = []
+    for name in os.listdir(self.__directory):
+      if name.endswith(".json"):
+        try:
+          stats = os.stat(os.path.sep.join([self.__directory, name]))
+          entries.append((stats.st_mtime, stats.st_size, name))
+        except OSError:
+          pass
+    self.__total = sum([size for (_, size, _) in entries])
+    if self.__total > self.__size:
+      log.debug("pruning listings; {0} bytes exceeds {1}"
+                  .format(self.__total, self.__size))
+      for (_, size, name) in sorted(entries):
+        if self.__total <= ((self.__size * 3) // 4):
+          break
+        try:
+          os.unlink(os.path.sep.join([self.__directory, name]))
+          self.__total -= size
+        except OSError:
+          pass
+
+  ####################################################################
+  def __privateSave(self, entry):
+    try:
+      size = self.__privateWrite(entry)
+      with self.__lock:
+        if self.__total is not None:
+          self.__total += size
+        if (self.__total is None) or (self.__total > self.__size):
+          self.__privatePrune()
+    except (IOError, OSError) as ex:
+      log.warn("could not save listing for {0}: {1}".format(entry["uri"], ex))
+
+  ####################################################################
+  def __privateWrite(self, entry):
+    try:
+      os.makedirs(self.__directory, 0o700)
+    except OSError as ex:
+      if ex.errno != errno.EEXIST:
+        raise
+
+    # Write to a temporary file and rename it so that readers never see a
+    # partially written entry.
+    (fd, path) = tempfile.mkstemp(dir = self.__directory, suffix = ".tmp")
+    try:
+      with os.fdopen(fd, "w") as f:
+        json.dump(entry, f)
+        size = f.tell()
+      os.rename(path, self.__privatePath(entry["uri"]))
+    except:
+      os.unlink(path)
+      raise
+    return size
@@ -0,0 +1,258 @@
+#
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright Red Hat
+#
+import bisect
+import collections
+import logging
+import os
+import tempfile
+import threading
+
+log = logging.getLogger(__name__)
+
+######################################################################
+######################################################################
+class Metrics(object):
+  """Process-wide, thread-safe, registry of discovery metrics.
+
+  Per host are recorded the requests made, by response status ("error" if
+  no response was received), the response body bytes received, the retries
+  made and the time spent sleeping before them and a histogram of request
+  latencies.  Per cache are recorded hits and misses; the caches are:
+
+    uriContents:    listings retrieved in this process, in memory
+    listings:       listings saved on disk
+    memoizedRoots:  discovered roots, in memory
+    savedRoots:     discovered roots saved on disk
+  """
+  # Upper bounds, in seconds, of the latency histogram buckets.
+  latencyBuckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                    10.0)
+
+  ####################################################################
+  # Public methods
+  ####################################################################
+  def cache(self, name, hit):
+    """Records a hit, or miss, of the named cache.
+    """
+    with self.__lock:
+      self.__caches[name]["hits" if hit else "misses"] += 1
+
+  ####################################################################
+  def format(self):
+    """Returns a human-readable summary of the metrics.
+    """
+    snapshot = self.snapshot()
+    lines = []
+    for (host, recorded) in sorted(snapshot["hosts"].items()):
+      latency = recorded["latency"]
+      lines.append("{0}: {1} requests ({2}), {3} bytes, {4} retries"
+                   " ({5:.1f}s sleeping), latency mean {6:.1f}ms"
+                   " max {7:.1f}ms"
+                    .format(host, recorded["requests"],
+                            ", ".join([ "{0}: {1}".format(status, count)
+                                        for (status, count)
+                                          in sorted(recorded["statuses"]
+                                                      .items()) ]),
+                            recorded["bytes"], recorded["retries"],
+                            recorded["sleep"],
+                            (1000 * latency["sum"] / latency["count"])
+                              if latency["count"] > 0 else 0,
+                            1000 * latency["max"]))
+    for (name, counts) in sorted(snapshot["caches"].items()):
+      total = counts["hits"] + counts["misses"]
+      lines.append("{0} cache: {1} hits, {2} misses ({3:.1f}% hit)"
+                    .format(name, counts["hits"], counts["misses"],
+                            (100.0 * counts["hits"] / total)
+                              if total > 0 else 0))
+    return "\n".join(lines)
+
+  ####################################################################
+  def prometheus(self):
+    """Returns the metrics in the Prometheus text exposition format.
+    """
+    snapshot = self.snapshot()
+    hosts = sorted(snapshot["hosts"].items())
+    caches = sorted(snapshot["caches"].items())
+    lines = []
+
+    def family(name, kind, description, samples):
+      lines.extend(["# HELP {0} {1}".format(name, description),
+                    "# TYPE {0} {1}".format(name, kind)])
+      lines.extend([ "{0}{1} {2}".format(name,
+                                         self.__privateLabels(labels),
+                                         value)
+                     for (name, labels, value) in samples ])
+
+    family("discovery_requests_total", "counter",
+           "Requests made, by host and response status.",
+           [ ("discovery_requests_total",
+              (("host", host), ("status", status)), count)
+             for (host, recorded) in hosts
+             for (status, count) in sorted(recorded["statuses"].items()) ])
+    family("discovery_response_bytes_total", "counter",
+           "Response body bytes received, by host.",
+           [ ("discovery_response_bytes_total", (("host", host),),
+              recorded["bytes"])
+             for (host, recorded) in hosts ])
+    family("discovery_retries_total", "counter",
+           "Requests retried, by host.",
+           [ ("discovery_retries_total", (("host", host),),
+              recorded["retries"])
+             for (host, recorded) in hosts ])
+    family("discovery_retry_sleep_seconds_total", "counter",
+           "Seconds slept before retrying requests, by host.",
+           [ ("discovery_retry_sleep_seconds_total", (("host", host),),
+              recorded["sleep"])
+             for (host, recorded) in hosts ])
+
+    samples = []
+    for (host, recorded) in hosts:
+      latency = recorded["latency"]
+      samples.extend([ ("discovery_request_duration_seconds_bucket",
+                        (("host", host), ("le", bound)), count)
+                       for (bound, count) in latency["buckets"] ])
+      samples.extend([ ("discovery_request_duration_seconds_sum",
+                        (("host", host),), latency["sum"]),
+                       ("discovery_request_duration_seconds_count",
+                        (("host", host),), latency["count"]) ])
+    family("discovery_request_duration_seconds", "histogram",
+           "Request latency, by host.", samples)
+
+    family("discovery_cache_hits_total", "counter",
+           "Cache hits, by cache.",
+           [ ("discovery_cache_hits_total", (("cache", name),),
+              counts["hits"])
+             for (name, counts) in caches ])
+    family("discovery_cache_misses_total", "counter",
+           "Cache misses, by cache.",
+           [ ("discovery_cache_misses_total", (("cache", name),),
+              counts["misses"])
+             for (name, counts) in caches ])
+    return "{0}\n".format("\n".join(lines))
+
+  ####################################################################
+  def request(self, host, status, size, latency):
+    """Records a request of host, its response status (None if there was
+    no response), the bytes of its response body and its latency in
+    seconds.
+    """
+    with self.__lock:
+      recorded = self.__hosts[host]
+      recorded["statuses"]["error" if status is None
+                                    else "{0}".format(status)] += 1
+      recorded["bytes"] += size
+      recorded["latencySum"] += latency
+      recorded["latencyMax"] = max(recorded["latencyMax"], latency)
+      recorded["latencyCounts"][bisect.bisect_left(self.latencyBuckets,
+                                                   latency)] += 1
+
+  ####################################################################
+  def reset(self):
+    """Discards all recorded metrics.
+    """
+    with self.__lock:
+      self.__hosts = collections.defaultdict(
+        lambda: { "statuses"      : collections.Counter(),
+                  "bytes"         : 0,
+                  "retries"       : 0,
+                  "sleep"         : 0.0,
+                  "latencySum"    : 0.0,
+                  "latencyMax"    : 0.0,
+                  # One per bucket and a final one for those beyond the last.
+                  "latencyCounts" : [0] * (len(self.latencyBuckets) + 1) })
+      self.__caches = collections.defaultdict(
+        lambda: { "hits" : 0, "misses" : 0 })
+
+  ####################################################################
+  def retry(self, host):
+    """Records a retry of a request of host.
+    """
+    with self.__lock:
+      self.__hosts[host]["retries"] += 1
+
+  ####################################################################
+  def sleep(self, host, seconds):
+    """Records sleeping for seconds before retrying a request of host.
+    """
+    with self.__lock:
+      self.__hosts[host]["sleep"] += seconds
+
+  ####################################################################
+  def snapshot(self):
+    """Returns a dictionary of the metrics:
+
+      hosts:  keyed by host, a dictionary of its requests, statuses (a
+              dictionary of request counts keyed by status), bytes, retries,
+              sleep and latency (a dictionary of count, sum, max and buckets,
+              a list of (upper bound, cumulative count))
+      caches: keyed by cache, a dictionary of its hits and misses
+    """
+    with self.__lock:
+      hosts = {}
+      for (host, recorded) in self.__hosts.items():
+        cumulative = 0
+        buckets = []
+        for (bound, count) in zip(self.latencyBuckets + ("+Inf",),
+                                  recorded["latencyCounts"]):
+          cumulative += count
+          buckets.append(("{0}".format(bound), cumulative))
+        hosts[host] = { "requests"  : sum(recorded["statuses"].values()),
+                        "statuses"  : dict(recorded["statuses"]),
+                        "bytes"     : recorded["bytes"],
+                        "retries"   : recorded["retries"],
+                        "sleep"     : recorded["sleep"],
+                        "latency"   : { "count"   : cumulative,
+                                        "sum"     : recorded["latencySum"],
+                                        "max"     : recorded["latencyMax"],
+                                        "buckets" : buckets } }
+      return { "hosts"  : hosts,
+               "caches" : dict([ (name, dict(counts))
+                                 for (name, counts)
+                                   in self.__caches.items() ]) }
+
+  ####################################################################
+  def writePrometheus(self, path):
+    """Writes the metrics, in the Prometheus text exposition format, to the
+    file at path; e.g., for the node exporter's textfile collector.
+
+    The file is replaced atomically so that it is never read partially
+    written.
+    """
+    path = os.path.expanduser(path)
+    (fd, temporary) = tempfile.mkstemp(dir = os.path.dirname(
+                                                os.path.abspath(path)),
+                                       prefix = ".{0}.".format(
+                                                  os.path.basename(path)))
+    try:
+      with os.fdopen(fd, "w") as f:
+        f.write(self.prometheus())
+      os.chmod(temporary, 0o644)
+      os.rename(temporary, path)
+    except:
+      os.unlink(temporary)
+      raise
+    log.debug("wrote metrics to {0}".format(path))
+
+  ####################################################################
+  # Overridden methods
+  ####################################################################
+  def __init__(self):
+    super(Metrics, self).__init__()
+    self.__lock = threading.Lock()
+    self.reset()
+
+  ####################################################################
+  # Private methods
+  ####################################################################
+  def __privateLabels(self, labels):
+    """Returns the Prometheus label set of the (name, value) labels.
+    """
+    return "{{{0}}}".format(",".join([
+      "{0}=\"{1}\"".format(name,
+                           "{0}".format(value).replace("\\", "\\\\")
+                                              .replace("\"", "\\\"")
+                                              .replace("\n", "\\n"))
+      for (name, value) in labels ]))
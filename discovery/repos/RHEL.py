@@ -6,6 +6,7 @@
 import re
 
 from .Repository import Repository
+from .VersionIndex import VersionIndex
 
 ######################################################################
 ######################################################################
@@ -14,6 +15,13 @@ class RHEL(Repository):
   __RHEL_MINIMUM_MAJOR = 7
   __RHEL_MINIMUM_MINOR = 5
 
+  # Patterns matching the links of interest in the listings.
+  __LATEST_MAJOR_REGEX = re.compile(r"(rhel-(\d+))/")
+  __LATEST_MINOR_REGEX = re.compile(
+                          r"(?i)(latest-RHEL-(\d+)\.(\d+)(|\.\d+))/")
+  __RELEASED_MAJOR_REGEX = re.compile(r"(RHEL-(\d+))/")
+  __RELEASED_MINOR_REGEX = re.compile(r"((\d+)\.(\d+)(|\.\d+))/")
+
   # Available via Factory.
   _available = True
 
@@ -21,75 +29,85 @@ class RHEL(Repository):
   # Overridden methods
   ####################################################################
   def _filterRepos(self, repos, architecture):
-    repos = super(RHEL, self)._filterRepos(repos, architecture)
-
-    regex = re.compile(r"(?i)<a\s+href=\"({0}/)\">\1</a>".format(architecture))
+    return self._filterReposByArchitecture(repos, [architecture])[architecture]
 
-    return dict([ (key, value)
-      for (key, value) in repos.items()
-        if re.search(regex,
-                     self._uri_contents(
-                      "{0}/{1}".format(value,
-                                       "Server" if float(key) < 8
-                                                else "BaseOS"))) is not None ])
+  ####################################################################
+  def _filterReposByArchitecture(self, repos, architectures):
+    # Each repo's listing is retrieved and parsed once for all the
+    # architectures.
+    return self._partitionByArchitecture(
+            repos,
+            architectures,
+            lambda key, value: self._uri_directories(
+                                "{0}/{1}".format(
+                                  value,
+                                  "Server"
+                                    if VersionIndex.parse(key) < (8,)
+                                    else "BaseOS")))
 
   ####################################################################
-  def _findAgnosticLatestRoots(self, architecture):
+  def _findAgnosticLatestRoots(self, architecture, major = None):
     # Find all the latest versions greater than or equal to the RHEL
     # minimum major and then find their minors.
     roots = {}
     path = self._latestStartingPath()
     if path is not None:
-      majorRhels = self._findMajorRhels(path,
-                                        r"<a\s+href=\"(rhel-(\d+))/\">\1/</a>")
+      majorRhels = self._findMajorRhels(path, self.__LATEST_MAJOR_REGEX,
+                                        major)
       if (len(majorRhels) == 1) and (majorRhels[0] == self.uriError):
         roots = self.uriErrorRoot
       else:
         for rhel in majorRhels:
-          roots.update(self._availableLatestMinors(
-                                        "{0}/{1}/rel-eng/{2}".format(
-                                                        path,
-                                                        rhel[0],
-                                                        rhel[0].upper())))
+          with self._span("expandMinors", category = "latest",
+                          major = int(rhel[1])):
+            roots.update(self._availableLatestMinors(
+                                          "{0}/{1}/rel-eng/{2}".format(
+                                                          path,
+                                                          rhel[0],
+                                                          rhel[0].upper())))
     return roots
 
   ####################################################################
-  def _findAgnosticNightlyRoots(self, architecture):
+  def _findAgnosticNightlyRoots(self, architecture, major = None):
     # Find all the nightly versions greater than or equal to the RHEL
     # minimum major and then find their minors.
     roots = {}
     path = self._nightlyStartingPath()
     if path is not None:
-      majorRhels = self._findMajorRhels(path,
-                                        r"<a\s+href=\"(rhel-(\d+))/\">\1/</a>")
+      majorRhels = self._findMajorRhels(path, self.__LATEST_MAJOR_REGEX,
+                                        major)
       if (len(majorRhels) == 1) and (majorRhels[0] == self.uriError):
         roots = self.uriErrorRoot
       else:
         for rhel in majorRhels:
-          roots.update(self._availableNightlyMinors(
-                                        "{0}/{1}/nightly/{2}".format(
-                                                        path,
-                                                        rhel[0],
-                                                        rhel[0].upper())))
+          with self._span("expandMinors", category = "nightly",
+                          major = int(rhel[1])):
+            roots.update(self._availableNightlyMinors(
+                                          "{0}/{1}/nightly/{2}".format(
+                                                          path,
+                                                          rhel[0],
+                                                          rhel[0].upper())))
     return roots
 
   ####################################################################
-  def _findAgnosticReleasedRoots(self, architecture):
+  def _findAgnosticReleasedRoots(self, architecture, major = None):
     roots = {}
     # Find all the released versions greater than or equal to the RHEL
     # minimum major and then find their minors.
     path = self._releasedStartingPath()
     if path is not None:
-      majorRhels = self._findMajorRhels(path,
-                                        r"<a\s+href=\"(RHEL-(\d+))/\">\1/</a>")
+      majorRhels = self._findMajorRhels(path, self.__RELEASED_MAJOR_REGEX,
+                                        major)
       if (len(majorRhels) == 1) and (majorRhels[0] == self.uriError):
         roots = self.uriErrorRoot
       else:
         for rhel in majorRhels:
-          roots.update(self._availableReleasedMinors(
-                                                "{0}/{1}".format(path,
-                                                                 rhel[0]),
-                                                                 int(rhel[1])))
+          with self._span("expandMinors", category = "released",
+                          major = int(rhel[1])):
+            roots.update(self._availableReleasedMinors(
+                                                  "{0}/{1}".format(path,
+                                                                   rhel[0]),
+                                                  int(rhel[1])))
     return roots
 
   ####################################################################
@@ -102,38 +120,14 @@ class RHEL(Repository):
     if data == self.uriError:
       available = self.uriErrorRoot
     else:
-      # Find all the latest greater than or equal to the RHEL minimum major.
-      regex = r"(?i)<a\s+href=\"(latest-RHEL-(\d+)\.(\d+)(|\.\d+))/\">\1/</a>"
-      matches = filter(lambda x: int(x[1]) >= self.__RHEL_MINIMUM_MAJOR,
-                       re.findall(regex, data))
-      # Convert the major/minor/zStream to integers.
-      matches = [(x[0],
-                  int(x[1]),
-                  int(x[2]),
-                  int(x[3].lstrip(".")) if x[3] != "" else 0) for x in matches]
-      # Exclude any minimum major versions that have a minor less than the
-      # minimum minor.
-      matches = filter(lambda x: not ((x[1] == self.__RHEL_MINIMUM_MAJOR)
-                                      and (x[2] < self.__RHEL_MINIMUM_MINOR)),
-                       matches)
-      matches = list(matches)
-
-      majors = [x[1] for x in matches]
-      if len(majors) > 0:
-        for major in range(min(majors), max(majors) + 1):
-          majorMatches = list(filter(lambda x: x[1] == major, matches))
-          minors = [x[2] for x in majorMatches]
-          if len(minors) > 0:
-            for minor in range(min(minors), max(minors) + 1):
-              minorMatches = list(filter(lambda x: x[2] == minor, majorMatches))
-              if len(minorMatches) > 0:
-                maxZStream = max([x[3] for x in minorMatches])
-                maxMatch = list(filter(lambda x: x[3] == maxZStream,
-                                       minorMatches))
-                maxMatch = maxMatch[0]
-                available["{0}.{1}".format(maxMatch[1], maxMatch[2])] = (
-                  "http://{0}{1}/{2}/compose".format(self._host(), path,
-                                                     maxMatch[0]))
+      # Use the newest zStream of each minor greater than or equal to the
+      # RHEL minimum.
+      for ((major, minor, _), name) in (
+          self._versionIndex(data, self.__LATEST_MINOR_REGEX)
+            .atLeast((self.__RHEL_MINIMUM_MAJOR, self.__RHEL_MINIMUM_MINOR))
+            .newestPerMinor()):
+        available["{0}.{1}".format(major, minor)] = (
+          "http://{0}{1}/{2}/compose".format(self._host(), path, name))
 
     return available
 
@@ -149,36 +143,30 @@ class RHEL(Repository):
     if data == self.uriError:
       available = self.uriErrorRoot
     else:
-      regex = r"<a\s+href=\"({0}\.(\d+)(|\.\d+))/\">\1/</a>".format(major)
-      matches = re.findall(regex, data)
-      if major == self.__RHEL_MINIMUM_MAJOR:
-        matches = filter(lambda x: int(x[1]) >= self.__RHEL_MINIMUM_MINOR,
-                         matches)
-      # Convert the minor/zStream to integers.
-      matches = [(x[0],
-                  int(x[1]),
-                  int(x[2].lstrip(".")) if x[2] != "" else 0) for x in matches]
-
-      minors = [x[1] for x in matches]
-      if len(minors) > 0:
-        for minor in range(min(minors), max(minors) + 1):
-          minorMatches = list(filter(lambda x: x[1] == minor, matches))
-          if len(minorMatches) > 0:
-            maxZStream = max([x[2] for x in minorMatches])
-            maxMatch = list(filter(lambda x: x[2] == maxZStream, minorMatches))
-            maxMatch = maxMatch[0]
-            available["{0}.{1}".format(major, maxMatch[1])] = (
-              "http://{0}{1}/{2}".format(self._host(), path, maxMatch[0]))
+      # Use the newest zStream of each minor of the major greater than or
+      # equal to the RHEL minimum.
+      for ((_, minor, _), name) in (
+          self._versionIndex(data, self.__RELEASED_MINOR_REGEX)
+            .range((major,), (major + 1,))
+            .atLeast((self.__RHEL_MINIMUM_MAJOR, self.__RHEL_MINIMUM_MINOR))
+            .newestPerMinor()):
+        available["{0}.{1}".format(major, minor)] = (
+          "http://{0}{1}/{2}".format(self._host(), path, name))
 
     return available
 
   ####################################################################
-  def _findMajorRhels(self, path, regex):
+  def _findMajorRhels(self, path, regex, major = None):
+    """Returns a list of the (name, major) of the links matched by regex in
+    the listing of path; if major is specified only those of the major.
+    """
     data = self._path_contents("{0}/".format(path))
     if data == self.uriError:
       return [self.uriError]
 
     # Find all the released versions greater than or equal to the RHEL
     # minimum major.
-    return list(filter(lambda x: int(x[1]) >= self.__RHEL_MINIMUM_MAJOR,
-                       re.findall(regex, data)))
+    return list(filter(lambda x: ((int(x[1]) >= self.__RHEL_MINIMUM_MAJOR)
+                                  and ((major is None)
+                                        or (int(x[1]) == major))),
+                       [ match.groups() for match in data.matches(regex) ]))
@@ -6,6 +6,7 @@
 from __future__ import print_function
 
 import argparse
+import sys
 import yaml
 
 from mill import command
@@ -53,6 +54,33 @@ class ReposCommand(command.Command):
                        help = "report only the available latest repos",
                        action = "store_true")
 
+    parser.add_argument("--stats",
+                        help = "report, on stderr, the requests made and the" \
+                                " caches used in discovery",
+                        action = "store_true")
+
+    parser.add_argument("--stats-prometheus",
+                        help = "write the requests made and the caches used" \
+                                " in discovery to the file, in the" \
+                                " Prometheus text format; e.g., for the" \
+                                " node exporter's textfile collector",
+                        metavar = "PATH",
+                        dest = "statsPrometheus")
+
+    parser.add_argument("--trace",
+                        help = "write the timing of each phase of discovery," \
+                                " and of each request made, to the file",
+                        metavar = "PATH")
+
+    parser.add_argument("--trace-format",
+                        help = "format of the trace; chrome is the Chrome" \
+                                " trace-event format (e.g., for" \
+                                " chrome://tracing or Perfetto), har is HAR" \
+                                " of the requests made; DEFAULT = chrome",
+                        choices = ["chrome", "har"],
+                        default = "chrome",
+                        dest = "traceFormat")
+
     parents = super(ReposCommand, cls).parserParents()
     parents.append(parser)
     return parents
@@ -63,6 +91,7 @@ class ReposCommand(command.Command):
   def run(self):
     all = not (self.args.latest or self.args.nightly or self.args.released)
 
+    Repository.tracer().enable(self.args.trace is not None)
     for choice in Repository.choices():
       instance = Repository.makeItem(choice, self.args)
       for architecture in architectures.Architecture.choices():
@@ -82,6 +111,8 @@ class ReposCommand(command.Command):
           print(yaml.safe_dump(instance.availableNightlyRoots(architecture),
                                default_flow_style = False))
 
+    self.__privateStatistics()
+
   ####################################################################
   # Protected factory-behavior methods
   ####################################################################
@@ -97,3 +128,14 @@ class ReposCommand(command.Command):
   ####################################################################
   # Private instance-behavior methods
   ####################################################################
+  def __privateStatistics(self):
+    """Reports the metrics, and trace, of discovery as requested.
+    """
+    metrics = Repository.metrics()
+    if self.args.stats:
+      print("Discovery statistics:\n{0}".format(metrics.format()),
+            file = sys.stderr)
+    if self.args.statsPrometheus is not None:
+      metrics.writePrometheus(self.args.statsPrometheus)
+    if self.args.trace is not None:
+      Repository.tracer().write(self.args.trace, self.args.traceFormat)
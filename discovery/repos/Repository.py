@@ -7,53 +7,114 @@ from __future__ import print_function
 
 # Although the requests python package would simplify the processing slightly
 # there is an Objective-C runtime error on macOS using it in an ansible
-# context.  Thus we use httplib and urlparse.
+# context.  Thus we use httplib (via ConnectionPool) and urlparse.
 import platform
 if int(platform.python_version_tuple()[0]) < 3:
-  import httplib
   import urlparse
 else:
-  from http import client as httplib
   from urllib import parse as urlparse
 
 import argparse
-import errno
+import atexit
+import contextvars
 import fcntl
 import functools
 import itertools
-import json
 import logging
 import os
 import socket
 import subprocess
 import sys
+import threading
 import time
+import weakref
+
+# asyncio (and so AsyncConnectionPool) and concurrent.futures are imported
+# only by the methods using them so that the commands, e.g., their --help,
+# do not pay for importing them.
 
 from mill import defaults, factory
 from discovery import architectures
+from .CacheStore import JsonCacheStore, SqliteCacheStore
+from .ConnectionPool import ConnectionPool
+from .DaemonClient import (DaemonClient,
+                           DaemonException,
+                           DaemonUnavailableException)
+from .LinkIndex import LinkIndex, LinkIndexParser
+from .ListingCache import ListingCache
+from .Metrics import Metrics
+from .RootsRegistry import RootsRegistry
+from .Tracer import Tracer
+from .VersionIndex import VersionIndex
 
 log = logging.getLogger(__name__)
 
 ######################################################################
 ######################################################################
 class Repository(factory.Factory, defaults.DefaultsFileInfo):
-  # We cache the results of determining the various roots to avoid
-  # having to constantly perform network queries.
-  #
-  # We start with None so that separate dictionaries are created per
-  # subclass.
+  # We memoize the results of determining the various roots, both those with
+  # no distinction as to architecture and those available per architecture,
+  # to avoid having to constantly perform network queries or reload them from
+  # the cache.  The memo is shared by all repositories; created on first use.
+  __rootsRegistry = None
+  __rootsRegistryLock = threading.Lock()
+
+  # Incremented whenever memoized roots or cached contents are discarded so
+  # that roots retained from before then are not used.
+  __rootsGeneration = 0
+
+  # The instances shared by all users of the repositories; keyed by name.
+  __instances = {}
+  __instancesLock = threading.Lock()
+
+  # Cached contents to avoid multiple requests for the same data.  The
+  # contents of a uri are the LinkIndex of its listing or uriError.
   #
-  # All found roots with no distinction as to architecture.
-  # Keyed by category.
-  __agnosticRoots = None
-
-  # Available roots; keyed by architecture.
-  __cachedLatest = None
-  __cachedNightly = None
-  __cachedReleased = None
-
-  # Cached contents to avoid multiple requests for the same data.
+  # The contents may be retrieved concurrently.  The lock protects the
+  # cache and the per-uri locks which serialize retrieval of any single uri.
   __cachedUriContents = {}
+  __cachedUriContentsLock = threading.Lock()
+  __uriLocks = {}
+
+  # Asynchronous retrievals in progress; keyed by uri.
+  __uriTasks = {}
+
+  # The uris whose contents are not yet known found by the discovery, if
+  # any, being performed without network access in the current context; see
+  # _discoverAsync.
+  __pendingUris = contextvars.ContextVar("pendingUris", default = None)
+
+  # Response statuses indicating a uri does not exist.  Such uris are not
+  # retried.
+  __uriMissingStatuses = (404, 410)
+
+  # Keep-alive connections shared by all repositories; created on first use.
+  # Those used asynchronously are specific to their event loop; keyed by
+  # loop.
+  __connectionPool = None
+  __connectionPoolLock = threading.Lock()
+  __asyncConnectionPools = weakref.WeakKeyDictionary()
+
+  # Whether the discovery daemon, if reachable, is queried for roots and
+  # whether it was found to be unreachable; if so it is not queried again.
+  __daemonEnabled = True
+  __daemonUnavailable = False
+
+  # Metrics of the requests made and caches used by all repositories.
+  __metrics = Metrics()
+
+  # Timing spans of the phases of discovery of all repositories.
+  __tracer = Tracer()
+
+  # The categories of roots, each with the categories aggregated to form its
+  # available roots from lowest to highest priority and the query of its
+  # available roots.
+  __categoryPriorities = { "latest"   : ("nightly", "released", "latest"),
+                           "nightly"  : ("released", "latest", "nightly"),
+                           "released" : ("nightly", "latest", "released") }
+  __categoryQueries = { "latest"   : "availableLatestRoots",
+                        "nightly"  : "availableNightlyRoots",
+                        "released" : "availableRoots" }
 
   # Text indicating an error in retrieving URI contents.
   uriError = "<<uriError>>"
@@ -63,6 +124,101 @@ class Repository(factory.Factory, defaults.DefaultsFileInfo):
 
   ####################################################################
   # Public methods
+  ####################################################################
+  @classmethod
+  def clearCachedContents(cls):
+    """Discards the retrieved uri contents cached in memory; subsequent
+    discovery uses the on-disk listing cache or the network.
+    """
+    with Repository.__cachedUriContentsLock:
+      Repository.__cachedUriContents.clear()
+    with Repository.__rootsRegistryLock:
+      Repository.__rootsGeneration += 1
+
+  ####################################################################
+  @classmethod
+  def connectionStatistics(cls):
+    """Returns a dictionary, keyed by host, of dictionaries containing the
+    number of connections created and the number of times a connection was
+    reused in retrieving uri contents.
+    """
+    with Repository.__connectionPoolLock:
+      pools = list(Repository.__asyncConnectionPools.values())
+      if Repository.__connectionPool is not None:
+        pools.append(Repository.__connectionPool)
+    statistics = {}
+    for pool in pools:
+      for (host, counts) in pool.statistics().items():
+        totals = statistics.setdefault(host, { "created" : 0, "reused" : 0 })
+        totals["created"] += counts["created"]
+        totals["reused"] += counts["reused"]
+    return statistics
+
+  ####################################################################
+  @classmethod
+  def instance(cls):
+    """Returns the instance of the repository, with default arguments, shared
+    throughout the process.
+    """
+    with Repository.__instancesLock:
+      if cls.name() not in Repository.__instances:
+        Repository.__instances[cls.name()] = cls()
+      return Repository.__instances[cls.name()]
+
+  ####################################################################
+  @classmethod
+  def invalidateRoots(cls, vendor = None, category = None,
+                      architecture = None):
+    """Discards the roots memoized in memory for those of vendor (a
+    repository name; e.g., "rhel"), category and architecture which are
+    specified; specifying none discards all.
+
+    Subsequent use rediscovers them, via the cache, as needed.
+    """
+    with Repository.__rootsRegistryLock:
+      registry = Repository.__rootsRegistry
+      Repository.__rootsGeneration += 1
+    if registry is not None:
+      registry.invalidate(vendor, category, architecture)
+
+  ####################################################################
+  @classmethod
+  def metrics(cls):
+    """Returns the Metrics of the requests made and caches used in
+    discovering roots throughout the process.
+    """
+    return Repository.__metrics
+
+  ####################################################################
+  @classmethod
+  def rootsGeneration(cls):
+    """Returns a number which changes whenever memoized roots or cached
+    contents are discarded; i.e., whenever the roots may have changed.
+    """
+    with Repository.__rootsRegistryLock:
+      return Repository.__rootsGeneration
+
+  ####################################################################
+  @classmethod
+  def tracer(cls):
+    """Returns the Tracer of the phases of discovering roots throughout the
+    process.
+    """
+    return Repository.__tracer
+
+  ####################################################################
+  @classmethod
+  def useDaemon(cls, use):
+    """Specifies whether the discovery daemon, if reachable, is queried for
+    available roots rather than performing discovery in-process.
+
+    A daemon found to be unreachable is not queried again by the process
+    unless its use is again specified.  The daemon itself must not query the
+    daemon.
+    """
+    Repository.__daemonEnabled = use
+    Repository.__daemonUnavailable = False
+
   ####################################################################
   def availableRoots(self, architecture = None):
     """Returns a dictionary with keys being the <major>.<minor> and the values
@@ -70,6 +226,10 @@ class Repository(factory.Factory, defaults.DefaultsFileInfo):
 
     This method prioritizes released over latest over nightly versions.
     """
+    roots = self.__privateDaemonRoots("availableRoots", architecture)
+    if roots is not None:
+      return roots
+
     available = self._cachedNightly(architecture)
     available.update(self._cachedLatest(architecture))
     available.update(self._cachedReleased(architecture))
@@ -82,6 +242,10 @@ class Repository(factory.Factory, defaults.DefaultsFileInfo):
 
     This method prioritizes latest over released over nightly versions.
     """
+    roots = self.__privateDaemonRoots("availableLatestRoots", architecture)
+    if roots is not None:
+      return roots
+
     available = self._cachedNightly(architecture)
     available.update(self._cachedReleased(architecture))
     available.update(self._cachedLatest(architecture))
@@ -94,11 +258,136 @@ class Repository(factory.Factory, defaults.DefaultsFileInfo):
 
     This method prioritizes nightly over latest over released versions.
     """
+    roots = self.__privateDaemonRoots("availableNightlyRoots", architecture)
+    if roots is not None:
+      return roots
+
     available = self._cachedReleased(architecture)
     available.update(self._cachedLatest(architecture))
     available.update(self._cachedNightly(architecture))
     return available
 
+  ####################################################################
+  async def availableRootsAsync(self, architecture = None):
+    """Coroutine equivalent of availableRoots.
+    """
+    return await self._discoverAsync(functools.partial(self.availableRoots,
+                                                       architecture))
+
+  ####################################################################
+  async def availableLatestRootsAsync(self, architecture = None):
+    """Coroutine equivalent of availableLatestRoots.
+    """
+    return await self._discoverAsync(
+                        functools.partial(self.availableLatestRoots,
+                                          architecture))
+
+  ####################################################################
+  async def availableNightlyRootsAsync(self, architecture = None):
+    """Coroutine equivalent of availableNightlyRoots.
+    """
+    return await self._discoverAsync(
+                        functools.partial(self.availableNightlyRoots,
+                                          architecture))
+
+  ####################################################################
+  def daemonQuery(self, query, **parameters):
+    """Returns the discovery daemon's result for the query, with the
+    parameters, or None if the daemon is not to be used or is not reachable.
+    """
+    result = None
+    if (Repository.__daemonEnabled and (not Repository.__daemonUnavailable)
+        and (not self.args.forceScan)):
+      try:
+        result = DaemonClient(self.daemonSocket).query(query, **parameters)
+      except DaemonUnavailableException as ex:
+        # Each query of an unreachable daemon would wait for it to time out.
+        log.debug("{0}; discovering in-process hereafter".format(ex))
+        Repository.__daemonUnavailable = True
+      except DaemonException as ex:
+        log.warn("discovery daemon error: {0}".format(ex))
+        log.info("discovering in-process")
+    return result
+
+  ####################################################################
+  @property
+  def daemonRefresh(self):
+    """The number of seconds between the discovery daemon's refreshes of
+    its discovered roots.
+    """
+    if self.__daemonRefresh is None:
+      self.__daemonRefresh = self.__privateInterval(["daemon", "refresh"],
+                                                    "0-1-0", "1 hour")
+    return self.__daemonRefresh
+
+  ####################################################################
+  @property
+  def daemonSocket(self):
+    """The path of the Unix socket on which the discovery daemon listens.
+    """
+    if self.__daemonSocket is None:
+      try:
+        self.__daemonSocket = self.defaults(["daemon", "socket"])
+      except defaults.DefaultsException as ex:
+        log.warn("exception accessing defaults: {0}".format(ex))
+        log.info("using default socket: daemon.socket in cache")
+
+      if self.__daemonSocket is None:
+        self.__daemonSocket = os.path.sep.join([self.__privateCacheRoot,
+                                                self.__privateCacheSubdir,
+                                                "daemon.socket"])
+      self.__daemonSocket = os.path.expanduser(self.__daemonSocket)
+
+    return self.__daemonSocket
+
+  ####################################################################
+  def rootsFor(self, major, category = "released", architecture = None):
+    """Returns a dictionary as availableRoots, availableLatestRoots or
+    availableNightlyRoots, per category ("released", "latest" or "nightly"),
+    containing only the roots of the major version.
+
+    Unless the category's roots are already known only those listings needed
+    to discover the major's roots are retrieved.  The discovered roots are
+    saved in the cache as are all others.
+    """
+    if category not in self.__categoryPriorities:
+      raise ValueError("unknown category: {0}".format(category))
+
+    roots = self.__privateDaemonRoots(self.__categoryQueries[category],
+                                      architecture)
+    if roots is None:
+      if architecture is None:
+        architecture = architectures.Architecture.defaultChoice()
+      roots = {}
+      for priority in self.__categoryPriorities[category]:
+        roots.update(self.__privateMajorRoots(priority, major, architecture))
+    return self.__privateMajorOnly(roots, major)
+
+  ####################################################################
+  def versionRoots(self, version, category = "released", architecture = None):
+    """Returns a dictionary as rootsFor containing only the root of the
+    version, a <major>.<minor> or <major>; empty if there is no such version.
+
+    The category's own roots take priority over those of the others.  If
+    they are saved and need not be refreshed the version's root is looked up
+    in them alone; otherwise the major's roots are obtained as by rootsFor.
+    """
+    if category not in self.__categoryPriorities:
+      raise ValueError("unknown category: {0}".format(category))
+
+    roots = self.__privateDaemonRoots(self.__categoryQueries[category],
+                                      architecture)
+    if roots is None:
+      if architecture is None:
+        architecture = architectures.Architecture.defaultChoice()
+      root = self.__privateSavedRoot(category, version, architecture)
+      if root is not None:
+        return { version : root }
+      roots = self.rootsFor(int(version.split(".", 1)[0]), category,
+                            architecture)
+    return dict([ (key, value) for (key, value) in roots.items()
+                               if key == version ])
+
   ####################################################################
   # Overridden instance-behavior methods
   ####################################################################
@@ -108,6 +397,21 @@ class Repository(factory.Factory, defaults.DefaultsFileInfo):
     self.__cacheRoot = None
     self.__cacheSubdir = None
     self.__cacheRefresh = None
+    self.__concurrencyWorkers = None
+    self.__connectionIdle = None
+    self.__connectionSize = None
+    self.__daemonRefresh = None
+    self.__daemonSocket = None
+    self.__filteredRoots = {}
+    # The filtered roots may be retained, and used, by background refreshes
+    # as well as concurrent discoveries.
+    self.__filteredRootsLock = threading.Lock()
+    self.__listingCache = None
+    self.__memorySize = None
+    self.__scannedRoots = set()
+    self.__staleEnabled = None
+    self.__staleMaximum = None
+    self.__store = None
     super(Repository, self).__init__(args)
 
   ####################################################################
@@ -138,8 +442,9 @@ class Repository(factory.Factory, defaults.DefaultsFileInfo):
     return self.__privateAvailableRoots(self._categoryLatest(architecture),
                                         architecture,
                                         functools.partial(
-                                          self. _filterRepos,
-                                          self._agnosticLatest(architecture),
+                                          self.__privateFilterRepos,
+                                          self._categoryLatest,
+                                          self._agnosticLatest,
                                           architecture))
 
   ####################################################################
@@ -147,8 +452,9 @@ class Repository(factory.Factory, defaults.DefaultsFileInfo):
     return self.__privateAvailableRoots(self._categoryNightly(architecture),
                                         architecture,
                                         functools.partial(
-                                          self. _filterRepos,
-                                          self._agnosticNightly(architecture),
+                                          self.__privateFilterRepos,
+                                          self._categoryNightly,
+                                          self._agnosticNightly,
                                           architecture))
 
   ####################################################################
@@ -156,40 +462,34 @@ class Repository(factory.Factory, defaults.DefaultsFileInfo):
     return self.__privateAvailableRoots(self._categoryReleased(architecture),
                                         architecture,
                                         functools.partial(
-                                          self. _filterRepos,
-                                          self._agnosticReleased(architecture),
+                                          self.__privateFilterRepos,
+                                          self._categoryReleased,
+                                          self._agnosticReleased,
                                           architecture))
 
   ####################################################################
   def _cachedLatest(self, architecture = None):
-    if self.__cachedLatest is None:
-      self.__cachedLatest = {}
     if architecture is None:
       architecture = architectures.Architecture.defaultChoice()
-    if architecture not in self.__cachedLatest:
-      self.__cachedLatest[architecture] = self._availableLatest(architecture)
-    return self.__cachedLatest[architecture].copy()
+    return self.__privateCachedRoots(self._categoryLatest(architecture),
+                                     architecture,
+                                     self._availableLatest)
 
   ####################################################################
   def _cachedNightly(self, architecture = None):
-    if self.__cachedNightly is None:
-      self.__cachedNightly = {}
     if architecture is None:
       architecture = architectures.Architecture.defaultChoice()
-    if architecture not in self.__cachedNightly:
-      self.__cachedNightly[architecture] = self._availableNightly(architecture)
-    return self.__cachedNightly[architecture].copy()
+    return self.__privateCachedRoots(self._categoryNightly(architecture),
+                                     architecture,
+                                     self._availableNightly)
 
   ####################################################################
   def _cachedReleased(self, architecture = None):
-    if self.__cachedReleased is None:
-      self.__cachedReleased = {}
     if architecture is None:
       architecture = architectures.Architecture.defaultChoice()
-    if architecture not in self.__cachedReleased:
-      self.__cachedReleased[architecture] = self._availableReleased(
-                                                                architecture)
-    return self.__cachedReleased[architecture].copy()
+    return self.__privateCachedRoots(self._categoryReleased(architecture),
+                                     architecture,
+                                     self._availableReleased)
 
   ####################################################################
   def _categoryLatest(self, architecture):
@@ -213,6 +513,71 @@ class Repository(factory.Factory, defaults.DefaultsFileInfo):
   def _defaultArguments(self):
     return argparse.Namespace(forceScan = False)
 
+  ####################################################################
+  async def _discoverAsync(self, discover):
+    """Returns the result of calling discover, a callable performing
+    discovery via _uri_contents, without blocking the event loop on
+    network access.
+
+    Discovery is first performed without any network access, recording, in
+    the context of the discovery, each uri whose contents are not yet known.
+    Those uris are retrieved concurrently and discovery is repeated until no
+    unknown uris remain.  Each repetition uses the already retrieved
+    contents so the number of repetitions is bounded by the depth of the
+    repository tree.
+
+    No results of an incomplete discovery are cached, either in memory or
+    in the cache files.
+    """
+    import asyncio
+
+    # Each discovery is performed in an executor, off the event loop, as it
+    # may block on the daemon, the cache files and their locks.
+    loop = asyncio.get_running_loop()
+    while True:
+      pending = set()
+      context = contextvars.copy_context()
+      context.run(self.__pendingUris.set, pending)
+      await loop.run_in_executor(None, context.run, discover)
+      if len(pending) == 0:
+        break
+
+      semaphore = asyncio.Semaphore(self.__privateConcurrencyWorkers)
+      async def retrieve(uri):
+        async with semaphore:
+          await self._uri_contents_async(uri)
+      with self._span("retrievePending", uris = len(pending)):
+        await asyncio.gather(*[retrieve(uri) for uri in pending])
+
+    return await loop.run_in_executor(None,
+                                      contextvars.copy_context().run,
+                                      discover)
+
+  ####################################################################
+  def _filterConcurrently(self, repos, predicate):
+    """Returns a dictionary of those repos for which predicate(key, value)
+    is true, preserving the order of repos.
+
+    As the predicate is expected to perform network queries it is evaluated
+    concurrently; see _mapConcurrently.
+    """
+    results = self._mapConcurrently(repos, predicate)
+    return dict([ (key, value) for (key, value) in repos.items()
+                               if results[key] ])
+
+  ####################################################################
+  def _filterReposByArchitecture(self, repos, architectures):
+    """Returns a dictionary, keyed by architecture, of the repos filtered for
+    each of the specified architectures as per _filterRepos.
+
+    By default the repos are filtered separately for each architecture.
+    Subclasses which can determine all the architectures a repo provides
+    with a single query should override this to filter for all the
+    architectures in a single pass; see _partitionByArchitecture.
+    """
+    return dict([ (architecture, self._filterRepos(repos, architecture))
+                  for architecture in architectures ])
+
   ####################################################################
   def _filterRepos(self, repos, architecture = None):
     """Filters out the repos that don't have a subdir for the
@@ -227,15 +592,24 @@ class Repository(factory.Factory, defaults.DefaultsFileInfo):
     return repos
 
   ####################################################################
-  def _findAgnosticLatestRoots(self, architecture):
+  def _findAgnosticLatestRoots(self, architecture, major = None):
+    """Returns the roots, regardless of architecture, limited to those of
+    major if specified.
+    """
     raise NotImplementedError
 
   ####################################################################
-  def _findAgnosticNightlyRoots(self, architecture):
+  def _findAgnosticNightlyRoots(self, architecture, major = None):
+    """Returns the roots, regardless of architecture, limited to those of
+    major if specified.
+    """
     raise NotImplementedError
 
   ####################################################################
-  def _findAgnosticReleasedRoots(self, architecture):
+  def _findAgnosticReleasedRoots(self, architecture, major = None):
+    """Returns the roots, regardless of architecture, limited to those of
+    major if specified.
+    """
     raise NotImplementedError
 
   ####################################################################
@@ -251,6 +625,32 @@ class Repository(factory.Factory, defaults.DefaultsFileInfo):
       path = self._releasedStartingPath(architecture)
     return path
 
+  ####################################################################
+  def _mapConcurrently(self, repos, function):
+    """Returns a dictionary, keyed as repos, of function(key, value) for each
+    of the repos.
+
+    As the function is expected to perform network queries it is evaluated
+    concurrently, limited by the configured number of workers.
+    """
+    items = list(repos.items())
+    workers = min(self.__privateConcurrencyWorkers, len(items))
+    if (workers < 2) or (self.__pendingUris.get() is not None):
+      results = [function(key, value) for (key, value) in items]
+    else:
+      # Each worker runs in a copy of the caller's context so that its spans
+      # are nested within the caller's.
+      from concurrent import futures
+
+      contexts = [ contextvars.copy_context() for _ in items ]
+      with futures.ThreadPoolExecutor(max_workers = workers) as executor:
+        results = list(executor.map(
+                        lambda context, item: context.run(function, *item),
+                        contexts,
+                        items))
+    return dict([ (key, result)
+                  for ((key, _), result) in zip(items, results) ])
+
   ####################################################################
   def _nightlyStartingPath(self, architecture = None):
     path = self.defaults([self.name().lower(), "paths", "nightly"])
@@ -272,141 +672,203 @@ class Repository(factory.Factory, defaults.DefaultsFileInfo):
       path = "{0}{1}".format(self._startingPathPrefix(architecture), path)
     return path
 
+  ####################################################################
+  def _partitionByArchitecture(self, repos, architectures, provided):
+    """Returns a dictionary, keyed by architecture, of the repos providing
+    each of the specified architectures.
+
+    provided(key, value) returns the names, lowercased, of the architectures
+    a repo provides; it is evaluated once per repo, concurrently.
+    """
+    repos = dict([ (key, value) for (key, value) in repos.items()
+                                if key != self.uriError ])
+    provides = self._mapConcurrently(repos, provided)
+    return dict([ (architecture,
+                   dict([ (key, value) for (key, value) in repos.items()
+                                       if architecture.lower()
+                                          in provides[key] ]))
+                  for architecture in architectures ])
+
   ####################################################################
   def _path_contents(self, path = None):
-    contents = ""
+    contents = LinkIndex()
     if path is None:
       path = self._releasedStartingPath()
     if (path is not None) and (self._host() is not None):
       contents = self._uri_contents("http://{0}{1}".format(self._host(), path))
     return contents
 
+  ####################################################################
+  def _span(self, name, **attributes):
+    """Returns a context manager timing the enclosed phase of discovery as a
+    span, with the repository as its vendor; see Tracer.span.
+    """
+    return self.__tracer.span(name, vendor = self.name(), **attributes)
+
   ####################################################################
   def _startingPathPrefix(self, architecture):
     return ""
 
+  ####################################################################
+  def _versionIndex(self, contents, regex):
+    """Returns a VersionIndex of the names of the links in contents matched
+    by regex.
+
+    The groups of regex are the name, major, minor and zStream of the
+    version; the zStream, if present, is preceded by '.'.  A missing zStream
+    is treated as 0.
+    """
+    return VersionIndex([ ((int(match.group(2)),
+                            int(match.group(3)),
+                            int(match.group(4).lstrip("."))
+                              if match.group(4) != "" else 0),
+                           match.group(1))
+                          for match in contents.matches(regex) ])
+
   ####################################################################
   def _uri_contents(self, uri, retries = 3):
+    """Returns the LinkIndex of the uri's listing or uriError if it could
+    not be retrieved.
+    """
     if not uri.endswith("/"):
       uri = "{0}/".format(uri)
-    if uri not in self.__cachedUriContents:
-      log.debug("retrieving contents from uri: {0}".format(uri))
-      parsed = urlparse.urlparse(uri)
-      for iteration in range(retries):
-        try:
-          connection = httplib.HTTPConnection(parsed.netloc, timeout = 10)
-          connection.request("GET", parsed.path)
-          response = connection.getresponse()
-          if response.status == 200:
-            self.__cachedUriContents[uri] = response.read().decode("UTF-8")
-            break
-          log.debug("response status {0} on iteration {1}"
-                      .format(response.status, iteration))
-          if (iteration < (retries - 1)):
-            sleep = min(5, 1 << iteration)
-            log.debug("sleeping {0} second(s) before retrying".format(sleep))
-            time.sleep(sleep)
-        except (socket.gaierror, socket.timeout):
-          log.debug("socket error on iteration {0}".format(iteration))
-      else: # for
-        # We log this at info level because some distributions don't
-        # necessarily support all the architectures of potential interest.
-        log.info("retries exhausted; caching uri error contents for {0}"
-                  .format(uri))
-        self.__cachedUriContents[uri] = self.uriError
-
-    return self.__cachedUriContents[uri]
+    with self.__cachedUriContentsLock:
+      contents = self.__cachedUriContents.get(uri)
+      if contents is None:
+        uriLock = self.__uriLocks.setdefault(uri, threading.Lock())
+
+    if (contents is None) and (self.__pendingUris.get() is not None):
+      # Discovery without network access; see _discoverAsync.
+      self.__pendingUris.get().add(uri)
+      contents = self.uriError
+    elif contents is None:
+      # Only one thread retrieves any given uri; any others wait for it to
+      # do so and then use the cached contents.
+      with uriLock:
+        contents = self.__cachedUriContents.get(uri)
+        self.__metrics.cache("uriContents", contents is not None)
+        if contents is None:
+          contents = self.__privateRetrieveUri(uri, retries)
+          with self.__cachedUriContentsLock:
+            self.__cachedUriContents[uri] = contents
+            self.__uriLocks.pop(uri, None)
+    elif self.__pendingUris.get() is None:
+      self.__metrics.cache("uriContents", True)
+
+    return contents
 
   ####################################################################
-  # Private methods
+  def _uri_directories(self, uri):
+    """Returns a frozenset of the names, lowercased, of the directories
+    listed in the uri's contents.
+    """
+    contents = self._uri_contents(uri)
+    return frozenset() if contents == self.uriError else contents.directories()
+
   ####################################################################
-  def __privateAgnosticFileName(self, category):
-    return "agnostic.{0}.json".format(category)
+  async def _uri_contents_async(self, uri, retries = 3):
+    """Coroutine equivalent of _uri_contents.
+
+    Concurrent requests for the same uri share a single retrieval.
+    """
+    import asyncio
+
+    if not uri.endswith("/"):
+      uri = "{0}/".format(uri)
+    contents = self.__cachedUriContents.get(uri)
+    if contents is None:
+      task = self.__uriTasks.get(uri)
+      self.__metrics.cache("uriContents", task is not None)
+      if (task is None) or (task.get_loop() is not asyncio.get_running_loop()):
+        task = asyncio.ensure_future(self.__privateRetrieveUriAsync(uri,
+                                                                    retries))
+        self.__uriTasks[uri] = task
+        task.add_done_callback(
+          lambda done: (self.__uriTasks.pop(uri, None)
+                          if self.__uriTasks.get(uri) is done else None))
+      contents = await asyncio.shield(task)
+    else:
+      self.__metrics.cache("uriContents", True)
+
+    return contents
 
+  ####################################################################
+  # Private methods
   ####################################################################
   def __privateAgnosticRoots(self, category, finder):
-    if self.__agnosticRoots is None:
-      self.__agnosticRoots = {}
-    if category not in self.__agnosticRoots:
-      openFile = self.__privateOpenFile(
-                  self.__privateAgnosticFileName(category))
-      try:
-        roots = self.__privateLoadFile(
-                  openFile,
+    key = (self.name(), category, None)
+    roots = self.__privateMemoized(key)
+    if roots is None:
+      with self._span("agnosticRoots", category = category):
+        roots = self.__privateLoadRoots(
+                  category,
+                  None,
                   finder,
                   "Updating saved {0} {1} repos".format(self.className(),
                                                         category),
                   forceScan = self.args.forceScan)
-        self.__agnosticRoots[category] = roots
-      finally:
-        openFile.close()
-    return self.__agnosticRoots[category]
-
-  ####################################################################
-  def __privateAvailableFileName(self, category, architecture):
-    return "available.{0}.{1}.json".format(category, architecture)
+      if self.__pendingUris.get() is not None:
+        # Discovery is incomplete; see _discoverAsync.
+        return roots
+      self.__privateMemoize(key, roots)
+    return roots
 
   ####################################################################
   def __privateAvailableRoots(self, category, architecture, finder):
-    roots = None
-    openFile = self.__privateOpenFile(
-                 self.__privateAvailableFileName(category, architecture))
-    try:
-      with self.__privateOpenFile(
-            self.__privateAgnosticFileName(category)) as f:
-        mtime = self.__privateFileMtime(f)
-      roots = self.__privateLoadFile(
-                openFile,
-                finder,
-                "Updating saved {0} {1} {2} repos ".format(self.className(),
-                                                           category,
-                                                           architecture),
-                mtime,
-                forceScan = self.args.forceScan)
-    finally:
-      openFile.close()
+    roots = self.__privateLoadRoots(
+              category,
+              architecture,
+              finder,
+              "Updating saved {0} {1} {2} repos ".format(self.className(),
+                                                         category,
+                                                         architecture),
+              self.__privateStore.mtime(category),
+              forceScan = self.args.forceScan)
+    if self.__pendingUris.get() is None:
+      # Filtered roots retained for the architecture are not used if the
+      # saved roots were; see __privateFilterRepos.
+      with self.__filteredRootsLock:
+        self.__filteredRoots.pop((category, architecture), None)
     return roots
 
+  ####################################################################
+  def __privateCachedRoots(self, category, architecture, finder):
+    """Returns a copy of the memoized available roots of the category for
+    the architecture, obtaining them via finder(architecture) if need be.
+    """
+    key = (self.name(), category, architecture)
+    roots = self.__privateMemoized(key)
+    if roots is None:
+      with self._span("availableRoots", category = category,
+                      architecture = architecture):
+        roots = finder(architecture)
+      if self.__pendingUris.get() is not None:
+        # Discovery is incomplete; see _discoverAsync.
+        return roots
+      self.__privateMemoize(key, roots)
+    return roots.copy()
+
+  ####################################################################
+  @property
+  def __privateAsyncConnectionPool(self):
+    import asyncio
+    from .AsyncConnectionPool import AsyncConnectionPool
+
+    loop = asyncio.get_running_loop()
+    with self.__connectionPoolLock:
+      pool = Repository.__asyncConnectionPools.get(loop)
+      if pool is None:
+        pool = AsyncConnectionPool(self.__privateConnectionSize,
+                                   self.__privateConnectionIdle)
+        Repository.__asyncConnectionPools[loop] = pool
+    return pool
+
   ####################################################################
   @property
   def __privateCacheRefresh(self):
     if self.__cacheRefresh is None:
-      try:
-        self.__cacheRefresh = self.defaults(["cache", "refresh"])
-      except defaults.DefaultsException as ex:
-        log.warn("exception accessing defaults: {0}".format(ex))
-        log.info("using default refresh: 1 day")
-
-      if self.__cacheRefresh is None:
-        self.__cacheRefresh = "1-0-0"
-
-      refresh = self.__cacheRefresh.split("-")
-      if len(refresh) > 3:
-        log.warn("more than three refresh fields specified: {0}"
-                  .format(self.__cacheRefresh))
-        refresh = refresh[-3:]
-        log.info("using rightmost fields as refresh: {0}"
-                  .format("-".join(refresh)))
-
-      try:
-        refresh = list(map(lambda x: int(x), refresh))
-      except ValueError:
-        log.warn("could not convert one or more fields to integers: {0}"
-                  .format("-".join(refresh)))
-        log.info("using default refresh: 1 day")
-        refresh = [1, 0, 0]
-
-      refresh.reverse()
-      refresh = dict(itertools.zip_longest(("minutes", "hours", "days"),
-                                           refresh, fillvalue = 0))
-
-      self.__cacheRefresh = ((refresh["days"] * 86400)
-                              + (refresh["hours"] * 3600)
-                              + (refresh["minutes"] * 60))
-      if self.__cacheRefresh < 60:
-        log.debug("forcing refresh minimum: 1 minute")
-        self.__cacheRefresh = 60
-
+      self.__cacheRefresh = self.__privateInterval(["cache", "refresh"],
+                                                   "1-0-0", "1 day")
     return self.__cacheRefresh
 
   ####################################################################
@@ -445,6 +907,139 @@ class Repository(factory.Factory, defaults.DefaultsFileInfo):
 
     return self.__cacheSubdir
 
+  ####################################################################
+  def __privateCheckRoots(self, category, architecture,
+                          dependencyMtime = None, forceScan = False,
+                          refresher = None):
+    """Returns a tuple of the saved roots, if any, and whether a scan is
+    required to update them.
+
+    If a refresher is specified and stale contents are being served, stale
+    roots are returned as not requiring a scan and the refresher is invoked
+    to refresh them in the background.
+    """
+    (roots, mtime) = self.__privateStore.load(category, architecture)
+    # Scan if ...
+    #   - we've been explicitly told to or
+    #   - there are no saved roots or
+    #   - the saved roots indicate an error occurred or
+    #   - their dependency is more recent than the roots themselves or
+    #   - it's been more than the cache refresh time since they were saved;
+    #     unless stale contents are being served.
+    scan = forceScan or (roots is None) or (self.uriError in roots)
+    if not scan:
+      age = time.time() - mtime
+      stale = (((dependencyMtime is not None) and (dependencyMtime > mtime))
+               or (age >= self.__privateCacheRefresh))
+      if (stale and (refresher is not None) and self.__privateStaleEnabled
+          and (age < self.__privateStaleMaximum)):
+        # Use the stale contents and refresh them in the background.
+        if self.__pendingUris.get() is None:
+          refresher()
+      else:
+        scan = stale
+
+    return (roots, scan)
+
+  ####################################################################
+  @property
+  def __privateConcurrencyWorkers(self):
+    if self.__concurrencyWorkers is None:
+      try:
+        self.__concurrencyWorkers = self.defaults(["concurrency", "workers"])
+      except defaults.DefaultsException as ex:
+        log.warn("exception accessing defaults: {0}".format(ex))
+        log.info("using default workers: 8")
+
+      if self.__concurrencyWorkers is None:
+        self.__concurrencyWorkers = 8
+
+      try:
+        self.__concurrencyWorkers = int(self.__concurrencyWorkers)
+      except ValueError:
+        log.warn("could not convert workers to integer: {0}"
+                  .format(self.__concurrencyWorkers))
+        log.info("using default workers: 8")
+        self.__concurrencyWorkers = 8
+
+      if self.__concurrencyWorkers < 1:
+        log.debug("forcing workers minimum: 1")
+        self.__concurrencyWorkers = 1
+
+    return self.__concurrencyWorkers
+
+  ####################################################################
+  @property
+  def __privateConnectionIdle(self):
+    if self.__connectionIdle is None:
+      try:
+        self.__connectionIdle = self.defaults(["connections", "idle"])
+      except defaults.DefaultsException as ex:
+        log.warn("exception accessing defaults: {0}".format(ex))
+        log.info("using default idle: 30 seconds")
+
+      if self.__connectionIdle is None:
+        self.__connectionIdle = 30
+
+      try:
+        self.__connectionIdle = int(self.__connectionIdle)
+      except ValueError:
+        log.warn("could not convert idle to integer: {0}"
+                  .format(self.__connectionIdle))
+        log.info("using default idle: 30 seconds")
+        self.__connectionIdle = 30
+
+    return self.__connectionIdle
+
+  ####################################################################
+  @property
+  def __privateConnectionPool(self):
+    with self.__connectionPoolLock:
+      if Repository.__connectionPool is None:
+        Repository.__connectionPool = ConnectionPool(
+                                        self.__privateConnectionSize,
+                                        self.__privateConnectionIdle)
+        atexit.register(Repository.__connectionPool.close)
+    return Repository.__connectionPool
+
+  ####################################################################
+  @property
+  def __privateConnectionSize(self):
+    if self.__connectionSize is None:
+      try:
+        self.__connectionSize = self.defaults(["connections", "size"])
+      except defaults.DefaultsException as ex:
+        log.warn("exception accessing defaults: {0}".format(ex))
+        log.info("using default size: 8")
+
+      if self.__connectionSize is None:
+        self.__connectionSize = 8
+
+      try:
+        self.__connectionSize = int(self.__connectionSize)
+      except ValueError:
+        log.warn("could not convert size to integer: {0}"
+                  .format(self.__connectionSize))
+        log.info("using default size: 8")
+        self.__connectionSize = 8
+
+      if self.__connectionSize < 0:
+        log.debug("forcing size minimum: 0")
+        self.__connectionSize = 0
+
+    return self.__connectionSize
+
+  ####################################################################
+  def __privateDaemonRoots(self, query, architecture):
+    """Returns the roots reported by the discovery daemon for the query or
+    None if the daemon is not to be used or is not reachable.
+    """
+    if architecture is None:
+      architecture = architectures.Architecture.defaultChoice()
+    return self.daemonQuery(query,
+                            repository = self.name(),
+                            architecture = architecture)
+
   ####################################################################
   def __privateDirPath(self):
     return os.path.sep.join([self.__privateCacheRoot,
@@ -452,73 +1047,547 @@ class Repository(factory.Factory, defaults.DefaultsFileInfo):
                              self.className()])
 
   ####################################################################
-  def __privateFileMtime(self, openFile):
-    stats = os.fstat(openFile.fileno())
-    return stats.st_mtime
+  def __privateFilterRepos(self, categorizer, agnostic, architecture):
+    """Returns the agnostic roots filtered for the architecture.
+
+    The roots are filtered in the same pass for every architecture sharing
+    the architecture's category, and thus its agnostic roots; the results
+    for those other architectures are retained for their own use.
+    """
+    category = categorizer(architecture)
+    key = (category, architecture)
+    # The architectures may be discovered concurrently (e.g., see
+    # Distribution.mappingsFor); each retained result is used once and only
+    # if no roots have been discarded since it was retained.
+    generation = Repository.__rootsGeneration
+    with self.__filteredRootsLock:
+      retained = (self.__filteredRoots.get(key)
+                    if self.__pendingUris.get() is not None
+                    else self.__filteredRoots.pop(key, None))
+    if (retained is not None) and (retained[0] == generation):
+      return retained[1]
+
+    siblings = [ choice for choice in architectures.Architecture.choices()
+                        if (choice != architecture)
+                            and (categorizer(choice) == category) ]
+    repos = agnostic(architecture)
+    with self._span("filterRepos", category = category,
+                    architecture = ",".join([architecture] + siblings)):
+      filtered = self._filterReposByArchitecture(repos,
+                                                 [architecture] + siblings)
+    if self.__pendingUris.get() is None:
+      # Discovery is complete; see _discoverAsync.
+      with self.__filteredRootsLock:
+        for sibling in siblings:
+          self.__filteredRoots[(category, sibling)] = (generation,
+                                                       filtered[sibling])
+    return filtered[architecture]
 
   ####################################################################
-  def __privateLoadFile(self, openFile, finder, logMessage,
-                        dependencyMtime = None, forceScan = False):
-    roots = None
-    stats = os.fstat(openFile.fileno())
-    # Truncate the file if ...
-    #   - we've been explicitly told to or
-    #   - its dependency is more recent than the file itself or
-    #   - it's been more than the cache refresh time since it was updated or
-    #   - it contains no actual data (i.e., it's zero size, indicating a newly
-    #     created file) or
-    #   - the contained data indicates an error occurred.
-    forceScan = (forceScan
-                  or ((dependencyMtime is not None)
-                      and (dependencyMtime > stats.st_mtime))
-                  or ((time.time() - stats.st_mtime)
-                      >= self.__privateCacheRefresh)
-                  or (stats.st_size == 0))
-    if not forceScan:
-      roots = json.loads(openFile.read())
-      forceScan = self.uriError in roots
-
-    if forceScan:
-      log.info(logMessage)
-      openFile.truncate(0)
-      openFile.seek(0)
-      self.__privateSaveFile(openFile, finder())
-      openFile.seek(0)
-      roots = json.loads(openFile.read())
+  def __privateInterval(self, keys, default, description):
+    """Returns the number of seconds specified by the defaults entry
+    identified by keys, formatted as <days>-<hours>-<minutes>.
+    """
+    interval = None
+    try:
+      interval = self.defaults(keys)
+    except defaults.DefaultsException as ex:
+      log.warn("exception accessing defaults: {0}".format(ex))
+      log.info("using default {0}: {1}".format(keys[-1], description))
+
+    if interval is None:
+      interval = default
+
+    fields = "{0}".format(interval).split("-")
+    if len(fields) > 3:
+      log.warn("more than three {0} fields specified: {1}"
+                .format(keys[-1], interval))
+      fields = fields[-3:]
+      log.info("using rightmost fields as {0}: {1}"
+                .format(keys[-1], "-".join(fields)))
+
+    try:
+      fields = list(map(lambda x: int(x), fields))
+    except ValueError:
+      log.warn("could not convert one or more fields to integers: {0}"
+                .format("-".join(fields)))
+      log.info("using default {0}: {1}".format(keys[-1], description))
+      fields = list(map(lambda x: int(x), default.split("-")))
+
+    fields.reverse()
+    fields = dict(itertools.zip_longest(("minutes", "hours", "days"),
+                                        fields, fillvalue = 0))
+
+    interval = ((fields["days"] * 86400)
+                + (fields["hours"] * 3600)
+                + (fields["minutes"] * 60))
+    if interval < 60:
+      log.debug("forcing {0} minimum: 1 minute".format(keys[-1]))
+      interval = 60
+
+    return interval
+
+  ####################################################################
+  @property
+  def __privateListingCache(self):
+    if self.__listingCache is None:
+      size = None
+      try:
+        size = self.defaults(["cache", "listings", "size"])
+      except defaults.DefaultsException as ex:
+        log.warn("exception accessing defaults: {0}".format(ex))
+        log.info("using default listings size: 64 megabytes")
+
+      if size is None:
+        size = 64
+
+      try:
+        size = int(size)
+      except ValueError:
+        log.warn("could not convert listings size to integer: {0}"
+                  .format(size))
+        log.info("using default listings size: 64 megabytes")
+        size = 64
+
+      self.__listingCache = ListingCache(
+                              os.path.sep.join([self.__privateCacheRoot,
+                                                self.__privateCacheSubdir,
+                                                "listings"]),
+                              self.__privateInterval(
+                                                  ["cache", "listings",
+                                                   "refresh"],
+                                                  "0-1-0", "1 hour"),
+                              size * 1024 * 1024,
+                              self.__privateInterval(
+                                                  ["cache", "negative",
+                                                   "missing"],
+                                                  "1-0-0", "1 day"),
+                              self.__privateInterval(
+                                                  ["cache", "negative",
+                                                   "transient"],
+                                                  "0-0-10", "10 minutes"))
+    return self.__listingCache
+
+  ####################################################################
+  def __privateLoadRoots(self, category, architecture, finder, logMessage,
+                         dependencyMtime = None, forceScan = False):
+    (roots, scan) = self.__privateCheckRoots(
+                      category,
+                      architecture,
+                      dependencyMtime,
+                      forceScan,
+                      functools.partial(self.__privateRefreshInBackground,
+                                        category, architecture, finder,
+                                        logMessage))
+    if scan and (self.__pendingUris.get() is not None):
+      # Discovery is incomplete and is not to be saved; see _discoverAsync.
+      roots = finder()
+    elif scan:
+      # Only one process or thread rescans at a time.  Any others wait for it
+      # to finish and then use its results.
+      refreshLock = self.__privateStore.lock(
+                      "{0}.refresh".format(
+                        self.__privateStore.name(category, architecture)),
+                      fcntl.LOCK_EX)
+      try:
+        if not forceScan:
+          (roots, scan) = self.__privateCheckRoots(category, architecture,
+                                                   dependencyMtime)
+        if scan:
+          log.info(logMessage)
+          roots = finder()
+          with self._span("saveRoots", category = category,
+                          architecture = architecture):
+            self.__privateStore.save(category, architecture, roots)
+      finally:
+        refreshLock.close()
 
+    if self.__pendingUris.get() is None:
+      self.__metrics.cache("savedRoots", not scan)
     return roots
 
   ####################################################################
-  def __privateOpenFile(self, name):
-    try:
-      os.makedirs(self.__privateDirPath(), 0o700)
-    except OSError as ex:
-      if ex.errno != errno.EEXIST:
-        raise
-    try:
-      fd = os.open(os.path.sep.join([self.__privateDirPath(), name]),
-                   os.O_CREAT | os.O_EXCL | os.O_RDWR, 0o640)
-    except OSError as ex:
-      if ex.errno != errno.EEXIST:
-        raise
-      fd = os.open(os.path.sep.join([self.__privateDirPath(), name]),
-                   os.O_RDWR, 0o640)
-    try:
-      openFile = os.fdopen(fd, "r+")
-    except:
-      os.close(fd)
-      raise
+  def __privateMajorOnly(self, roots, major):
+    """Returns those of the roots whose version is of the major.
+    """
+    return dict([ (key, value) for (key, value) in roots.items()
+                               if key.split(".", 1)[0] == "{0}".format(major) ])
 
-    try:
-      fcntl.flock(openFile, fcntl.LOCK_EX)
-    except:
-      openFile.close()
-      raise
+  ####################################################################
+  def __privateMajorRoots(self, category, major, architecture):
+    """Returns the available roots of the category ("released", "latest" or
+    "nightly") for the architecture limited to those of the major.
+
+    Roots already discovered for the category, whether in memory or saved,
+    are used as is; otherwise only the major's roots are discovered and are
+    saved separately from those of the category.
+    """
+    (categorizer, finder) = {
+      "latest"   : (self._categoryLatest, self._findAgnosticLatestRoots),
+      "nightly"  : (self._categoryNightly, self._findAgnosticNightlyRoots),
+      "released" : (self._categoryReleased,
+                    self._findAgnosticReleasedRoots) }[category]
+    category = categorizer(architecture)
+    roots = self.__privateMemoized((self.name(), category, architecture))
+    if roots is not None:
+      return self.__privateMajorOnly(roots, major)
+
+    (roots, scan) = self.__privateCheckRoots(
+                      category,
+                      architecture,
+                      self.__privateStore.mtime(category),
+                      forceScan = self.args.forceScan)
+    if not scan:
+      self.__metrics.cache("savedRoots", True)
+      return self.__privateMajorOnly(roots, major)
+
+    def find():
+      with self._span("agnosticRoots", category = category, major = major):
+        agnostic = finder(architecture, major)
+      if self.uriError in agnostic:
+        return self.uriErrorRoot
+      with self._span("filterRepos", category = category,
+                      architecture = architecture):
+        return self._filterRepos(agnostic, architecture)
+
+    majorCategory = "{0}-{1}".format(category, major)
+    roots = self.__privateLoadRoots(
+              majorCategory,
+              architecture,
+              find,
+              "Updating saved {0} {1} {2} repos".format(self.className(),
+                                                        majorCategory,
+                                                        architecture),
+              forceScan = self.args.forceScan)
+    return self.__privateMajorOnly(roots, major)
+
+  ####################################################################
+  def __privateMemoize(self, key, roots):
+    """Memoizes the roots for the key, (name, category, architecture).
+    """
+    if self.args.forceScan:
+      self.__scannedRoots.add(key)
+    self.__privateRootsRegistry.put(key, roots)
+
+  ####################################################################
+  def __privateMemoized(self, key):
+    """Returns the roots memoized for the key, (name, category, architecture),
+    or None if there are none.
+
+    When forcing a scan only those roots scanned by this instance are used.
+    """
+    roots = None
+    if (not self.args.forceScan) or (key in self.__scannedRoots):
+      roots = self.__privateRootsRegistry.get(key)
+    if self.__pendingUris.get() is None:
+      self.__metrics.cache("memoizedRoots", roots is not None)
+    return roots
+
+  ####################################################################
+  @property
+  def __privateMemorySize(self):
+    if self.__memorySize is None:
+      try:
+        self.__memorySize = self.defaults(["cache", "memory", "size"])
+      except defaults.DefaultsException as ex:
+        log.warn("exception accessing defaults: {0}".format(ex))
+        log.info("using default size: 64")
+
+      if self.__memorySize is None:
+        self.__memorySize = 64
 
-    return openFile
+      try:
+        self.__memorySize = int(self.__memorySize)
+      except ValueError:
+        log.warn("could not convert size to integer: {0}"
+                  .format(self.__memorySize))
+        log.info("using default size: 64")
+        self.__memorySize = 64
+
+      if self.__memorySize < 1:
+        log.debug("forcing size minimum: 1")
+        self.__memorySize = 1
+
+    return self.__memorySize
+
+  ####################################################################
+  def __privateRefreshInBackground(self, category, architecture, finder,
+                                   logMessage):
+    # The refresh lock ensures only one refresh of the roots is performed at
+    # a time, across processes as well as threads.  If another refresh is in
+    # progress there is nothing to do.
+    name = self.__privateStore.name(category, architecture)
+    lockFile = self.__privateStore.lock("{0}.refresh".format(name),
+                                        fcntl.LOCK_EX | fcntl.LOCK_NB)
+    if lockFile is None:
+      log.debug("refresh of {0} already in progress".format(name))
+      return
+
+    def refresh():
+      try:
+        log.info("{0} in background".format(logMessage))
+        self.__privateStore.save(category, architecture, finder())
+      except Exception as ex:
+        log.warn("background refresh of {0} failed: {1}".format(name, ex))
+      finally:
+        lockFile.close()
+
+    # Not a daemon thread so that an exiting process completes the refresh
+    # rather than abandoning it; short-lived processes would otherwise never
+    # refresh the stale roots.
+    thread = threading.Thread(target = refresh,
+                              name = "refresh {0} {1}".format(self.className(),
+                                                              name))
+    thread.start()
+
+  ####################################################################
+  def __privateRetrieveUri(self, uri, retries):
+    log.debug("retrieving contents from uri: {0}".format(uri))
+    parsed = urlparse.urlparse(uri)
+    entry = self.__privateListingCache.load(uri)
+    fresh = ((entry is not None) and (not self.args.forceScan)
+             and self.__privateListingCache.isFresh(entry))
+    self.__metrics.cache("listings", fresh)
+    if fresh:
+      if self.__privateListingCache.isError(entry):
+        log.debug("using saved {0} error for uri: {1}".format(entry["error"],
+                                                              uri))
+        return self.uriError
+      log.debug("using saved contents for uri: {0}".format(uri))
+      return LinkIndex(entry["links"])
+
+    for iteration in range(retries):
+      if iteration > 0:
+        self.__metrics.retry(parsed.netloc)
+      started = time.time()
+      try:
+        # The listing is parsed as it is received.
+        parser = LinkIndexParser()
+        with self._span("fetch", uri = uri, attempt = iteration + 1) as span:
+          (response, body) = self.__privateConnectionPool.request(
+                                    parsed.netloc,
+                                    parsed.path,
+                                    self.__privateListingCache.headers(entry),
+                                    parser.feed)
+          span.update(status = response.status,
+                      bytes = parser.received() + len(body or b""))
+        self.__metrics.request(parsed.netloc, span["status"], span["bytes"],
+                               time.time() - started)
+        if ((response.status == 304) and (entry is not None)
+            and (not self.__privateListingCache.isError(entry))):
+          log.debug("contents unchanged for uri: {0}".format(uri))
+          contents = LinkIndex(entry["links"])
+          self.__privateListingCache.revalidated(entry)
+          break
+        if response.status == 200:
+          contents = parser.index()
+          self.__privateListingCache.save(uri,
+                                          contents.links,
+                                          response.getheader("ETag"),
+                                          response.getheader("Last-Modified"))
+          break
+        if response.status in self.__uriMissingStatuses:
+          contents = self.__privateUriMissing(uri, response.status)
+          break
+        log.debug("response status {0} on iteration {1}"
+                    .format(response.status, iteration))
+        if (iteration < (retries - 1)):
+          sleep = min(5, 1 << iteration)
+          log.debug("sleeping {0} second(s) before retrying".format(sleep))
+          self.__metrics.sleep(parsed.netloc, sleep)
+          time.sleep(sleep)
+      except socket.error:
+        # Includes failed name resolution, timeouts and refused connections.
+        log.debug("socket error on iteration {0}".format(iteration))
+        self.__metrics.request(parsed.netloc, None, 0, time.time() - started)
+    else: # for
+      log.info("retries exhausted; caching uri error contents for {0}"
+                .format(uri))
+      self.__privateListingCache.saveError(uri, ListingCache.transient)
+      contents = self.uriError
+
+    return contents
+
+  ####################################################################
+  async def __privateRetrieveUriAsync(self, uri, retries):
+    import asyncio
+
+    log.debug("asynchronously retrieving contents from uri: {0}".format(uri))
+    parsed = urlparse.urlparse(uri)
+    # The listing cache's files are read and written in an executor, off the
+    # event loop.
+    loop = asyncio.get_running_loop()
+    listingCache = self.__privateListingCache
+    entry = await loop.run_in_executor(None, listingCache.load, uri)
+    fresh = ((entry is not None) and (not self.args.forceScan)
+             and listingCache.isFresh(entry))
+    self.__metrics.cache("listings", fresh)
+    if fresh:
+      if listingCache.isError(entry):
+        log.debug("using saved {0} error for uri: {1}".format(entry["error"],
+                                                              uri))
+        contents = self.uriError
+      else:
+        log.debug("using saved contents for uri: {0}".format(uri))
+        contents = LinkIndex(entry["links"])
+      with self.__cachedUriContentsLock:
+        self.__cachedUriContents[uri] = contents
+      return contents
+
+    for iteration in range(retries):
+      if iteration > 0:
+        self.__metrics.retry(parsed.netloc)
+      started = time.time()
+      try:
+        # The listing is parsed as it is received.
+        parser = LinkIndexParser()
+        with self._span("fetch", uri = uri, attempt = iteration + 1) as span:
+          (status, headers) = await asyncio.wait_for(
+                                    self.__privateAsyncConnectionPool.request(
+                                      parsed.netloc,
+                                      parsed.path,
+                                      listingCache.headers(entry),
+                                      parser.feed),
+                                    timeout = 10)
+          span.update(status = status, bytes = parser.received())
+        self.__metrics.request(parsed.netloc, status, parser.received(),
+                               time.time() - started)
+        if ((status == 304) and (entry is not None)
+            and (not listingCache.isError(entry))):
+          log.debug("contents unchanged for uri: {0}".format(uri))
+          contents = LinkIndex(entry["links"])
+          await loop.run_in_executor(None, listingCache.revalidated, entry)
+          break
+        if status == 200:
+          contents = parser.index()
+          await loop.run_in_executor(None,
+                                     listingCache.save,
+                                     uri,
+                                     contents.links,
+                                     headers.get("etag"),
+                                     headers.get("last-modified"))
+          break
+        if status in self.__uriMissingStatuses:
+          contents = await loop.run_in_executor(None,
+                                                self.__privateUriMissing,
+                                                uri,
+                                                status)
+          break
+        log.debug("response status {0} on iteration {1}"
+                    .format(status, iteration))
+        if (iteration < (retries - 1)):
+          sleep = min(5, 1 << iteration)
+          log.debug("sleeping {0} second(s) before retrying".format(sleep))
+          self.__metrics.sleep(parsed.netloc, sleep)
+          await asyncio.sleep(sleep)
+      except (OSError, ValueError, asyncio.IncompleteReadError,
+              asyncio.TimeoutError):
+        log.debug("socket error on iteration {0}".format(iteration))
+        self.__metrics.request(parsed.netloc, None, 0, time.time() - started)
+    else: # for
+      log.info("retries exhausted; caching uri error contents for {0}"
+                .format(uri))
+      await loop.run_in_executor(None, listingCache.saveError, uri,
+                                 ListingCache.transient)
+      contents = self.uriError
+
+    with self.__cachedUriContentsLock:
+      self.__cachedUriContents[uri] = contents
+    return contents
+
+  ####################################################################
+  @property
+  def __privateRootsRegistry(self):
+    with self.__rootsRegistryLock:
+      if Repository.__rootsRegistry is None:
+        Repository.__rootsRegistry = RootsRegistry(self.__privateMemorySize)
+    return Repository.__rootsRegistry
+
+  ####################################################################
+  def __privateSavedRoot(self, category, version, architecture):
+    """Returns the version's root if it is in the saved roots of the category
+    ("released", "latest" or "nightly") and they need not be refreshed;
+    otherwise None.
+    """
+    if self.args.forceScan:
+      return None
+    category = { "latest"   : self._categoryLatest,
+                 "nightly"  : self._categoryNightly,
+                 "released" : self._categoryReleased }[category](architecture)
+    roots = self.__privateMemoized((self.name(), category, architecture))
+    if roots is not None:
+      return roots.get(version)
+
+    mtime = self.__privateStore.mtime(category, architecture)
+    if (mtime is None) or (time.time() - mtime >= self.__privateCacheRefresh):
+      return None
+    dependencyMtime = self.__privateStore.mtime(category)
+    if (dependencyMtime is not None) and (dependencyMtime > mtime):
+      return None
+
+    # A point lookup rather than loading all the roots.
+    root = self.__privateStore.lookup(category, architecture, version)
+    if root is not None:
+      self.__metrics.cache("savedRoots", True)
+    return root
+
+  ####################################################################
+  @property
+  def __privateStaleEnabled(self):
+    if self.__staleEnabled is None:
+      try:
+        self.__staleEnabled = self.defaults(["cache", "stale", "enabled"])
+      except defaults.DefaultsException as ex:
+        log.warn("exception accessing defaults: {0}".format(ex))
+        log.info("using default stale enabled: false")
+
+      self.__staleEnabled = bool(self.__staleEnabled)
+
+    return self.__staleEnabled
+
+  ####################################################################
+  @property
+  def __privateStaleMaximum(self):
+    if self.__staleMaximum is None:
+      self.__staleMaximum = self.__privateInterval(["cache", "stale",
+                                                    "maximum"],
+                                                   "7-0-0", "7 days")
+    return self.__staleMaximum
+
+  ####################################################################
+  @property
+  def __privateStore(self):
+    if self.__store is None:
+      store = None
+      try:
+        store = self.defaults(["cache", "store"])
+      except defaults.DefaultsException as ex:
+        log.warn("exception accessing defaults: {0}".format(ex))
+        log.info("using default store: json")
+
+      if store is None:
+        store = "json"
+
+      if "{0}".format(store).lower() == "sqlite":
+        self.__store = SqliteCacheStore(
+                        self.__privateDirPath(),
+                        os.path.sep.join([self.__privateCacheRoot,
+                                          self.__privateCacheSubdir,
+                                          "cache.sqlite"]),
+                        self.className())
+      else:
+        if "{0}".format(store).lower() != "json":
+          log.warn("unknown store: {0}".format(store))
+          log.info("using default store: json")
+        self.__store = JsonCacheStore(self.__privateDirPath())
+
+    return self.__store
 
   ####################################################################
-  def __privateSaveFile(self, openFile, roots):
-    openFile.write(json.dumps(roots))
-    openFile.flush()
-    os.fsync(openFile.fileno())
+  def __privateUriMissing(self, uri, status):
+    # We log this at info level because some distributions don't
+    # necessarily support all the architectures of potential interest.
+    log.info("response status {0}; caching uri error contents for {1}"
+              .format(status, uri))
+    self.__privateListingCache.saveError(uri, ListingCache.missing)
+    return self.uriError
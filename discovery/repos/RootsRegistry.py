@@ -0,0 +1,75 @@
+#
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright Red Hat
+#
+import collections
+import logging
+import threading
+
+log = logging.getLogger(__name__)
+
+######################################################################
+######################################################################
+class RootsRegistry(object):
+  """Process-wide, thread-safe, memo of discovered roots keyed by
+  (vendor, category, architecture); an architecture of None identifies
+  architecture-agnostic roots.
+
+  At most 'size' sets of roots are retained; the least recently used are
+  discarded to remain within this size.
+  """
+
+  ####################################################################
+  # Public methods
+  ####################################################################
+  def get(self, key):
+    """Returns the roots memoized for the key or None if there are none.
+    """
+    with self.__lock:
+      roots = self.__roots.get(key)
+      if roots is not None:
+        self.__roots.move_to_end(key)
+      return roots
+
+  ####################################################################
+  def invalidate(self, vendor = None, category = None, architecture = None):
+    """Discards the memoized roots matching those of vendor, category and
+    architecture which are specified; specifying none discards all.
+    """
+    with self.__lock:
+      for key in list(self.__roots.keys()):
+        if (((vendor is None) or (key[0] == vendor))
+            and ((category is None) or (key[1] == category))
+            and ((architecture is None) or (key[2] == architecture))):
+          del self.__roots[key]
+
+  ####################################################################
+  def put(self, key, roots):
+    """Memoizes the roots for the key.
+    """
+    with self.__lock:
+      self.__roots[key] = roots
+      self.__roots.move_to_end(key)
+      while len(self.__roots) > self.__size:
+        (evicted, _) = self.__roots.popitem(last = False)
+        log.debug("evicting memoized roots {0}".format(evicted))
+
+  ####################################################################
+  # Overridden methods
+  ####################################################################
+  def __init__(self, size):
+    super(RootsRegistry, self).__init__()
+    self.__size = size
+    self.__lock = threading.Lock()
+    self.__roots = collections.OrderedDict()
+
+  ####################################################################
+  def __contains__(self, key):
+    with self.__lock:
+      return key in self.__roots
+
+  ####################################################################
+  def __len__(self):
+    with self.__lock:
+      return len(self.__roots)
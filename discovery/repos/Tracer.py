@@ -0,0 +1,236 @@
+#
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright Red Hat
+#
+import contextlib
+import contextvars
+import datetime
+import itertools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+######################################################################
+######################################################################
+class Tracer(object):
+  """Process-wide, thread-safe, recorder of nestable timing spans of the
+  phases of discovery.
+
+  Each span has a name (e.g., "filterRepos"), attributes (e.g., vendor,
+  category, architecture and uri) and is nested within the span, if any,
+  enclosing it in the same thread or asyncio task.  Spans are only recorded
+  while tracing is enabled; otherwise span() does nothing.
+
+  The recorded spans can be exported as a Chrome trace-event file (viewable
+  in chrome://tracing or Perfetto) showing each thread or task on its own
+  track or as a HAR file of the requests made, i.e., the fetch spans,
+  showing their waterfall.
+  """
+  # The formats in which the spans can be written.
+  formats = ("chrome", "har")
+
+  # The span, if any, enclosing the current context; a tuple of its id and
+  # name.
+  __current = contextvars.ContextVar("span", default = None)
+
+  ####################################################################
+  # Public methods
+  ####################################################################
+  def chromeTrace(self):
+    """Returns the spans as a dictionary in the Chrome trace-event format;
+    complete ("X") events with times in microseconds.
+    """
+    spans = self.spans()
+    pid = os.getpid()
+    tracks = {}
+    events = []
+    for span in spans:
+      tid = tracks.setdefault(span["track"], len(tracks) + 1)
+      args = dict(span["attributes"])
+      if span["parent"] is not None:
+        args["parent"] = span["parent"]
+      events.append({ "name"  : span["name"],
+                      "cat"   : "discovery",
+                      "ph"    : "X",
+                      "ts"    : int(span["start"] * 1000000),
+                      "dur"   : int(span["duration"] * 1000000),
+                      "pid"   : pid,
+                      "tid"   : tid,
+                      "args"  : args })
+    events.extend([ { "name"  : "thread_name",
+                      "ph"    : "M",
+                      "pid"   : pid,
+                      "tid"   : tid,
+                      "args"  : { "name" : track } }
+                    for (track, tid) in tracks.items() ])
+    return { "traceEvents"      : events,
+             "displayTimeUnit"  : "ms" }
+
+  ####################################################################
+  def enable(self, enabled = True):
+    """Enables, or disables, recording of spans.
+    """
+    self.__enabled = enabled
+
+  ####################################################################
+  def enabled(self):
+    return self.__enabled
+
+  ####################################################################
+  def har(self):
+    """Returns the fetch spans as a dictionary in the HAR 1.2 format; each
+    entry's comment is the path of the phases enclosing it.
+    """
+    spans = self.spans()
+    byId = dict([ (span["id"], span) for span in spans ])
+    entries = []
+    for span in spans:
+      if span["name"] != "fetch":
+        continue
+      attributes = span["attributes"]
+      size = attributes.get("bytes", 0)
+      milliseconds = span["duration"] * 1000
+      entries.append({
+        "startedDateTime" : datetime.datetime.fromtimestamp(
+                              span["start"],
+                              datetime.timezone.utc).isoformat(),
+        "time"            : milliseconds,
+        "request"         : { "method"      : "GET",
+                              "url"         : attributes.get("uri", ""),
+                              "httpVersion" : "HTTP/1.1",
+                              "cookies"     : [],
+                              "headers"     : [],
+                              "queryString" : [],
+                              "headersSize" : -1,
+                              "bodySize"    : 0 },
+        "response"        : { "status"      : attributes.get("status") or 0,
+                              "statusText"  : "",
+                              "httpVersion" : "HTTP/1.1",
+                              "cookies"     : [],
+                              "headers"     : [],
+                              "content"     : { "size"      : size,
+                                                "mimeType"  : "text/html" },
+                              "redirectURL" : "",
+                              "headersSize" : -1,
+                              "bodySize"    : size },
+        "cache"           : {},
+        "timings"         : { "send"    : 0,
+                              "wait"    : milliseconds,
+                              "receive" : 0 },
+        "comment"         : " > ".join(self.__privatePhases(span, byId)) })
+    return { "log" : { "version"  : "1.2",
+                       "creator"  : { "name"    : "resource-discovery",
+                                      "version" : "" },
+                       "pages"    : [],
+                       "entries"  : entries } }
+
+  ####################################################################
+  def reset(self):
+    """Discards all recorded spans.
+    """
+    with self.__lock:
+      self.__spans = []
+
+  ####################################################################
+  @contextlib.contextmanager
+  def span(self, name, **attributes):
+    """Context manager timing the enclosed phase as a span with the
+    attributes; attributes None are omitted.
+
+    Yields a dictionary of the attributes to which further attributes (e.g.,
+    a response status) may be added before the span ends.
+    """
+    attributes = dict([ (key, value) for (key, value) in attributes.items()
+                                     if value is not None ])
+    if not self.__enabled:
+      yield attributes
+      return
+
+    spanId = next(self.__ids)
+    parent = self.__current.get()
+    token = self.__current.set((spanId, name))
+    start = time.time()
+    try:
+      yield attributes
+    finally:
+      duration = time.time() - start
+      self.__current.reset(token)
+      with self.__lock:
+        self.__spans.append({ "id"          : spanId,
+                              "parent"      : (None if parent is None
+                                                  else parent[0]),
+                              "name"        : name,
+                              "start"       : start,
+                              "duration"    : duration,
+                              "track"       : self.__privateTrack(),
+                              "attributes"  : attributes })
+
+  ####################################################################
+  def spans(self):
+    """Returns a list of the recorded spans, in order of starting, as
+    dictionaries of their id, parent (the id of the enclosing span or None),
+    name, start (seconds since the epoch), duration (seconds), track (the
+    thread or task in which it ran) and attributes.
+    """
+    with self.__lock:
+      return sorted([ dict(span) for span in self.__spans ],
+                    key = lambda span: (span["start"], span["id"]))
+
+  ####################################################################
+  def write(self, path, format = "chrome"):
+    """Writes the recorded spans to the file at path in the format, one of
+    formats.
+    """
+    with open(os.path.expanduser(path), "w") as f:
+      json.dump(self.chromeTrace() if format == "chrome" else self.har(),
+                f, indent = 1)
+      f.write("\n")
+    log.debug("wrote {0} trace to {1}".format(format, path))
+
+  ####################################################################
+  # Overridden methods
+  ####################################################################
+  def __init__(self):
+    super(Tracer, self).__init__()
+    self.__enabled = False
+    self.__ids = itertools.count(1)
+    self.__lock = threading.Lock()
+    self.reset()
+
+  ####################################################################
+  # Private methods
+  ####################################################################
+  def __privatePhases(self, span, byId):
+    """Returns a list of the descriptions of the span's enclosing spans,
+    outermost first.
+    """
+    phases = []
+    parent = byId.get(span["parent"])
+    while parent is not None:
+      phases.insert(0, " ".join([parent["name"]]
+                                + [ "{0}={1}".format(key, value)
+                                    for (key, value)
+                                      in sorted(parent["attributes"]
+                                                  .items()) ]))
+      parent = byId.get(parent["parent"])
+    return phases
+
+  ####################################################################
+  def __privateTrack(self):
+    """Returns the name of the track of the current thread or asyncio task.
+    """
+    # If asyncio hasn't been imported no task can be running.
+    asyncio = sys.modules.get("asyncio")
+    try:
+      task = None if asyncio is None else asyncio.current_task()
+    except RuntimeError:
+      task = None
+    if task is not None:
+      return "task {0:x}".format(id(task))
+    return threading.current_thread().name
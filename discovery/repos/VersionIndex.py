@@ -0,0 +1,113 @@
+#
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright Red Hat
+#
+import bisect
+
+######################################################################
+######################################################################
+class VersionIndex(object):
+  """Index of values keyed by version, sorted by version.
+
+  A version is a tuple of integers; e.g., (major, minor, zstream).  Versions
+  are compared as such so that, for example, 8.10 follows 8.9.  Values with
+  equal versions are kept in the order in which they were added.
+  """
+
+  ####################################################################
+  # Public factory-behavior methods
+  ####################################################################
+  @classmethod
+  def parse(cls, version):
+    """Returns the tuple of integers of the version string; e.g., "8.10.1"
+    is (8, 10, 1).
+    """
+    return tuple([ int(field) for field in "{0}".format(version).split(".") ])
+
+  ####################################################################
+  # Public instance-behavior methods
+  ####################################################################
+  def add(self, version, value):
+    """Adds the value with the version.
+    """
+    index = bisect.bisect_right(self.__versions, version)
+    self.__versions.insert(index, version)
+    self.__values.insert(index, value)
+
+  ####################################################################
+  def atLeast(self, minimum):
+    """Returns a VersionIndex of the entries whose versions are greater than
+    or equal to minimum; e.g., (7, 5) selects 7.5, 7.5.1, 7.6 and 8.0.
+    """
+    return self.range(minimum = minimum)
+
+  ####################################################################
+  def entries(self):
+    """Returns a list of the (version, value) entries in version order.
+    """
+    return list(zip(self.__versions, self.__values))
+
+  ####################################################################
+  def newestPerMajor(self):
+    """Returns a list, in version order, of the (version, value) entry with
+    the newest version of each major.
+    """
+    return self.__privateNewestPer(1)
+
+  ####################################################################
+  def newestPerMinor(self):
+    """Returns a list, in version order, of the (version, value) entry with
+    the newest version, i.e., the newest z-stream, of each major and minor.
+    """
+    return self.__privateNewestPer(2)
+
+  ####################################################################
+  def range(self, minimum = None, maximum = None):
+    """Returns a VersionIndex of the entries whose versions are greater than
+    or equal to minimum and less than maximum; either may be None to not
+    bound the range.
+    """
+    low = (0 if minimum is None
+              else bisect.bisect_left(self.__versions, minimum))
+    high = (len(self.__versions) if maximum is None
+              else bisect.bisect_left(self.__versions, maximum))
+    index = VersionIndex()
+    index.__versions = self.__versions[low:high]
+    index.__values = self.__values[low:high]
+    return index
+
+  ####################################################################
+  # Overridden methods
+  ####################################################################
+  def __init__(self, entries = ()):
+    """entries is an iterable of (version, value).
+    """
+    super(VersionIndex, self).__init__()
+    entries = sorted(entries, key = lambda entry: entry[0])
+    self.__versions = [ version for (version, _) in entries ]
+    self.__values = [ value for (_, value) in entries ]
+
+  ####################################################################
+  def __iter__(self):
+    return iter(self.entries())
+
+  ####################################################################
+  def __len__(self):
+    return len(self.__versions)
+
+  ####################################################################
+  # Private methods
+  ####################################################################
+  def __privateNewestPer(self, fields):
+    """Returns the newest entry per distinct leading 'fields' of version in a
+    single pass; of equal newest versions the first added is returned.
+    """
+    newest = []
+    for (version, value) in zip(self.__versions, self.__values):
+      if (len(newest) > 0) and (newest[-1][0][:fields] == version[:fields]):
+        if version > newest[-1][0]:
+          newest[-1] = (version, value)
+      else:
+        newest.append((version, value))
+    return newest
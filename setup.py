@@ -76,7 +76,8 @@ setup = functools.partial(
           description = python_prefixed(package_name),
           author = "Joe Shimkus",
           author_email = "jshimkus@redhat.com",
-          packages = setuptools.find_packages(exclude = []),
+          packages = setuptools.find_packages(exclude = ["benchmarks",
+                                                         "tests"]),
           entry_points = {
             "console_scripts" : console_scripts
           },
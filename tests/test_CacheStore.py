@@ -0,0 +1,134 @@
+#
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright Red Hat
+#
+import fcntl
+import os
+import shutil
+import tempfile
+import unittest
+
+from discovery.repos.CacheStore import JsonCacheStore, SqliteCacheStore
+
+######################################################################
+######################################################################
+class TestJsonCacheStore(unittest.TestCase):
+
+  ####################################################################
+  # Overridden methods
+  ####################################################################
+  def setUp(self):
+    self.directory = tempfile.mkdtemp(prefix = "discovery-test-")
+    self.store = JsonCacheStore(self.directory)
+
+  ####################################################################
+  def tearDown(self):
+    shutil.rmtree(self.directory, ignore_errors = True)
+
+  ####################################################################
+  # Test methods
+  ####################################################################
+  def testLoadMissing(self):
+    self.assertEqual(self.store.load("released", "x86_64"), (None, None))
+    self.assertIsNone(self.store.mtime("released"))
+
+  ####################################################################
+  def testLoadMalformed(self):
+    with open(os.path.join(self.directory, "agnostic.released.json"),
+              "w") as f:
+      f.write("{")
+    self.assertEqual(self.store.load("released"), (None, None))
+
+  ####################################################################
+  def testLock(self):
+    held = self.store.lock("test.refresh", fcntl.LOCK_EX)
+    try:
+      self.assertIsNone(self.store.lock("test.refresh",
+                                        fcntl.LOCK_EX | fcntl.LOCK_NB))
+    finally:
+      held.close()
+    acquired = self.store.lock("test.refresh", fcntl.LOCK_EX | fcntl.LOCK_NB)
+    self.assertIsNotNone(acquired)
+    acquired.close()
+
+  ####################################################################
+  def testLookup(self):
+    self.store.save("released", "x86_64", { "8.10" : "http://host/8.10" })
+    self.assertEqual(self.store.lookup("released", "x86_64", "8.10"),
+                     "http://host/8.10")
+    self.assertIsNone(self.store.lookup("released", "x86_64", "8.9"))
+    self.assertIsNone(self.store.lookup("latest", "x86_64", "8.10"))
+
+  ####################################################################
+  def testSaveReplaces(self):
+    self.store.save("released", "x86_64", { "8.9" : "http://host/8.9" })
+    self.store.save("released", "x86_64", { "8.10" : "http://host/8.10" })
+    (roots, mtime) = self.store.load("released", "x86_64")
+    self.assertEqual(roots, { "8.10" : "http://host/8.10" })
+    self.assertEqual(mtime, self.store.mtime("released", "x86_64"))
+    # No temporary files remain; only the file and its lock file.
+    self.assertEqual(sorted(os.listdir(self.directory)),
+                     ["available.released.x86_64.json",
+                      "available.released.x86_64.json.lock"])
+
+######################################################################
+######################################################################
+class TestSqliteCacheStore(unittest.TestCase):
+
+  ####################################################################
+  # Overridden methods
+  ####################################################################
+  def setUp(self):
+    self.root = tempfile.mkdtemp(prefix = "discovery-test-")
+    self.directory = os.path.join(self.root, "RHEL")
+    self.path = os.path.join(self.root, "cache.sqlite")
+
+  ####################################################################
+  def tearDown(self):
+    shutil.rmtree(self.root, ignore_errors = True)
+
+  ####################################################################
+  # Test methods
+  ####################################################################
+  def testLookup(self):
+    store = SqliteCacheStore(self.directory, self.path, "RHEL")
+    store.save("released", "x86_64", { "8.9"  : "http://host/8.9",
+                                       "8.10" : "http://host/8.10" })
+    store.save("released", "s390x", { "8.9" : "http://host/s390x/8.9" })
+    self.assertEqual(store.lookup("released", "x86_64", "8.10"),
+                     "http://host/8.10")
+    self.assertEqual(store.lookup("released", "s390x", "8.9"),
+                     "http://host/s390x/8.9")
+    self.assertIsNone(store.lookup("released", "s390x", "8.10"))
+    self.assertIsNone(store.lookup("latest", "x86_64", "8.10"))
+
+  ####################################################################
+  def testMigration(self):
+    os.makedirs(self.directory)
+    legacy = JsonCacheStore(self.directory)
+    legacy.save("latest", None, { "9.4" : "http://host/9.4" })
+    legacyMtime = legacy.mtime("latest")
+
+    store = SqliteCacheStore(self.directory, self.path, "RHEL")
+    self.assertEqual(store.mtime("latest"), legacyMtime)
+    # Once migrated the database, not the file, is used.
+    os.unlink(os.path.join(self.directory, "agnostic.latest.json"))
+    self.assertEqual(store.load("latest"),
+                     ({ "9.4" : "http://host/9.4" }, legacyMtime))
+    self.assertEqual(store.load("latest", "x86_64"), (None, None))
+
+  ####################################################################
+  def testSaveReplaces(self):
+    store = SqliteCacheStore(self.directory, self.path, "RHEL")
+    store.save("released", "x86_64", { "8.9"  : "http://host/8.9",
+                                       "8.10" : "http://host/8.10" })
+    store.save("released", "x86_64", { "9.0" : "http://host/9.0" },
+               mtime = 1000.0)
+    store.save("released", None, { "7.9" : "http://host/7.9" })
+    self.assertEqual(store.load("released", "x86_64"),
+                     ({ "9.0" : "http://host/9.0" }, 1000.0))
+    # Roots are kept per vendor.
+    other = SqliteCacheStore(os.path.join(self.root, "Fedora"), self.path,
+                             "Fedora")
+    self.assertEqual(other.load("released", "x86_64"), (None, None))
@@ -0,0 +1,86 @@
+#
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright Red Hat
+#
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+try:
+  import mill
+except ImportError:
+  mill = None
+
+from benchmarks.FreshProcess import FreshProcess
+from benchmarks.MirrorServer import MirrorServer
+from benchmarks.MirrorTree import MirrorTree
+
+######################################################################
+######################################################################
+@unittest.skipIf(mill is None, "utility-mill is not installed")
+class TestDiscovery(unittest.TestCase):
+  # The discovery output of the default MirrorTree as produced before the
+  # discovery optimizations; the server's host is replaced by "{host}".
+  goldenPath = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            "data", "discovery.json")
+
+  # Performs discovery, in a single process, printing its output as JSON.
+  dump = """
+from benchmarks.Benchmark import Benchmark
+from discovery import architectures, distributions, repos
+
+Benchmark.overrideDefaults({host!r}, {cacheRoot!r})
+output = {{ "roots" : {{}}, "choices" : {{}} }}
+for choice in repos.Repository.choices():
+  repository = repos.Repository.makeItem(choice)
+  for architecture in architectures.Architecture.choices():
+    output["roots"]["{{0}} {{1}}".format(choice, architecture)] = {{
+      "released" : repository.availableRoots(architecture),
+      "latest"   : repository.availableLatestRoots(architecture),
+      "nightly"  : repository.availableNightlyRoots(architecture) }}
+for architecture in architectures.Architecture.choices():
+  output["choices"][architecture] = sorted(
+    distributions.Distribution.choices(architecture))
+print(json.dumps(output))
+"""
+
+  ####################################################################
+  # Overridden methods
+  ####################################################################
+  def setUp(self):
+    self.server = MirrorServer(MirrorTree()).start()
+    self.cacheRoot = tempfile.mkdtemp()
+
+  ####################################################################
+  def tearDown(self):
+    self.server.shutdown()
+    self.server.server_close()
+    shutil.rmtree(self.cacheRoot)
+
+  ####################################################################
+  # Test methods
+  ####################################################################
+  def testMatchesBaseline(self):
+    with open(self.goldenPath) as f:
+      golden = json.load(f)
+    # Cold, then warm, the latter from the cache the former populated.
+    for scenario in ("cold", "warm"):
+      self.assertEqual(self.__privateDiscover(), golden, scenario)
+
+  ####################################################################
+  # Private methods
+  ####################################################################
+  def __privateDiscover(self):
+    """Returns the discovery output, performed in a fresh process, with the
+    server's host replaced by "{host}".
+    """
+    output = FreshProcess.result(
+              ["-c",
+               "import json\n{0}".format(
+                 self.dump.format(host = self.server.host(),
+                                  cacheRoot = self.cacheRoot))])
+    return json.loads(json.dumps(output).replace(self.server.host(),
+                                                 "{host}"))
@@ -0,0 +1,131 @@
+#
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright Red Hat
+#
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import unittest
+
+from discovery.repos.DaemonClient import (DaemonClient,
+                                          DaemonException,
+                                          DaemonUnavailableException)
+
+try:
+  import mill
+except ImportError:
+  mill = None
+
+######################################################################
+######################################################################
+class _Daemon(object):
+  """Stands in for DiscoveryDaemon, answering queries without discovery.
+  """
+
+  ####################################################################
+  # Public methods
+  ####################################################################
+  def query(self, request):
+    if request["query"] != "availableRoots":
+      raise ValueError("unknown query: {0}".format(request["query"]))
+    return { "8.10" : "http://host/{0}/{1}".format(request["repository"],
+                                                   request["architecture"]) }
+
+######################################################################
+######################################################################
+@unittest.skipIf(mill is None, "utility-mill is not installed")
+class TestDaemonProtocol(unittest.TestCase):
+
+  ####################################################################
+  # Overridden methods
+  ####################################################################
+  def setUp(self):
+    from discovery.distributions.DiscoveryDaemon import _DaemonServer
+
+    self.directory = tempfile.mkdtemp(prefix = "discovery-test-")
+    self.path = os.path.join(self.directory, "daemon.socket")
+    self.server = _DaemonServer(self.path, _Daemon())
+    self.thread = threading.Thread(target = self.server.serve_forever)
+    self.thread.start()
+
+  ####################################################################
+  def tearDown(self):
+    self.server.shutdown()
+    self.thread.join()
+    self.server.server_close()
+    shutil.rmtree(self.directory, ignore_errors = True)
+
+  ####################################################################
+  # Test methods
+  ####################################################################
+  def testError(self):
+    client = DaemonClient(self.path)
+    with self.assertRaises(DaemonException) as context:
+      client.query("unknown", architecture = "x86_64")
+    self.assertNotIsInstance(context.exception, DaemonUnavailableException)
+    self.assertEqual("{0}".format(context.exception),
+                     "unknown query: unknown")
+
+  ####################################################################
+  def testQuery(self):
+    self.assertEqual(DaemonClient(self.path).query("availableRoots",
+                                                   repository = "RHEL",
+                                                   architecture = "s390x"),
+                     { "8.10" : "http://host/RHEL/s390x" })
+
+######################################################################
+######################################################################
+class TestDaemonClient(unittest.TestCase):
+
+  ####################################################################
+  # Overridden methods
+  ####################################################################
+  def setUp(self):
+    self.directory = tempfile.mkdtemp(prefix = "discovery-test-")
+    self.path = os.path.join(self.directory, "daemon.socket")
+
+  ####################################################################
+  def tearDown(self):
+    shutil.rmtree(self.directory, ignore_errors = True)
+
+  ####################################################################
+  # Test methods
+  ####################################################################
+  def testMalformedResponse(self):
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(self.path)
+    listener.listen(1)
+    def respond():
+      (connection, _) = listener.accept()
+      with connection:
+        connection.makefile("rb").readline()
+        connection.sendall(b"not json\n")
+    thread = threading.Thread(target = respond)
+    thread.start()
+    try:
+      self.assertRaises(DaemonUnavailableException,
+                        DaemonClient(self.path).query, "availableRoots")
+    finally:
+      thread.join()
+      listener.close()
+
+  ####################################################################
+  def testUnavailable(self):
+    self.assertRaises(DaemonUnavailableException,
+                      DaemonClient(self.path).query, "availableRoots")
+
+  ####################################################################
+  def testUnresponsive(self):
+    # The daemon accepts the connection but never replies.
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(self.path)
+    listener.listen(1)
+    try:
+      self.assertRaises(DaemonUnavailableException,
+                        DaemonClient(self.path, timeout = 0.1).query,
+                        "availableRoots")
+    finally:
+      listener.close()
@@ -0,0 +1,136 @@
+#
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright Red Hat
+#
+import argparse
+import traceback
+import unittest
+from unittest import mock
+
+try:
+  from mill import defaults
+except ImportError:
+  defaults = None
+
+######################################################################
+######################################################################
+@unittest.skipIf(defaults is None, "utility-mill is not installed")
+class TestDistroDefault(unittest.TestCase):
+  # A section as structured in the defaults file.
+  section = { "default"     : "any",
+              "fedora3\\d$" : { "default"  : "fedora3x",
+                                "fedora39" : "fedora39" },
+              "centos8\\d$" : { "default" : "centos8x" } }
+
+  ####################################################################
+  # Overridden methods
+  ####################################################################
+  def setUp(self):
+    from discovery import distributions
+
+    # The distributions are created as the package creates them from
+    # discovered roots; no discovery is performed.
+    self.distributions = {}
+    for (family, roots) in ((distributions.Fedora,
+                             { "38" : "http://host/38",
+                               "39" : "http://host/39",
+                               "40" : "http://host/40" }),
+                            (distributions.CentOS,
+                             { "8.5" : "http://host/8.5" })):
+      for (name, klass) in family._makeDistributionMapping(
+                                                "x86_64",
+                                                { family : roots }).items():
+        self.distributions[name] = klass(argparse.Namespace())
+
+  ####################################################################
+  # Test methods
+  ####################################################################
+  def testDistroDefault(self):
+    self.assertEqual(
+      self.distributions["fedora39"]._distroDefault(self.section),
+      "fedora39")
+    self.assertEqual(
+      self.distributions["fedora38"]._distroDefault(self.section),
+      "fedora3x")
+    self.assertEqual(
+      self.distributions["fedora40"]._distroDefault(self.section),
+      "any")
+    self.assertEqual(
+      self.distributions["centos85"]._distroDefault(self.section),
+      "centos8x")
+
+  ####################################################################
+  def testDistroDefaultMultipleMatches(self):
+    section = { "fedora\\d+$" : { "default" : "one" },
+                "fedora3\\d$" : { "default" : "other" } }
+    self.assertRaises(defaults.DefaultsFileFormatException,
+                      self.distributions["fedora39"]._distroDefault, section)
+    section = { "fedora3\\d$" : { "fedora39" : "one",
+                                  "fedora3"  : "other" } }
+    self.assertRaises(defaults.DefaultsFileFormatException,
+                      self.distributions["fedora39"]._distroDefault, section)
+
+  ####################################################################
+  def testDistroSectionDefault(self):
+    # The compiled, memoized, lookup agrees with matching the section as is;
+    # repeatedly.
+    for distribution in self.distributions.values():
+      for section in ("bootOptions", "kickStart"):
+        expected = distribution._distroDefault(
+                    distribution.defaults([distribution.versionName, section]))
+        for _ in range(2):
+          self.assertEqual(distribution._distroSectionDefault(section),
+                           expected)
+    centos = self.distributions["centos85"]
+    self.assertEqual(centos._distroSectionDefault("specialRepos"),
+                     centos._distroDefault(centos.defaults(["centos",
+                                                            "specialRepos"])))
+
+  ####################################################################
+  def testDistroSectionDefaultError(self):
+    fedora = self.distributions["fedora39"]
+    section = { "fedora\\d+$" : { "default" : "one" },
+                "fedora3\\d$" : { "default" : "other" } }
+    inherited = type(fedora).defaults
+
+    def sectionDefaults(klass, keys, *args):
+      if keys == [fedora.versionName, "ambiguous"]:
+        return section
+      return inherited(keys, *args)
+
+    # The memoized error is raised anew each time, its traceback not
+    # accumulating those of the previous raises.
+    raised = []
+    with mock.patch.object(type(fedora), "defaults",
+                           classmethod(sectionDefaults)):
+      for _ in range(3):
+        with self.assertRaises(defaults.DefaultsFileFormatException) as context:
+          fedora._distroSectionDefault("ambiguous")
+        raised.append(context.exception)
+    self.assertEqual(len(set([ id(ex) for ex in raised ])), len(raised))
+    depths = [ len(traceback.extract_tb(ex.__traceback__)) for ex in raised ]
+    self.assertEqual(depths, [depths[0]] * len(raised))
+
+######################################################################
+######################################################################
+@unittest.skipIf(defaults is None, "utility-mill is not installed")
+class TestDistributionMappings(unittest.TestCase):
+
+  ####################################################################
+  # Test methods
+  ####################################################################
+  def testRecreatedWhenRootsChange(self):
+    from discovery import distributions, repos
+
+    # Creating the mappings performs no discovery.
+    distribution = distributions.Distribution
+    mapping = distribution._mapping(("released", "x86_64"))
+    self.assertIs(distribution._mapping(("released", "x86_64")), mapping)
+    for change in (repos.Repository.invalidateRoots,
+                   repos.Repository.clearCachedContents):
+      change()
+      recreated = distribution._mapping(("released", "x86_64"))
+      self.assertIsNot(recreated, mapping)
+      self.assertIs(distribution._mapping(("released", "x86_64")), recreated)
+      mapping = recreated
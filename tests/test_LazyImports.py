@@ -0,0 +1,64 @@
+#
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright Red Hat
+#
+import unittest
+
+try:
+  import mill
+except ImportError:
+  mill = None
+
+from benchmarks.FreshProcess import FreshProcess
+
+######################################################################
+######################################################################
+class TestLazyImports(unittest.TestCase):
+  # Modules only discovery itself, not the commands' parsers, uses.
+  deferred = ("asyncio", "concurrent.futures", "socketserver", "sqlite3")
+
+  ####################################################################
+  # Test methods
+  ####################################################################
+  def testPackages(self):
+    modules = self.__privateImported("import discovery.repos\n"
+                                     "import discovery.distributions")
+    self.assertEqual([ module for module in modules
+                              if module.startswith("discovery.")
+                                or (module == "mill") ],
+                     ["discovery.distributions", "discovery.repos"])
+
+  ####################################################################
+  @unittest.skipIf(mill is None, "utility-mill is not installed")
+  def testCommandsHelp(self):
+    # Those the dependencies import are not the package's to defer.
+    dependencies = self.__privateImported(
+                    "import yaml\nfrom mill import command, defaults, factory")
+    for (package, entryPoint) in (("discovery.repos", "repos"),
+                                  ("discovery.distributions", "distros")):
+      modules = self.__privateImported(
+                  "sys.argv = [{0!r}, '--help']\n"
+                  "from {1} import {0}\n"
+                  "{0}()".format(entryPoint, package))
+      self.assertIn("{0}.{1}Command".format(package,
+                                            entryPoint.capitalize()),
+                    modules)
+      for module in set(self.deferred) - set(dependencies):
+        self.assertNotIn(module, modules,
+                         "{0} --help imports {1}".format(entryPoint, module))
+
+  ####################################################################
+  # Private methods
+  ####################################################################
+  def __privateImported(self, statement):
+    """Returns a sorted list of the modules imported, in a fresh process, on
+    executing the statement; the process may exit via SystemExit.
+    """
+    return FreshProcess.result(
+            ["-c",
+             "import atexit, json, sys\n"
+             "atexit.register(lambda: sys.stderr.write("
+             "'\\n' + json.dumps(sorted(sys.modules.keys())) + '\\n'))\n"
+             "{0}".format(statement)],
+            stream = "stderr")
@@ -0,0 +1,78 @@
+#
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright Red Hat
+#
+import re
+import unittest
+
+from discovery.repos.LinkIndex import LinkIndex, LinkIndexParser
+
+######################################################################
+######################################################################
+class TestLinkIndexParser(unittest.TestCase):
+  # A listing as generated by a web server; the parent directory and sorting
+  # links are not links of the listing's entries.
+  listing = "\n".join([
+    "<html><head><title>Index of /RHEL-8</title></head><body>",
+    "<a href=\"?C=N;O=D\">Name</a>",
+    "<a href=\"/\">Parent Directory</a>",
+    "<a href=\"8.9/\">8.9/</a>       2023-11-01 12:00    -",
+    "<a href=\"8.10/\">8.10/</a>      2024-05-01 12:00    -",
+    "<a href=\"BaseOS/\">BaseOS/</a>",
+    "<a href=\"compose.json\">compose.json</a> 1.2K",
+    "<a href=\"8.9/\">8.9/</a>",
+    "<a href=\"café/\">café/</a>",
+    "</body></html>"]).encode("UTF-8")
+
+  ####################################################################
+  # Test methods
+  ####################################################################
+  def testChunkedFeed(self):
+    # Fed in chunks splitting tags and multi-byte characters alike.
+    whole = LinkIndexParser()
+    whole.feed(self.listing)
+    for size in (1, 3, 7, 64):
+      parser = LinkIndexParser()
+      for offset in range(0, len(self.listing), size):
+        parser.feed(self.listing[offset:offset + size])
+      self.assertEqual(parser.received(), len(self.listing))
+      self.assertEqual(parser.index().links, whole.index().links)
+
+  ####################################################################
+  def testIndex(self):
+    parser = LinkIndexParser()
+    parser.feed(self.listing)
+    index = parser.index()
+    # Duplicates are discarded, the order of the listing kept.
+    self.assertEqual(index.links, ("8.9/", "8.10/", "BaseOS/",
+                                   "compose.json", "café/"))
+    self.assertEqual(len(index), 5)
+    self.assertIn("compose.json", index)
+    self.assertNotIn("/", index)
+
+  ####################################################################
+  def testInvalidEncoding(self):
+    parser = LinkIndexParser()
+    parser.feed(b"<a href=\"bad\xff/\">bad\xff/</a><a href=\"ok/\">ok/</a>")
+    index = parser.index()
+    self.assertIn("ok/", index)
+    self.assertEqual(len(index), 2)
+
+######################################################################
+######################################################################
+class TestLinkIndex(unittest.TestCase):
+
+  ####################################################################
+  # Test methods
+  ####################################################################
+  def testDirectories(self):
+    index = LinkIndex(["BaseOS/", "AppStream/", "compose.json"])
+    self.assertEqual(index.directories(), frozenset(["baseos", "appstream"]))
+
+  ####################################################################
+  def testMatches(self):
+    index = LinkIndex(["8.9/", "8.10/", "8.10-beta/", "latest-8/"])
+    matches = index.matches(re.compile(r"(\d+)\.(\d+)/"))
+    self.assertEqual([ match.groups() for match in matches ],
+                     [("8", "9"), ("8", "10")])
@@ -0,0 +1,104 @@
+#
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright Red Hat
+#
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from discovery.repos.Metrics import Metrics
+
+######################################################################
+######################################################################
+class TestMetrics(unittest.TestCase):
+
+  ####################################################################
+  # Overridden methods
+  ####################################################################
+  def setUp(self):
+    self.metrics = Metrics()
+    self.metrics.request("host:80", 200, 100, 0.005)
+    self.metrics.request("host:80", 200, 50, 0.3)
+    self.metrics.request("host:80", 404, 0, 20.0)
+    self.metrics.request("host:80", None, 0, 0.001)
+    self.metrics.retry("host:80")
+    self.metrics.sleep("host:80", 1.5)
+    self.metrics.cache("listings", True)
+    self.metrics.cache("listings", False)
+    self.metrics.cache("listings", True)
+
+  ####################################################################
+  # Test methods
+  ####################################################################
+  def testConcurrentRecording(self):
+    metrics = Metrics()
+    def record():
+      for _ in range(1000):
+        metrics.cache("uriContents", True)
+        metrics.request("host:80", 200, 1, 0.01)
+    threads = [ threading.Thread(target = record) for _ in range(4) ]
+    for thread in threads:
+      thread.start()
+    for thread in threads:
+      thread.join()
+    snapshot = metrics.snapshot()
+    self.assertEqual(snapshot["caches"]["uriContents"]["hits"], 4000)
+    self.assertEqual(snapshot["hosts"]["host:80"]["bytes"], 4000)
+
+  ####################################################################
+  def testFormat(self):
+    lines = self.metrics.format().splitlines()
+    self.assertEqual(lines[0],
+                     "host:80: 4 requests (200: 2, 404: 1, error: 1),"
+                     " 150 bytes, 1 retries (1.5s sleeping),"
+                     " latency mean 5076.5ms max 20000.0ms")
+    self.assertEqual(lines[1], "listings cache: 2 hits, 1 misses (66.7% hit)")
+
+  ####################################################################
+  def testPrometheus(self):
+    lines = self.metrics.prometheus().splitlines()
+    self.assertIn("# TYPE discovery_request_duration_seconds histogram",
+                  lines)
+    self.assertIn("discovery_requests_total{host=\"host:80\",status=\"200\"}"
+                  " 2", lines)
+    self.assertIn("discovery_request_duration_seconds_bucket"
+                  "{host=\"host:80\",le=\"+Inf\"} 4", lines)
+    self.assertIn("discovery_cache_misses_total{cache=\"listings\"} 1",
+                  lines)
+
+  ####################################################################
+  def testReset(self):
+    self.metrics.reset()
+    self.assertEqual(self.metrics.snapshot(), { "hosts" : {}, "caches" : {} })
+
+  ####################################################################
+  def testSnapshot(self):
+    snapshot = self.metrics.snapshot()
+    host = snapshot["hosts"]["host:80"]
+    self.assertEqual(host["requests"], 4)
+    self.assertEqual(host["statuses"], { "200" : 2, "404" : 1, "error" : 1 })
+    self.assertEqual((host["bytes"], host["retries"], host["sleep"]),
+                     (150, 1, 1.5))
+    # The buckets are cumulative; a latency equal to a bound is within it.
+    buckets = dict(host["latency"]["buckets"])
+    self.assertEqual((buckets["0.005"], buckets["0.25"], buckets["0.5"],
+                      buckets["10.0"], buckets["+Inf"]),
+                     (2, 2, 3, 3, 4))
+    self.assertEqual(host["latency"]["max"], 20.0)
+    self.assertEqual(snapshot["caches"],
+                     { "listings" : { "hits" : 2, "misses" : 1 } })
+
+  ####################################################################
+  def testWritePrometheus(self):
+    directory = tempfile.mkdtemp(prefix = "discovery-test-")
+    try:
+      path = os.path.join(directory, "discovery.prom")
+      self.metrics.writePrometheus(path)
+      with open(path) as f:
+        self.assertEqual(f.read(), self.metrics.prometheus())
+      self.assertEqual(os.listdir(directory), ["discovery.prom"])
+    finally:
+      shutil.rmtree(directory, ignore_errors = True)
@@ -0,0 +1,122 @@
+#
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright Red Hat
+#
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from discovery.repos.Tracer import Tracer
+
+######################################################################
+######################################################################
+class TestTracer(unittest.TestCase):
+
+  ####################################################################
+  # Overridden methods
+  ####################################################################
+  def setUp(self):
+    self.tracer = Tracer()
+    self.tracer.enable()
+
+  ####################################################################
+  # Test methods
+  ####################################################################
+  def testChromeTrace(self):
+    with self.tracer.span("availableRoots", architecture = "x86_64"):
+      with self.tracer.span("fetch", uri = "http://host/"):
+        pass
+    trace = self.tracer.chromeTrace()
+    events = dict([ (event["name"], event)
+                    for event in trace["traceEvents"] ])
+    self.assertEqual(events["fetch"]["ph"], "X")
+    self.assertEqual(events["fetch"]["args"]["uri"], "http://host/")
+    self.assertIn("parent", events["fetch"]["args"])
+    self.assertEqual(events["thread_name"]["args"]["name"],
+                     threading.current_thread().name)
+
+  ####################################################################
+  def testDisabled(self):
+    tracer = Tracer()
+    with tracer.span("fetch", uri = "http://host/") as attributes:
+      attributes["status"] = 200
+    self.assertEqual(tracer.spans(), [])
+
+  ####################################################################
+  def testHar(self):
+    with self.tracer.span("availableRoots", vendor = "rhel"):
+      with self.tracer.span("fetch", uri = "http://host/") as attributes:
+        attributes.update({ "status" : 200, "bytes" : 42 })
+    entries = self.tracer.har()["log"]["entries"]
+    self.assertEqual(len(entries), 1)
+    self.assertEqual(entries[0]["request"]["url"], "http://host/")
+    self.assertEqual(entries[0]["response"]["status"], 200)
+    self.assertEqual(entries[0]["response"]["bodySize"], 42)
+    self.assertEqual(entries[0]["comment"], "availableRoots vendor=rhel")
+
+  ####################################################################
+  def testNesting(self):
+    with self.tracer.span("outer", category = "released", major = None):
+      with self.tracer.span("inner"):
+        pass
+      with self.tracer.span("sibling"):
+        pass
+    spans = dict([ (span["name"], span) for span in self.tracer.spans() ])
+    self.assertIsNone(spans["outer"]["parent"])
+    self.assertEqual(spans["inner"]["parent"], spans["outer"]["id"])
+    self.assertEqual(spans["sibling"]["parent"], spans["outer"]["id"])
+    # Attributes None are omitted.
+    self.assertEqual(spans["outer"]["attributes"], { "category" : "released" })
+
+  ####################################################################
+  def testTasks(self):
+    async def fetch(uri):
+      with self.tracer.span("fetch", uri = uri):
+        await asyncio.sleep(0)
+
+    async def discover():
+      with self.tracer.span("discover"):
+        await asyncio.gather(fetch("a"), fetch("b"))
+
+    asyncio.run(discover())
+    spans = self.tracer.spans()
+    discover = [ span for span in spans if span["name"] == "discover" ][0]
+    fetches = [ span for span in spans if span["name"] == "fetch" ]
+    # Each task is on its own track, its spans nested within the enclosing
+    # span of the task which created it.
+    self.assertEqual(len(set([ span["track"] for span in fetches ])), 2)
+    self.assertEqual([ span["parent"] for span in fetches ],
+                     [discover["id"]] * 2)
+
+  ####################################################################
+  def testThreads(self):
+    def work():
+      with self.tracer.span("work"):
+        pass
+    with self.tracer.span("outer"):
+      thread = threading.Thread(target = work, name = "worker")
+      thread.start()
+      thread.join()
+    work = [ span for span in self.tracer.spans() if span["name"] == "work" ]
+    self.assertEqual(work[0]["track"], "worker")
+
+  ####################################################################
+  def testWrite(self):
+    with self.tracer.span("fetch", uri = "http://host/"):
+      pass
+    directory = tempfile.mkdtemp(prefix = "discovery-test-")
+    try:
+      for format in Tracer.formats:
+        path = os.path.join(directory, "trace.{0}".format(format))
+        self.tracer.write(path, format)
+        with open(path) as f:
+          self.assertEqual(json.load(f),
+                           self.tracer.chromeTrace() if format == "chrome"
+                            else self.tracer.har())
+    finally:
+      shutil.rmtree(directory, ignore_errors = True)
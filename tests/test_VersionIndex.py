@@ -0,0 +1,76 @@
+#
+# SPDX-License-Identifier: GPL-2.0-only
+#
+# Copyright Red Hat
+#
+import unittest
+
+from discovery.repos.VersionIndex import VersionIndex
+
+######################################################################
+######################################################################
+class TestVersionIndex(unittest.TestCase):
+
+  ####################################################################
+  # Overridden methods
+  ####################################################################
+  def setUp(self):
+    self.index = VersionIndex([ (VersionIndex.parse(version), version)
+                                for version in ("8.10", "7.9", "8.2.1",
+                                                "8.2", "9.0", "7.5",
+                                                "8.2.10", "8.9") ])
+
+  ####################################################################
+  # Test methods
+  ####################################################################
+  def testAdd(self):
+    index = VersionIndex()
+    index.add((8, 1), "first")
+    index.add((7, 9), "older")
+    index.add((8, 1), "second")
+    self.assertEqual(index.entries(), [((7, 9), "older"),
+                                       ((8, 1), "first"),
+                                       ((8, 1), "second")])
+
+  ####################################################################
+  def testAtLeast(self):
+    self.assertEqual([ value for (_, value) in self.index.atLeast((8, 9)) ],
+                     ["8.9", "8.10", "9.0"])
+
+  ####################################################################
+  def testEntriesInVersionOrder(self):
+    self.assertEqual([ value for (_, value) in self.index.entries() ],
+                     ["7.5", "7.9", "8.2", "8.2.1", "8.2.10", "8.9", "8.10",
+                      "9.0"])
+    self.assertEqual(len(self.index), 8)
+
+  ####################################################################
+  def testNewestPerMajor(self):
+    self.assertEqual([ value for (_, value) in self.index.newestPerMajor() ],
+                     ["7.9", "8.10", "9.0"])
+
+  ####################################################################
+  def testNewestPerMajorOfEqualVersions(self):
+    index = VersionIndex([((8, 1), "first"), ((8, 1), "second")])
+    self.assertEqual(index.newestPerMajor(), [((8, 1), "first")])
+
+  ####################################################################
+  def testNewestPerMinor(self):
+    self.assertEqual([ value for (_, value) in self.index.newestPerMinor() ],
+                     ["7.5", "7.9", "8.2.10", "8.9", "8.10", "9.0"])
+
+  ####################################################################
+  def testParse(self):
+    self.assertEqual(VersionIndex.parse("8.10.1"), (8, 10, 1))
+    self.assertEqual(VersionIndex.parse(38), (38,))
+    self.assertRaises(ValueError, VersionIndex.parse, "8.x")
+
+  ####################################################################
+  def testRange(self):
+    self.assertEqual([ value for (_, value)
+                               in self.index.range((8, 2), (8, 10)) ],
+                     ["8.2", "8.2.1", "8.2.10", "8.9"])
+    self.assertEqual([ value for (_, value)
+                               in self.index.range(maximum = (8,)) ],
+                     ["7.5", "7.9"])
+    self.assertEqual(len(self.index.range((10,))), 0)